@@ -19,6 +19,27 @@ def create_app(config_name=None):
     register_jwt_debug_handlers(jwt)
     cors.init_app(app, resources={r"/api/*": {"origins": app.config.get("CORS_ORIGINS", "*")}})
 
+    from app.audit.writer import init_audit_writer
+    init_audit_writer(app, mongo.db)
+
+    from app.audit.checkpoints import check_checkpoint_key
+    check_checkpoint_key(app)
+
+    from app.common.cache import init_identity_caches
+    init_identity_caches(app)
+
+    from app.common.invalidation import init_invalidation_bus
+    init_invalidation_bus(app, mongo.db)
+
+    from app.evidence.hashing import configure_hashing
+    configure_hashing(app)
+
+    from app.evidence.storage import init_storage
+    init_storage(app)
+
+    from app.evidence.reverify import init_reverify_scheduler
+    init_reverify_scheduler(app)
+
     # Register blueprints
     from app.auth import auth_bp
     from app.evidence import evidence_bp
@@ -52,10 +73,17 @@ def create_app(config_name=None):
             print(f"DEBUG: OpenSSL {ssl.OPENSSL_VERSION}")
             _create_indexes(mongo.db)
             print("DEBUG: MongoDB indexes created successfully")
+            if app.config.get("AUDIT_CHECK_QUERY_PLANS"):
+                from app.audit.query_plans import check_query_plans
+                check_query_plans(mongo.db)
         except Exception as e:
             print(f"WARNING: Failed to connect to MongoDB during startup: {e}")
             print("App will continue starting, but database features may fail.")
 
+    # Embed names/case numbers in evidence stored before the read model existed
+    from app.evidence.read_model import start_read_model_backfill
+    start_read_model_backfill(app)
+
     return app
 
 
@@ -71,11 +99,23 @@ def _create_indexes(db):
     db.evidence.create_index("case_id")
     db.evidence.create_index("current_custodian_id")
     db.evidence.create_index("status")
-
-    db.audit_logs.create_index("chain_sequence", unique=True)
-    db.audit_logs.create_index([("entity_type", 1), ("entity_id", 1)])
-    db.audit_logs.create_index("user_id")
-    db.audit_logs.create_index("timestamp")
+    db.evidence.create_index("last_verified_at")
+    # Read-model maintenance (rename/retitle rewrites) and list queries without joins
+    db.evidence.create_index("uploaded_by")
+    db.evidence.create_index("case_ids")
+    db.evidence.create_index([("current_custodian_id", 1), ("created_at", -1)])
+    db.evidence.create_index([("created_at", -1)])
+    db.evidence.create_index("read_model_version")
+
+    from app.audit.query_plans import create_audit_indexes
+    create_audit_indexes(db)
+
+    db.audit_checkpoints.create_index("chain_sequence")
+    db.audit_segments.create_index("first_sequence", unique=True)
+    db.audit_segment_keys.create_index([("field", 1), ("value", 1), ("first_sequence", 1)], unique=True)
+    db.audit_archived_ids.create_index("log_id", unique=True)
+    db.audit_rollups.create_index([("entity_type", 1), ("entity_id", 1)], unique=True)
+    db.audit_merkle_nodes.create_index([("level", 1), ("index", 1)], unique=True)
 
     db.custody_transfers.create_index("transfer_id", unique=True)
     db.custody_transfers.create_index("evidence_id")
@@ -83,9 +123,18 @@ def _create_indexes(db):
     db.custody_transfers.create_index("to_user_id")
     db.custody_transfers.create_index("status")
 
+    db.evidence_blobs.create_index("sha256", unique=True)
+    db.evidence_chunk_trees.create_index("sha256", unique=True)
+    db.upload_sessions.create_index("upload_id", unique=True)
+    db.upload_sessions.create_index([("status", 1), ("expires_at", 1)])
+
     db.hash_records.create_index("evidence_id")
     db.hash_records.create_index("computed_at")
 
+    db.verification_jobs.create_index("job_id", unique=True)
+    db.scheduler_leases.create_index("name", unique=True)
+    db.verification_jobs.create_index("created_at")
+
     db.notifications.create_index("user_id")
     db.notifications.create_index([("user_id", 1), ("is_read", 1)])
     db.notifications.create_index("created_at")
@@ -0,0 +1,641 @@
+"""
+Cold tier for the audit log: sealed, compressed archive segments.
+
+Old ranges of the chain are moved out of ``audit_logs`` into immutable
+gzip-compressed JSONL files of ``AUDIT_SEGMENT_SIZE`` entries each. A
+manifest document per segment in ``audit_segments`` records the sequence
+range, the boundary hashes (the ``previous_log_hash`` the segment chains
+onto and its last ``hash_of_entry``), the time range and the sha256 of
+the file.
+
+Only ranges that are covered by a signed verification checkpoint, already
+anchored in the Merkle tree, older than ``AUDIT_HOT_RETENTION_DAYS`` and
+behind the tail are sealed, so the append path never sees the archive.
+The manifest is written before the hot copies are deleted; a crash in
+between leaves duplicates that the next sealing run removes.
+
+Segment files go through the evidence storage backend (get_storage()) under
+``audit-archive/``, so every API instance can read them whatever the
+backend. Their names carry the segment_id, so a stray writer can never
+replace a published file. Sealing runs in a background thread
+(start_sealing) and under the ``audit_archive_seal`` lease, so only one
+process seals at a time; its last outcome is kept in ``audit_archive_state``.
+Segments sealed before the storage backend was used keep their files in
+AUDIT_ARCHIVE_FOLDER.
+
+Readers go through iter_chain() (sequence order, both tiers),
+find_archived() (newest first, for listings; pages stream segments and
+skip whole ones by their match counts) and find_logs() (oldest first, for
+timelines and reports). Archive entries are filtered
+in Python with matches(), which understands the small subset of MongoDB
+query syntax the audit code uses. Segments are pruned before they are
+opened on their sequence and time ranges and on the distinct
+``entity_id``/``user_id`` values each one holds, which are recorded in
+``audit_segment_keys`` (one document per field, value and segment, with
+the number of entries carrying it).
+``audit_archived_ids`` maps the log_id of every archived entry to its
+chain_sequence, so find_archived_log() opens just the one segment.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import heapq
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.audit.chain import DUPLICATE_KEY_ERROR, GENESIS_HASH, chain_timestamp
+from app.common.errors import APIError, ConflictError
+from app.common.leases import acquire_lease, new_holder, release_lease
+from app.evidence.storage import get_storage, local_copy
+
+FILE_READ_CHUNK = 1024 * 1024
+STORAGE_PREFIX = "audit-archive"
+SEAL_LEASE_NAME = "audit_archive_seal"
+SEAL_LEASE_SECONDS = 300
+SEGMENT_KEY_FIELDS = ("entity_id", "user_id")
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+class ArchiveIntegrityError(APIError):
+    def __init__(self, message, sequence):
+        super().__init__(message, 500)
+        self.sequence = sequence
+
+
+def start_sealing(app, sealed_by=None, max_segments=None):
+    """
+    Run seal_segments in a background thread; raises ConflictError if
+    another sealing run holds the lease.
+    """
+    from app.extensions import mongo
+
+    db = mongo.db
+    holder = new_holder()
+    if not acquire_lease(db, SEAL_LEASE_NAME, holder, SEAL_LEASE_SECONDS):
+        raise ConflictError("Audit archive sealing is already running")
+    _set_seal_state(db, status="running", started_at=datetime.now(timezone.utc), sealed_by=sealed_by,
+                    finished_at=None, sealed=0, error=None)
+
+    def run():
+        with app.app_context():
+            try:
+                sealed = seal_segments(db, sealed_by, max_segments, holder=holder)
+                _set_seal_state(db, status="completed", finished_at=datetime.now(timezone.utc), sealed=len(sealed))
+            except Exception as e:
+                print(f"ERROR: Sealing audit archive segments failed: {e}")
+                _set_seal_state(db, status="failed", finished_at=datetime.now(timezone.utc), error=str(e))
+
+    thread = threading.Thread(target=run, name="audit-archive-seal", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_seal_state(db):
+    return db.audit_archive_state.find_one({"_id": "seal"}, {"_id": 0})
+
+
+def seal_segments(db, sealed_by=None, max_segments=None, holder=None):
+    """
+    Move every sealable full segment out of the hot collection under the
+    sealing lease; returns the new manifests. Raises ConflictError if
+    another process holds the lease.
+    """
+    holder = holder or new_holder()
+    if not acquire_lease(db, SEAL_LEASE_NAME, holder, SEAL_LEASE_SECONDS):
+        raise ConflictError("Audit archive sealing is already running")
+    try:
+        return _seal_segments(db, sealed_by, max_segments, holder)
+    finally:
+        release_lease(db, SEAL_LEASE_NAME, holder)
+
+
+def _seal_segments(db, sealed_by, max_segments, holder):
+    from app.audit.chain import index_committed
+    from app.audit.checkpoints import get_latest_checkpoint
+    from app.audit.merkle import _tree_size
+    from app.audit.rollups import applied_through
+    from app.audit.services import _chain_length
+
+    storage = get_storage()
+    segment_size = current_app.config["AUDIT_SEGMENT_SIZE"]
+    cutoff = datetime.now(timezone.utc) - timedelta(days=current_app.config["AUDIT_HOT_RETENTION_DAYS"])
+
+    index_segment_keys(db)
+    # Only entries already anchored and rolled up leave the hot collection.
+    index_committed(db)
+    last = last_segment(db)
+    sealed_through = last["last_sequence"] if last else 0
+    previous_hash = last["last_hash"] if last else GENESIS_HASH
+    if sealed_through:
+        # Finish a run that wrote its manifest but died before deleting the hot copies.
+        db.audit_logs.delete_many({"chain_sequence": {"$lte": sealed_through}})
+
+    checkpoint = get_latest_checkpoint(db)
+    newest_old = db.audit_logs.find_one(
+        {"timestamp": {"$lt": cutoff}},
+        {"chain_sequence": 1},
+        sort=[("timestamp", -1), ("chain_sequence", -1)],
+    )
+    if not checkpoint or not newest_old:
+        return []
+    upper = min(
+        checkpoint["chain_sequence"],
+        _tree_size(db),
+        applied_through(db),
+        newest_old["chain_sequence"],
+        _chain_length(db) - 1,  # the tail always stays hot
+    )
+
+    manifests = []
+    while sealed_through + segment_size <= upper:
+        if max_segments is not None and len(manifests) >= max_segments:
+            break
+        if not acquire_lease(db, SEAL_LEASE_NAME, holder, SEAL_LEASE_SECONDS):
+            raise ConflictError("Lost the audit archive sealing lease")
+        manifest = _seal_range(
+            db, storage, sealed_through + 1, sealed_through + segment_size, previous_hash, sealed_by
+        )
+        manifests.append(manifest)
+        sealed_through = manifest["last_sequence"]
+        previous_hash = manifest["last_hash"]
+    return manifests
+
+
+def list_segments(db, newest_first=False):
+    return list(
+        db.audit_segments.find({}, {"_id": 0}).sort("first_sequence", -1 if newest_first else 1)
+    )
+
+
+def last_segment(db):
+    return db.audit_segments.find_one({}, {"_id": 0}, sort=[("first_sequence", -1)])
+
+
+def serialize_segment(segment):
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in segment.items()
+    }
+
+
+@contextmanager
+def segment_file(segment, storage=None, folder=None):
+    """
+    A local path to the segment's file: the storage object (downloaded to a
+    temp file if remote), or for older segments the file in ``folder``
+    (default AUDIT_ARCHIVE_FOLDER).
+    """
+    if "storage_key" not in segment:
+        yield os.path.join(folder or current_app.config["AUDIT_ARCHIVE_FOLDER"], segment["file_name"])
+        return
+    try:
+        with local_copy(segment["storage_key"], storage) as path:
+            yield path
+    except FileNotFoundError:
+        raise ArchiveIntegrityError(f"Archive segment {segment['file_name']} is missing", segment["first_sequence"])
+
+
+def read_segment(segment, verify=False, storage=None, folder=None):
+    """Yield a segment's entries in sequence order; ``verify`` checks the file checksum first."""
+    with segment_file(segment, storage, folder) as path:
+        expected = segment["file_sha256"] if verify else None
+        yield from read_segment_file(path, segment["first_sequence"], expected)
+
+
+def read_segment_file(path, first_sequence, expected_sha256=None):
+    """
+    Yield the entries of a segment file in sequence order. With
+    ``expected_sha256`` the file checksum is validated before anything is
+    yielded.
+    """
+    if not os.path.exists(path):
+        raise ArchiveIntegrityError(f"Archive segment {os.path.basename(path)} is missing", first_sequence)
+    if expected_sha256 and _file_sha256(path) != expected_sha256:
+        raise ArchiveIntegrityError(
+            f"Archive segment {os.path.basename(path)} does not match its recorded checksum", first_sequence
+        )
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            entry["timestamp"] = datetime.fromisoformat(entry["timestamp"])
+            yield entry
+
+
+def iter_chain(db, after_sequence=0, end_sequence=None, query=None, projection=None,
+               verify_files=False, batch_size=1000):
+    """
+    Entries with ``after_sequence < chain_sequence <= end_sequence`` from both
+    tiers in chain order, optionally filtered by ``query``.
+    """
+    bounds = {"chain_sequence": {"$gt": after_sequence}}
+    if end_sequence is not None:
+        bounds["chain_sequence"]["$lte"] = end_sequence
+
+    sealed_through = after_sequence
+    keyed = _keyed_segments(db, query) if query else None
+    for segment in list_segments(db):
+        sealed_through = max(sealed_through, segment["last_sequence"])
+        if not _segment_may_match(segment, bounds) or (query and not _segment_may_match(segment, query, keyed)):
+            continue
+        for entry in read_segment(segment, verify=verify_files):
+            if matches(entry, bounds) and (not query or matches(entry, query)):
+                yield _project(entry, projection)
+
+    if end_sequence is not None and sealed_through >= end_sequence:
+        return
+    hot_bounds = {"chain_sequence": dict(bounds["chain_sequence"], **{"$gt": sealed_through})}
+    hot_query = {"$and": [query, hot_bounds]} if query else hot_bounds
+    yield from (
+        db.audit_logs.find(hot_query, projection)
+        .sort("chain_sequence", 1)
+        .batch_size(batch_size)
+    )
+
+
+def find_archived(db, query=None, skip=0, limit=None):
+    """
+    Archived entries matching ``query``, newest first by (timestamp,
+    chain_sequence), after skipping ``skip`` of them and up to ``limit``.
+
+    Segments are streamed, never loaded whole: a segment whose match count
+    is known (unfiltered or single-key queries) is skipped without opening
+    it, and only the newest ``skip + limit`` matches of an opened one are
+    kept in memory.
+    """
+    keyed = _keyed_segments(db, query) if query else None
+    counts = _segment_match_counts(db, query)
+    for segment in list_segments(db, newest_first=True):
+        if limit is not None and limit <= 0:
+            return
+        if query and not _segment_may_match(segment, query, keyed):
+            continue
+        known = counts.get(segment["first_sequence"]) if counts is not None else None
+        if known is not None and skip >= known:
+            skip -= known
+            continue
+
+        matched = Counter()
+        entries = _matching(segment, query, matched)
+        if limit is None:
+            entries = sorted(entries, key=_newest_first, reverse=True)
+        else:
+            entries = heapq.nlargest(skip + limit, entries, key=_newest_first)
+        for entry in entries[skip:]:
+            yield entry
+            if limit is not None:
+                limit -= 1
+        skip = max(0, skip - matched["entries"])
+
+
+def _matching(segment, query, matched):
+    """A segment's entries matching ``query`` in sealed order, counted into ``matched``."""
+    for entry in read_segment(segment):
+        if not query or matches(entry, query):
+            matched["entries"] += 1
+            yield entry
+
+
+def _newest_first(entry):
+    return _normalize(entry["timestamp"]), entry["chain_sequence"]
+
+
+def count_archived(db, query=None):
+    """Number of archived entries matching ``query``, from the segment key counts where they are exact."""
+    keyed = _keyed_segments(db, query) if query else None
+    counts = _segment_match_counts(db, query)
+    total = 0
+    for segment in list_segments(db):
+        if query and not _segment_may_match(segment, query, keyed):
+            continue
+        known = counts.get(segment["first_sequence"]) if counts is not None else None
+        if known is None:
+            known = sum(1 for entry in read_segment(segment) if not query or matches(entry, query))
+        total += known
+    return total
+
+
+def find_logs(db, query, projection=None):
+    """
+    Entries matching ``query`` from both tiers, oldest first by (timestamp,
+    chain_sequence), with timestamps as aware UTC datetimes.
+    """
+    entries = list(iter_chain(db, query=query, projection=projection))
+    for entry in entries:
+        if "timestamp" in entry:
+            entry["timestamp"] = _normalize(entry["timestamp"])
+    entries.sort(key=lambda e: (e.get("timestamp") or _EPOCH, e.get("chain_sequence", 0)))
+    return entries
+
+
+def find_archived_log(db, log_id):
+    """Look up an archived entry by log_id, opening only the segment that holds it."""
+    ref = db.audit_archived_ids.find_one({"log_id": log_id}, {"_id": 0, "chain_sequence": 1})
+    if ref:
+        return find_entry(db, ref["chain_sequence"])
+    if db.audit_segments.find_one({"keys_indexed": {"$ne": True}}, {"_id": 1}):
+        # Segments sealed before the id map existed, until the next sealing run indexes them.
+        return next(find_archived(db, {"log_id": log_id}, limit=1), None)
+    return None
+
+
+def find_entry(db, chain_sequence):
+    """Look up one entry by sequence in whichever tier holds it."""
+    entry = db.audit_logs.find_one({"chain_sequence": chain_sequence}, {"_id": 0})
+    if entry:
+        return entry
+    segment = db.audit_segments.find_one(
+        {"first_sequence": {"$lte": chain_sequence}, "last_sequence": {"$gte": chain_sequence}}, {"_id": 0}
+    )
+    if not segment:
+        return None
+    for entry in read_segment(segment):
+        if entry["chain_sequence"] == chain_sequence:
+            return entry
+    return None
+
+
+def index_segment_keys(db):
+    """Record the key values and log ids of segments sealed before they were indexed."""
+    for segment in db.audit_segments.find({"keys_indexed": {"$ne": True}}, {"_id": 0}):
+        keys = {field: Counter() for field in SEGMENT_KEY_FIELDS}
+        log_ids = []
+        for entry in read_segment(segment):
+            _collect_keys(keys, entry)
+            log_ids.append((entry["log_id"], entry["chain_sequence"]))
+        _save_segment_keys(db, segment["first_sequence"], keys)
+        _save_archived_ids(db, log_ids)
+        db.audit_segments.update_one({"segment_id": segment["segment_id"]}, {"$set": {"keys_indexed": True}})
+
+
+def matches(entry, query):
+    """Evaluate a MongoDB-style filter (equality, $gt/$gte/$lt/$lte/$in/$ne, $and/$or) on a dict."""
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(entry, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(entry, part) for part in condition):
+                return False
+        elif isinstance(condition, dict) and any(op.startswith("$") for op in condition):
+            value = _normalize(entry.get(key))
+            for op, operand in condition.items():
+                if not _compare(op, value, operand):
+                    return False
+        elif _normalize(entry.get(key)) != _normalize(condition):
+            return False
+    return True
+
+
+def _seal_range(db, storage, first_sequence, last_sequence, previous_hash, sealed_by):
+    from app.audit.services import _check_entry
+
+    segment_id = str(uuid.uuid4())
+    file_name = f"audit-{first_sequence:012d}-{last_sequence:012d}-{segment_id}.jsonl.gz"
+    storage_key = f"{STORAGE_PREFIX}/{file_name}"
+    fd, temp_path = tempfile.mkstemp(suffix=".jsonl.gz")
+
+    cursor = (
+        db.audit_logs.find({"chain_sequence": {"$gte": first_sequence, "$lte": last_sequence}}, {"_id": 0})
+        .sort("chain_sequence", 1)
+        .batch_size(1000)
+    )
+    expected_previous = previous_hash
+    expected_sequence = first_sequence
+    start_time = end_time = None
+    keys = {field: Counter() for field in SEGMENT_KEY_FIELDS}
+    log_ids = []
+    try:
+        with os.fdopen(fd, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                for entry in cursor:
+                    # Refuse to seal anything that does not verify; the archive must be trustworthy.
+                    if entry["chain_sequence"] != expected_sequence:
+                        raise ArchiveIntegrityError("Gap in audit chain, refusing to seal", expected_sequence)
+                    error = _check_entry(entry, expected_previous)
+                    if error:
+                        raise ArchiveIntegrityError(f"{error}, refusing to seal", entry["chain_sequence"])
+
+                    _collect_keys(keys, entry)
+                    log_ids.append((entry["log_id"], entry["chain_sequence"]))
+                    timestamp = chain_timestamp(entry["timestamp"])
+                    start_time = start_time or timestamp
+                    end_time = timestamp
+                    entry["timestamp"] = timestamp
+                    f.write((json.dumps(entry, default=str, sort_keys=True) + "\n").encode("utf-8"))
+
+                    expected_previous = entry["hash_of_entry"]
+                    expected_sequence += 1
+            raw.flush()
+            os.fsync(raw.fileno())
+
+        if expected_sequence != last_sequence + 1:
+            raise ArchiveIntegrityError("Gap in audit chain, refusing to seal", expected_sequence)
+        file_size = os.path.getsize(temp_path)
+        file_sha256 = _file_sha256(temp_path)
+        storage.put_file(storage_key, temp_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    manifest = {
+        "segment_id": segment_id,
+        "first_sequence": first_sequence,
+        "last_sequence": last_sequence,
+        "entry_count": last_sequence - first_sequence + 1,
+        "first_previous_hash": previous_hash,
+        "last_hash": expected_previous,
+        "start_time": datetime.fromisoformat(start_time),
+        "end_time": datetime.fromisoformat(end_time),
+        "file_name": file_name,
+        "storage_key": storage_key,
+        "file_size": file_size,
+        "file_sha256": file_sha256,
+        "compression": "gzip",
+        "keys_indexed": True,
+        "sealed_by": sealed_by,
+        "sealed_at": datetime.now(timezone.utc),
+    }
+    # Keys go in first: a manifest must never be pruned on keys that were not recorded.
+    _save_segment_keys(db, first_sequence, keys)
+    _save_archived_ids(db, log_ids)
+    try:
+        db.audit_segments.insert_one(manifest)
+    except DuplicateKeyError:
+        # Another sealer published this range after losing the lease to us, or we to it.
+        storage.delete(storage_key)
+        raise ConflictError(f"Audit entries {first_sequence}-{last_sequence} were sealed concurrently")
+    manifest.pop("_id", None)
+    db.audit_logs.delete_many({"chain_sequence": {"$gte": first_sequence, "$lte": last_sequence}})
+    print(f"INFO: Sealed audit entries {first_sequence}-{last_sequence} into {file_name}")
+    return manifest
+
+
+def _segment_may_match(segment, query, keyed=None):
+    """
+    Cheap pruning on the manifest's sequence and time ranges, and on
+    ``keyed``: the first_sequence of every segment holding the key values
+    the query asks for (from _keyed_segments; None when it asks for none).
+    """
+    if keyed is not None and segment.get("keys_indexed") and segment["first_sequence"] not in keyed:
+        return False
+    ranges = {
+        "chain_sequence": (segment["first_sequence"], segment["last_sequence"]),
+        "timestamp": (_normalize(segment["start_time"]), _normalize(segment["end_time"])),
+    }
+    for key, (low, high) in ranges.items():
+        condition = query.get(key)
+        if not isinstance(condition, dict):
+            continue
+        condition = {op: _normalize(value) for op, value in condition.items()}
+        if "$gt" in condition and high <= condition["$gt"]:
+            return False
+        if "$gte" in condition and high < condition["$gte"]:
+            return False
+        if "$lt" in condition and low >= condition["$lt"]:
+            return False
+        if "$lte" in condition and low > condition["$lte"]:
+            return False
+    return True
+
+
+def _keyed_segments(db, query):
+    """
+    first_sequence of the segments that can hold entries matching the
+    query's equality/$in conditions on SEGMENT_KEY_FIELDS, or None if it
+    has none.
+    """
+    keyed = None
+    for field, values in _key_conditions(query):
+        found = {
+            doc["first_sequence"]
+            for doc in db.audit_segment_keys.find(
+                {"field": field, "value": {"$in": values}}, {"_id": 0, "first_sequence": 1}
+            )
+        }
+        keyed = found if keyed is None else keyed & found
+    return keyed
+
+
+def _segment_match_counts(db, query):
+    """
+    {first_sequence: number of matching entries} for queries whose counts
+    the manifests and key documents give exactly: no filter, or a single
+    equality on one of SEGMENT_KEY_FIELDS. None otherwise. Segments missing
+    from the map are opened and counted.
+    """
+    if not query:
+        return {s["first_sequence"]: s["entry_count"] for s in list_segments(db)}
+    if len(query) != 1:
+        return None
+    (field, value), = query.items()
+    if field not in SEGMENT_KEY_FIELDS or not isinstance(value, str):
+        return None
+    counts = {}
+    for doc in db.audit_segment_keys.find({"field": field, "value": value}, {"_id": 0}):
+        if "count" in doc:  # key documents recorded before counts were kept have none
+            counts[doc["first_sequence"]] = doc["count"]
+    return counts
+
+
+def _key_conditions(query):
+    for key, condition in query.items():
+        if key == "$and":
+            for part in condition:
+                yield from _key_conditions(part)
+        elif key in SEGMENT_KEY_FIELDS:
+            if isinstance(condition, str):
+                yield key, [condition]
+            elif isinstance(condition, dict) and list(condition) == ["$in"]:
+                yield key, list(condition["$in"])
+
+
+def _collect_keys(keys, entry):
+    for field, counts in keys.items():
+        if entry.get(field) is not None:
+            counts[entry[field]] += 1
+
+
+def _save_segment_keys(db, first_sequence, keys):
+    docs = [
+        {"field": field, "value": value, "first_sequence": first_sequence, "count": counts[value]}
+        for field, counts in keys.items() for value in sorted(counts)
+    ]
+    _insert_new(db.audit_segment_keys, docs)
+
+
+def _save_archived_ids(db, log_ids):
+    _insert_new(db.audit_archived_ids, [
+        {"log_id": log_id, "chain_sequence": sequence} for log_id, sequence in log_ids
+    ])
+
+
+def _insert_new(collection, docs):
+    if not docs:
+        return
+    try:
+        collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        # A rerun after a crash finds some of them already there.
+        if any(err.get("code") != DUPLICATE_KEY_ERROR for err in e.details.get("writeErrors", [])):
+            raise
+
+
+def _compare(op, value, operand):
+    if op == "$in":
+        return value in [_normalize(v) for v in operand]
+    if op == "$ne":
+        return value != _normalize(operand)
+    if value is None:
+        return False
+    operand = _normalize(operand)
+    if op == "$gt":
+        return value > operand
+    if op == "$gte":
+        return value >= operand
+    if op == "$lt":
+        return value < operand
+    if op == "$lte":
+        return value <= operand
+    raise ValueError(f"Unsupported operator {op}")
+
+
+def _normalize(value):
+    # Hot-tier datetimes come back naive UTC, archived ones are aware.
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _project(entry, projection):
+    if not projection:
+        return entry
+    entry = dict(entry)
+    entry.pop("_id", None)
+    included = [key for key, value in projection.items() if value and key != "_id"]
+    if included:
+        return {key: entry[key] for key in included if key in entry}
+    for key, value in projection.items():
+        if not value:
+            entry.pop(key, None)
+    return entry
+
+
+def _set_seal_state(db, **fields):
+    db.audit_archive_state.update_one({"_id": "seal"}, {"$set": fields}, upsert=True)
+
+
+def _file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(FILE_READ_CHUNK), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
@@ -0,0 +1,172 @@
+"""
+Audit chain append engine.
+
+Assigns ``chain_sequence`` and ``previous_log_hash`` to new audit entries
+and inserts them. The unique index on ``chain_sequence`` is the commit
+point: a writer that loses a race against another gunicorn worker gets a
+duplicate key error, re-reads the tail of the chain and tries again, so
+links are never duplicated or dropped.
+
+Within a worker, appends are serialized by a lock and the tail that was
+just written is remembered for a few seconds, so an uncontended append
+costs a single insert instead of a sorted read plus an insert. Batches
+from the group-commit writer are chained together and flushed with one
+``insert_many``.
+
+Anchoring committed entries in the audit Merkle tree and folding them into
+the per-entity rollups is kept off the append path: both follow the chain
+by ``chain_sequence`` and are caught up by index_committed, which the
+audit writer thread runs after each batch and which readers and the
+archive sealer run before relying on them.
+"""
+
+import hashlib
+import threading
+import time
+from datetime import timezone
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.common.errors import APIError
+
+GENESIS_HASH = "GENESIS_0000000000000000000000000000000000000000000000000000000000000000"
+
+DUPLICATE_KEY_ERROR = 11000
+MAX_APPEND_RETRIES = 20
+TAIL_CACHE_SECONDS = 5.0
+
+_append_lock = threading.Lock()
+_cached_tail = None  # (sequence, hash_of_entry, cached_at)
+
+
+def compute_entry_hash(action, entity_id, user_id, details, timestamp_iso, previous_hash):
+    """Deterministic SHA-256 over the chained fields of an audit entry."""
+    hash_input = f"{action}|{entity_id}|{user_id}|{details}|{timestamp_iso}|{previous_hash}"
+    return hashlib.sha256(hash_input.encode("utf-8")).hexdigest()
+
+
+def chain_timestamp(timestamp):
+    """
+    ISO form of an entry timestamp as it is fed into the entry hash.
+
+    MongoDB stores datetimes with millisecond precision and hands them back
+    naive, so the value is normalized to UTC milliseconds on both the write
+    and the verify side.
+    """
+    if isinstance(timestamp, str):
+        return timestamp
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.replace(microsecond=timestamp.microsecond // 1000 * 1000).isoformat()
+
+
+def append_entry(db, entry):
+    """
+    Chain ``entry`` onto the tail of the audit log and insert it.
+
+    ``entry`` carries everything except the chain fields; ``chain_sequence``,
+    ``previous_log_hash`` and ``hash_of_entry`` are filled in here.
+    """
+    return append_entries(db, [entry])[0]
+
+
+def append_entries(db, entries):
+    """
+    Chain a batch of entries onto the tail in order and insert them with a
+    single ordered ``insert_many``.
+
+    If another worker claims part of the sequence range first, the entries
+    that did land stay committed and the rest are re-chained onto the new
+    tail and retried.
+    """
+    if not entries:
+        return entries
+    for entry in entries:
+        timestamp = entry["timestamp"]
+        entry["timestamp"] = timestamp.replace(microsecond=timestamp.microsecond // 1000 * 1000)
+
+    pending = list(entries)
+    with _append_lock:
+        sequence, previous_hash = _get_tail(db)
+
+        for _ in range(MAX_APPEND_RETRIES):
+            for entry in pending:
+                entry.pop("_id", None)
+                sequence += 1
+                entry["chain_sequence"] = sequence
+                entry["previous_log_hash"] = previous_hash
+                entry["hash_of_entry"] = compute_entry_hash(
+                    entry["action"], entry["entity_id"], entry["user_id"],
+                    entry["details"], chain_timestamp(entry["timestamp"]), previous_hash,
+                )
+                previous_hash = entry["hash_of_entry"]
+
+            try:
+                if len(pending) == 1:
+                    db.audit_logs.insert_one(pending[0])
+                else:
+                    db.audit_logs.insert_many(pending, ordered=True)
+            except DuplicateKeyError:
+                pass
+            except BulkWriteError as e:
+                if any(err.get("code") != DUPLICATE_KEY_ERROR for err in e.details.get("writeErrors", [])):
+                    raise
+                pending = pending[e.details.get("nInserted", 0):]
+            else:
+                _remember_tail(sequence, previous_hash)
+                break
+
+            # Another worker claimed this sequence first; resync from the log itself.
+            sequence, previous_hash = _read_tail(db)
+        else:
+            _forget_tail()
+            raise APIError("Audit log is busy, please retry", 503)
+
+    return entries
+
+
+def index_committed(db):
+    """
+    Extend the Merkle tree and the rollups over every committed entry they
+    do not cover yet; a failure here is caught up on the next call.
+    """
+    from app.audit.merkle import extend_audit_tree
+    from app.audit.rollups import catch_up_rollups
+    try:
+        extend_audit_tree(db)
+    except Exception as e:
+        print(f"WARNING: Failed to extend audit Merkle tree: {e}")
+    try:
+        catch_up_rollups(db)
+    except Exception as e:
+        print(f"WARNING: Failed to update audit rollups: {e}")
+
+
+def _get_tail(db):
+    """Return (sequence, hash) of the chain tail, using the cached tail when fresh."""
+    if _cached_tail is not None:
+        sequence, hash_of_entry, cached_at = _cached_tail
+        if time.monotonic() - cached_at < TAIL_CACHE_SECONDS:
+            return sequence, hash_of_entry
+    return _read_tail(db)
+
+
+def _read_tail(db):
+    last_entry = db.audit_logs.find_one(
+        sort=[("chain_sequence", -1)],
+        projection={"chain_sequence": 1, "hash_of_entry": 1},
+    )
+    if last_entry:
+        return last_entry["chain_sequence"], last_entry["hash_of_entry"]
+    return 0, GENESIS_HASH
+
+
+def _remember_tail(sequence, hash_of_entry):
+    global _cached_tail
+    _cached_tail = (sequence, hash_of_entry, time.monotonic())
+
+
+def _forget_tail():
+    global _cached_tail
+    _cached_tail = None
@@ -0,0 +1,73 @@
+"""
+Signed verification checkpoints for the audit chain.
+
+After a successful verification the last verified (chain_sequence,
+hash_of_entry) pair is stored in ``audit_checkpoints`` together with an
+HMAC over it, so the next verification only has to walk entries appended
+since then. A checkpoint whose signature does not validate is ignored.
+
+Checkpoints are signed with AUDIT_CHECKPOINT_KEY, or SECRET_KEY when that
+is unset; rotating the key in use invalidates every checkpoint, so the
+next verification walks the whole chain again.
+"""
+
+import hashlib
+import hmac
+import uuid
+from datetime import datetime, timezone
+
+from flask import current_app
+
+
+def check_checkpoint_key(app):
+    """Warn at startup when checkpoints are signed with SECRET_KEY; returns whether a dedicated key is set."""
+    if app.config.get("AUDIT_CHECKPOINT_KEY"):
+        return True
+    print(
+        "WARNING: AUDIT_CHECKPOINT_KEY is not set; audit checkpoints are signed with SECRET_KEY, "
+        "so rotating it invalidates every checkpoint"
+    )
+    return False
+
+
+def get_latest_checkpoint(db):
+    """Return the most recent checkpoint with a valid signature, or None."""
+    for checkpoint in db.audit_checkpoints.find({}, {"_id": 0}).sort("chain_sequence", -1).limit(5):
+        if hmac.compare_digest(checkpoint.get("signature", ""), _sign(checkpoint)):
+            return checkpoint
+        print(f"WARNING: Ignoring audit checkpoint {checkpoint.get('checkpoint_id')} with invalid signature")
+    return None
+
+
+def save_checkpoint(db, chain_sequence, hash_of_entry, entries_verified, verified_by=None):
+    """Record a signed checkpoint at ``chain_sequence``."""
+    checkpoint = {
+        "checkpoint_id": str(uuid.uuid4()),
+        "chain_sequence": chain_sequence,
+        "hash_of_entry": hash_of_entry,
+        "entries_verified": entries_verified,
+        "verified_by": verified_by,
+        "created_at": datetime.now(timezone.utc),
+    }
+    checkpoint["signature"] = _sign(checkpoint)
+    db.audit_checkpoints.insert_one(checkpoint)
+    checkpoint.pop("_id", None)
+    return checkpoint
+
+
+def serialize_checkpoint(checkpoint):
+    if not checkpoint:
+        return None
+    return {
+        "checkpoint_id": checkpoint["checkpoint_id"],
+        "chain_sequence": checkpoint["chain_sequence"],
+        "hash_of_entry": checkpoint["hash_of_entry"],
+        "created_at": checkpoint["created_at"].isoformat()
+        if isinstance(checkpoint.get("created_at"), datetime) else checkpoint.get("created_at"),
+    }
+
+
+def _sign(checkpoint):
+    key = current_app.config.get("AUDIT_CHECKPOINT_KEY") or current_app.config["SECRET_KEY"]
+    message = f"{checkpoint['checkpoint_id']}|{checkpoint['chain_sequence']}|{checkpoint['hash_of_entry']}"
+    return hmac.new(key.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
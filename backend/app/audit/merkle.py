@@ -0,0 +1,183 @@
+"""
+Merkle tree anchoring over the audit chain.
+
+Leaf ``i`` of the tree is ``hash_of_entry`` of the entry with
+``chain_sequence == i + 1``. Only perfect subtrees are stored (in
+``audit_merkle_nodes``); the tree is extended after appends (see
+app.audit.chain.index_committed) and before it is read, so an inclusion
+proof for any entry or a consistency proof between two tree sizes is a
+handful of node lookups instead of a walk of the chain.
+
+Node values are deterministic, so concurrent extenders in different
+workers write identical documents; the tree size in ``audit_merkle_state``
+only moves forward via compare-and-set.
+"""
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.audit.archive import find_archived_log
+from app.audit.chain import DUPLICATE_KEY_ERROR
+from app.common import merkle
+from app.common.errors import NotFoundError, ValidationError
+from app.extensions import mongo
+
+STATE_ID = "audit"
+EXTEND_BATCH_SIZE = 1000
+
+
+def extend_audit_tree(db):
+    """Append committed audit entries that are not yet in the tree."""
+    while True:
+        state = db.audit_merkle_state.find_one({"_id": STATE_ID}) or {}
+        size = state.get("size", 0)
+
+        entries = list(
+            db.audit_logs.find(
+                {"chain_sequence": {"$gt": size}},
+                {"_id": 0, "chain_sequence": 1, "hash_of_entry": 1},
+            )
+            .sort("chain_sequence", 1)
+            .limit(EXTEND_BATCH_SIZE)
+        )
+        if not entries:
+            return size
+
+        nodes = _NodeCache(db, merkle.peak_positions(size))
+        new_size = size
+        for entry in entries:
+            if entry["chain_sequence"] != new_size + 1:
+                break  # stop at a gap; the missing entry is still being written
+            leaf = merkle.leaf_hash(bytes.fromhex(entry["hash_of_entry"]))
+            for level, index, value in merkle.completed_nodes(new_size, leaf, nodes.get):
+                nodes.put(level, index, value)
+            new_size += 1
+
+        if new_size == size:
+            return size
+
+        nodes.flush()
+        if not _advance_size(db, size, new_size) or len(entries) < EXTEND_BATCH_SIZE:
+            return new_size
+
+
+def get_tree_head():
+    db = mongo.db
+    extend_audit_tree(db)
+    size = _tree_size(db)
+    return {"tree_size": size, "root_hash": _root(db, size).hex()}
+
+
+def get_inclusion_proof(log_id, tree_size=None):
+    """Audit path proving that entry ``log_id`` is leaf ``chain_sequence - 1`` of the tree."""
+    db = mongo.db
+    entry = db.audit_logs.find_one(
+        {"log_id": log_id}, {"_id": 0, "log_id": 1, "chain_sequence": 1, "hash_of_entry": 1}
+    )
+    if not entry:
+        entry = find_archived_log(db, log_id)
+    if not entry:
+        raise NotFoundError("Audit log entry not found")
+
+    extend_audit_tree(db)
+    current_size = _tree_size(db)
+    tree_size = tree_size or current_size
+    leaf_index = entry["chain_sequence"] - 1
+    if leaf_index >= current_size:
+        raise ValidationError("Entry is not yet anchored in the Merkle tree, retry shortly")
+    if not leaf_index < tree_size <= current_size:
+        raise ValidationError(f"tree_size must be between {leaf_index + 1} and {current_size}")
+
+    get_node = _NodeCache(db).get
+    return {
+        "log_id": entry["log_id"],
+        "chain_sequence": entry["chain_sequence"],
+        "hash_of_entry": entry["hash_of_entry"],
+        "leaf_index": leaf_index,
+        "leaf_hash": merkle.leaf_hash(bytes.fromhex(entry["hash_of_entry"])).hex(),
+        "tree_size": tree_size,
+        "root_hash": merkle.root_hash(tree_size, get_node).hex(),
+        "audit_path": [h.hex() for h in merkle.inclusion_path(leaf_index, tree_size, get_node)],
+    }
+
+
+def get_consistency_proof(first, second=None):
+    """Proof that the tree at size ``first`` is a prefix of the tree at size ``second``."""
+    db = mongo.db
+    extend_audit_tree(db)
+    current_size = _tree_size(db)
+    second = second or current_size
+    if not 0 < first <= second <= current_size:
+        raise ValidationError(f"Sizes must satisfy 0 < first <= second <= {current_size}")
+
+    get_node = _NodeCache(db).get
+    return {
+        "first": first,
+        "second": second,
+        "first_root": merkle.root_hash(first, get_node).hex(),
+        "second_root": merkle.root_hash(second, get_node).hex(),
+        "proof": [h.hex() for h in merkle.consistency_proof(first, second, get_node)],
+    }
+
+
+def _tree_size(db):
+    state = db.audit_merkle_state.find_one({"_id": STATE_ID})
+    return state["size"] if state else 0
+
+
+def _root(db, size):
+    return merkle.root_hash(size, _NodeCache(db).get)
+
+
+def _advance_size(db, old_size, new_size):
+    """Compare-and-set the tree size; False if another worker moved it first."""
+    if old_size == 0:
+        try:
+            db.audit_merkle_state.insert_one({"_id": STATE_ID, "size": new_size})
+            return True
+        except DuplicateKeyError:
+            pass
+    result = db.audit_merkle_state.update_one(
+        {"_id": STATE_ID, "size": old_size}, {"$set": {"size": new_size}}
+    )
+    return result.modified_count == 1
+
+
+class _NodeCache:
+    """Read-through cache of stored nodes, with writes buffered until flush()."""
+
+    def __init__(self, db, preload=()):
+        self.db = db
+        self.nodes = {}
+        self.pending = {}
+        if preload:
+            query = {"$or": [{"level": level, "index": index} for level, index in preload]}
+            for doc in db.audit_merkle_nodes.find(query, {"_id": 0}):
+                self.nodes[(doc["level"], doc["index"])] = bytes.fromhex(doc["hash"])
+
+    def get(self, level, index):
+        key = (level, index)
+        if key not in self.nodes:
+            doc = self.db.audit_merkle_nodes.find_one({"level": level, "index": index}, {"_id": 0, "hash": 1})
+            if not doc:
+                raise NotFoundError(f"Merkle node ({level}, {index}) is missing")
+            self.nodes[key] = bytes.fromhex(doc["hash"])
+        return self.nodes[key]
+
+    def put(self, level, index, value):
+        self.nodes[(level, index)] = value
+        self.pending[(level, index)] = value
+
+    def flush(self):
+        if not self.pending:
+            return
+        try:
+            self.db.audit_merkle_nodes.bulk_write([
+                UpdateOne({"level": level, "index": index}, {"$set": {"hash": value.hex()}}, upsert=True)
+                for (level, index), value in self.pending.items()
+            ], ordered=False)
+        except BulkWriteError as e:
+            # Racing upserts of the same node from another worker carry the same value.
+            if any(err.get("code") != DUPLICATE_KEY_ERROR for err in e.details.get("writeErrors", [])):
+                raise
+        self.pending = {}
@@ -0,0 +1,203 @@
+"""
+Parallel segmented verification of the audit hash chain.
+
+Every entry stores its own ``previous_log_hash``, so contiguous sequence
+ranges can be verified independently: each segment checks its entries'
+self hashes and the links inside the segment, and the segments are then
+stitched by comparing each segment's first ``previous_log_hash`` with the
+last hash of the segment before it. Sealed archive segments are verified
+straight from their files. Segments run in a process pool; each worker
+opens its own MongoDB connection.
+"""
+
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+
+from app.audit.archive import ArchiveIntegrityError, list_segments, read_segment
+from app.audit.chain import GENESIS_HASH
+from app.audit.checkpoints import save_checkpoint, serialize_checkpoint
+from app.evidence.storage import get_storage
+from app.extensions import mongo
+
+MIN_SEGMENT_SIZE = 10000
+
+
+def verify_chain_parallel(workers=None, verified_by=None):
+    """Verify the full chain across a process pool and report the earliest break."""
+    db = mongo.db
+    started = time.monotonic()
+
+    workers = max(1, workers or current_app.config.get("AUDIT_VERIFY_WORKERS") or os.cpu_count() or 1)
+    archived = list_segments(db)
+    sealed_through = archived[-1]["last_sequence"] if archived else 0
+    first = db.audit_logs.find_one(
+        {"chain_sequence": {"$gt": sealed_through}}, sort=[("chain_sequence", 1)], projection={"chain_sequence": 1}
+    )
+    last = db.audit_logs.find_one(sort=[("chain_sequence", -1)], projection={"chain_sequence": 1})
+    if not first and not archived:
+        return {"intact": True, "mode": "parallel", "total_entries": 0, "entries_verified": 0}
+
+    # Sealed archive segments are natural work units; the hot range is split after them.
+    storage, folder = get_storage(), current_app.config["AUDIT_ARCHIVE_FOLDER"]
+    segments = [("archive", s, storage, folder) for s in archived]
+    if first:
+        mongo_uri = current_app.config["MONGO_URI"]
+        segments += [
+            ("hot", mongo_uri, start, end)
+            for start, end in _plan_segments(first["chain_sequence"], last["chain_sequence"], workers)
+        ]
+
+    with _make_pool(min(workers, len(segments))) as pool:
+        futures = [
+            pool.submit(_verify_archive_segment if kind == "archive" else _verify_segment, *args)
+            for kind, *args in segments
+        ]
+        results = [f.result() for f in futures]
+
+    elapsed = time.monotonic() - started
+    entries_verified = sum(r["entries"] for r in results)
+    result = {
+        "intact": True,
+        "mode": "parallel",
+        "entries_verified": entries_verified,
+        "throughput": {
+            "workers": min(workers, len(segments)),
+            "segments": len(segments),
+            "elapsed_seconds": round(elapsed, 3),
+            "entries_per_second": round(entries_verified / elapsed, 1) if elapsed > 0 else None,
+            "slowest_segment_seconds": max(r["elapsed_seconds"] for r in results),
+        },
+    }
+
+    # Stitch segments in sequence order; the first problem found is the earliest break.
+    expected_previous = GENESIS_HASH
+    last_sequence = 0
+    for segment in results:
+        if segment["first_sequence"] is None:
+            continue
+        if segment["first_previous"] is not None and segment["first_previous"] != expected_previous:
+            result.update({
+                "intact": False,
+                "broken_at": segment["first_sequence"],
+                "error": "Previous hash mismatch",
+            })
+            break
+        if segment["broken_at"] is not None:
+            result.update({
+                "intact": False,
+                "broken_at": segment["broken_at"],
+                "error": segment["error"],
+            })
+            break
+        expected_previous = segment["last_hash"]
+        last_sequence = segment["last_sequence"]
+
+    result["total_entries"] = last["chain_sequence"] if last else sealed_through
+    if result["intact"]:
+        result["new_checkpoint"] = serialize_checkpoint(
+            save_checkpoint(db, last_sequence, expected_previous, entries_verified, verified_by)
+        )
+    return result
+
+
+def _make_pool(workers):
+    # Spawn rather than fork: the parent runs the audit writer and pymongo threads.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _connect(mongo_uri):
+    """A worker's own MongoDB client."""
+    import certifi
+    from pymongo import MongoClient
+
+    return MongoClient(mongo_uri, tlsCAFile=certifi.where())
+
+
+def _plan_segments(first_sequence, last_sequence, workers):
+    """Split [first, last] into a few segments per worker for load balancing."""
+    total = last_sequence - first_sequence + 1
+    size = max(MIN_SEGMENT_SIZE, math.ceil(total / (workers * 4)))
+    return [
+        (start, min(start + size - 1, last_sequence))
+        for start in range(first_sequence, last_sequence + 1, size)
+    ]
+
+
+def _verify_segment(mongo_uri, start, end):
+    """Worker: verify hot entries with start <= chain_sequence <= end."""
+    from app.audit.services import VERIFY_BATCH_SIZE, VERIFY_PROJECTION
+
+    started = time.monotonic()
+    client = _connect(mongo_uri)
+    try:
+        cursor = (
+            client.get_default_database().audit_logs
+            .find({"chain_sequence": {"$gte": start, "$lte": end}}, VERIFY_PROJECTION)
+            .sort("chain_sequence", 1)
+            .batch_size(VERIFY_BATCH_SIZE)
+        )
+        segment = _walk(cursor, start, end)
+    finally:
+        client.close()
+
+    segment["elapsed_seconds"] = round(time.monotonic() - started, 3)
+    return segment
+
+
+def _verify_archive_segment(manifest, storage, folder):
+    """Worker: verify a sealed archive segment file, checksum first."""
+    started = time.monotonic()
+    first_sequence = manifest["first_sequence"]
+    entries = read_segment(manifest, verify=True, storage=storage, folder=folder)
+    try:
+        segment = _walk(entries, first_sequence, None)
+    except ArchiveIntegrityError as e:
+        segment = _walk([], first_sequence, None)
+        segment.update({
+            "first_sequence": first_sequence,
+            "first_previous": None,
+            "broken_at": e.sequence,
+            "error": e.message,
+        })
+    segment["elapsed_seconds"] = round(time.monotonic() - started, 3)
+    return segment
+
+
+def _walk(entries, start, end):
+    from app.audit.services import _check_entry
+
+    segment = {
+        "start": start,
+        "end": end,
+        "entries": 0,
+        "first_sequence": None,
+        "first_previous": None,
+        "last_sequence": None,
+        "last_hash": None,
+        "broken_at": None,
+        "error": None,
+    }
+    expected_previous = None
+    for entry in entries:
+        if expected_previous is None:
+            # The link into this segment is checked when segments are stitched.
+            expected_previous = entry["previous_log_hash"]
+            segment["first_sequence"] = entry["chain_sequence"]
+            segment["first_previous"] = expected_previous
+
+        error = _check_entry(entry, expected_previous)
+        if error:
+            segment["broken_at"] = entry["chain_sequence"]
+            segment["error"] = error
+            break
+
+        expected_previous = entry["hash_of_entry"]
+        segment["entries"] += 1
+        segment["last_sequence"] = entry["chain_sequence"]
+        segment["last_hash"] = expected_previous
+    return segment
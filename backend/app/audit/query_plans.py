@@ -0,0 +1,93 @@
+"""
+Declared index plan for ``audit_logs`` and a startup check of its coverage.
+
+Every query shape the application runs against the audit log is registered
+in QUERY_SHAPES next to the index meant to serve it. Equality filters lead
+each compound index and the sort keys follow, so filtered listings are
+index range scans in sort order rather than in-memory sorts. At startup
+check_query_plans() explain()s each shape and warns when the winning plan
+still contains a COLLSCAN or blocking SORT stage, which catches a new query
+that was added without a matching index.
+"""
+
+from datetime import datetime, timezone
+
+AUDIT_INDEXES = [
+    ([("chain_sequence", 1)], {"unique": True}),
+    ([("log_id", 1)], {}),
+    ([("timestamp", -1), ("chain_sequence", -1)], {}),
+    ([("entity_type", 1), ("entity_id", 1), ("timestamp", -1), ("chain_sequence", -1)], {}),
+    ([("entity_type", 1), ("timestamp", -1), ("chain_sequence", -1)], {}),
+    ([("action", 1), ("timestamp", -1), ("chain_sequence", -1)], {}),
+    ([("user_id", 1), ("timestamp", -1), ("chain_sequence", -1)], {}),
+    ([("entity_id", 1), ("action", 1), ("timestamp", 1)], {}),
+]
+
+LOG_ORDER = [("timestamp", -1), ("chain_sequence", -1)]
+
+_SAMPLE_TIME = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+# (name, filter, sort) for every audit_logs query the application issues.
+QUERY_SHAPES = [
+    ("list", {}, LOG_ORDER),
+    ("list_by_entity", {"entity_type": "evidence", "entity_id": "x"}, LOG_ORDER),
+    ("list_by_entity_type", {"entity_type": "evidence"}, LOG_ORDER),
+    ("list_by_action", {"action": "x"}, LOG_ORDER),
+    ("list_by_user", {"user_id": "x"}, LOG_ORDER),
+    ("list_after_cursor", {
+        "entity_type": "evidence",
+        "entity_id": "x",
+        "timestamp": {"$lte": _SAMPLE_TIME},
+        "$or": [
+            {"timestamp": {"$lt": _SAMPLE_TIME}},
+            {"chain_sequence": {"$lt": 1}},
+        ],
+    }, LOG_ORDER),
+    ("entity_history", {"entity_type": "evidence", "entity_id": "x"}, [("timestamp", 1)]),
+    ("case_timeline", {
+        "entity_id": {"$in": ["x", "y"]},
+        "action": {"$in": ["evidence_verified", "evidence_verification_failed"]},
+    }, [("timestamp", 1)]),
+    ("recent_activity", {"timestamp": {"$gte": _SAMPLE_TIME}}, None),
+    ("chain_walk", {"chain_sequence": {"$gt": 0}}, [("chain_sequence", 1)]),
+    ("export_range", {"timestamp": {"$gte": _SAMPLE_TIME}, "chain_sequence": {"$gte": 1}}, [("chain_sequence", 1)]),
+    ("by_log_id", {"log_id": "x"}, None),
+]
+
+BAD_STAGES = ("COLLSCAN", "SORT")
+
+
+def create_audit_indexes(db):
+    for keys, options in AUDIT_INDEXES:
+        db.audit_logs.create_index(keys, **options)
+
+
+def check_query_plans(db):
+    """Explain every registered query shape; return the names of those that are not index-backed."""
+    uncovered = []
+    for name, query, sort in QUERY_SHAPES:
+        cursor = db.audit_logs.find(query, {"_id": 0})
+        if sort:
+            cursor = cursor.sort(sort)
+        try:
+            plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        except Exception as e:
+            print(f"WARNING: Could not explain audit query '{name}': {e}")
+            continue
+
+        stages = [stage for stage in _stages(plan) if stage in BAD_STAGES]
+        if stages:
+            print(f"WARNING: Audit query '{name}' is not index-backed (plan has {', '.join(stages)})")
+            uncovered.append(name)
+    return uncovered
+
+
+def _stages(plan):
+    """Stage names in an explain() plan tree, classic or slot-based engine."""
+    plan = plan.get("queryPlan", plan)
+    stages = [plan.get("stage")]
+    if "inputStage" in plan:
+        stages += _stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        stages += _stages(child)
+    return stages
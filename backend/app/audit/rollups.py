@@ -0,0 +1,244 @@
+"""
+Per-entity audit rollups.
+
+One document per (entity_type, entity_id) in ``audit_rollups`` holds the
+action counts, first/last timestamps, the set of users involved and the
+view count for that entity. catch_up_rollups folds committed entries in
+with $inc/$min/$max/$addToSet, so summaries and trust scores read a single
+small document instead of the entity's whole log history (which may by now
+live partly in the sealed archive).
+
+Rollups follow the chain by ``chain_sequence``, like the Merkle tree: the
+applied high-water mark lives in ``audit_rollup_state`` and every rollup
+records the ``last_sequence`` folded into it, so entries are applied
+exactly once whichever append committed them (including the part of a
+failed batch that landed before the error). Catching up runs after appends
+in the audit writer thread, before sealing and before a rollup is read, in
+one process at a time under the ``audit_rollups`` lease.
+
+rebuild_rollups() recomputes rollups from the chain and marks the result
+``complete``. The incremental upsert never sets that flag, so a rollup it
+created for an entity whose history predates rollups (or a missing one) is
+rebuilt on first read.
+"""
+
+from datetime import datetime
+
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.common.leases import acquire_lease, new_holder, release_lease
+
+VIEW_ACTIONS = ("evidence_viewed",)
+STATE_ID = "rollups"
+CATCH_UP_BATCH_SIZE = 1000
+LEASE_NAME = "audit_rollups"
+LEASE_SECONDS = 60
+DUPLICATE_KEY_ERROR = 11000
+ENTRY_FIELDS = {
+    "_id": 0, "chain_sequence": 1, "entity_type": 1, "entity_id": 1, "action": 1, "user_id": 1, "timestamp": 1,
+}
+
+
+def catch_up_rollups(db):
+    """
+    Fold every committed entry past the high-water mark into the rollups;
+    returns the new mark, or None if another process is catching up.
+    """
+    from app.audit.archive import last_segment
+
+    holder = new_holder()
+    if not acquire_lease(db, LEASE_NAME, holder, LEASE_SECONDS):
+        return None
+    try:
+        while True:
+            last = last_segment(db)
+            # Sealed entries were applied before sealing (or predate this mark and need a rebuild).
+            applied = max(applied_through(db), last["last_sequence"] if last else 0)
+            entries = list(
+                db.audit_logs.find({"chain_sequence": {"$gt": applied}}, ENTRY_FIELDS)
+                .sort("chain_sequence", 1)
+                .limit(CATCH_UP_BATCH_SIZE)
+            )
+            committed = []
+            for entry in entries:
+                if entry["chain_sequence"] != applied + len(committed) + 1:
+                    break  # stop at a gap; the missing entry is still being written
+                committed.append(entry)
+            if committed:
+                apply_to_rollups(db, committed)
+                applied = committed[-1]["chain_sequence"]
+                db.audit_rollup_state.update_one({"_id": STATE_ID}, {"$max": {"sequence": applied}}, upsert=True)
+            if len(committed) < CATCH_UP_BATCH_SIZE or not acquire_lease(db, LEASE_NAME, holder, LEASE_SECONDS):
+                return applied
+    finally:
+        release_lease(db, LEASE_NAME, holder)
+
+
+def applied_through(db):
+    """chain_sequence up to which every entry is folded into the rollups."""
+    state = db.audit_rollup_state.find_one({"_id": STATE_ID})
+    return state["sequence"] if state else 0
+
+
+def apply_to_rollups(db, entries):
+    """
+    Fold committed entries (in chain order) into their entities' rollups,
+    skipping any a rollup already counts by its ``last_sequence``.
+    """
+    keys = {(e["entity_type"], e["entity_id"]) for e in entries if e.get("entity_type") and e.get("entity_id")}
+    if not keys:
+        return
+    seen = {
+        (r["entity_type"], r["entity_id"]): r.get("last_sequence")
+        for r in db.audit_rollups.find(
+            {"$or": [{"entity_type": t, "entity_id": i} for t, i in sorted(keys)]},
+            {"_id": 0, "entity_type": 1, "entity_id": 1, "last_sequence": 1},
+        )
+    }
+
+    updates = {}
+    for entry in entries:
+        if not entry.get("entity_type") or not entry.get("entity_id"):
+            continue
+        key = (entry["entity_type"], entry["entity_id"])
+        if entry["chain_sequence"] <= (seen.get(key) or 0):
+            continue
+        update = updates.setdefault(key, {
+            "inc": {"total_actions": 0, "view_count": 0},
+            "users": set(),
+            "first": entry["timestamp"],
+            "last": entry["timestamp"],
+            "sequence": entry["chain_sequence"],
+        })
+        action_field = f"action_counts.{entry['action']}"
+        update["inc"]["total_actions"] += 1
+        update["inc"][action_field] = update["inc"].get(action_field, 0) + 1
+        if entry["action"] in VIEW_ACTIONS:
+            update["inc"]["view_count"] += 1
+        if entry.get("user_id"):
+            update["users"].add(entry["user_id"])
+        update["first"] = min(update["first"], entry["timestamp"])
+        update["last"] = max(update["last"], entry["timestamp"])
+        update["sequence"] = max(update["sequence"], entry["chain_sequence"])
+
+    if not updates:
+        return
+    requests = []
+    for (entity_type, entity_id), update in updates.items():
+        selector = {"entity_type": entity_type, "entity_id": entity_id}
+        if (entity_type, entity_id) in seen:
+            # Compare-and-set on the sequence: a concurrent applier makes this a no-op, not a double count.
+            selector["last_sequence"] = seen[(entity_type, entity_id)]
+        requests.append(UpdateOne(
+            selector,
+            {
+                "$inc": update["inc"],
+                "$min": {"first_timestamp": update["first"]},
+                "$max": {"last_timestamp": update["last"], "last_sequence": update["sequence"]},
+                "$addToSet": {"user_ids": {"$each": sorted(update["users"])}},
+            },
+            upsert=True,
+        ))
+    try:
+        db.audit_rollups.bulk_write(requests, ordered=False)
+    except BulkWriteError as e:
+        # A lost compare-and-set upserts into the unique index; that rollup was updated by someone else.
+        if any(err.get("code") != DUPLICATE_KEY_ERROR for err in e.details.get("writeErrors", [])):
+            raise
+
+
+def get_rollup(db, entity_type, entity_id):
+    """The entity's rollup, rebuilt from the log if it has never been computed in full."""
+    catch_up_rollups(db)
+    rollup = db.audit_rollups.find_one({"entity_type": entity_type, "entity_id": entity_id}, {"_id": 0})
+    if rollup is None or not rollup.get("complete"):
+        rebuild_rollups(db, entity_type, entity_id)
+        rollup = db.audit_rollups.find_one({"entity_type": entity_type, "entity_id": entity_id}, {"_id": 0})
+    return rollup or _empty_rollup(entity_type, entity_id)
+
+
+def serialize_rollup(rollup):
+    return {
+        "entity_type": rollup["entity_type"],
+        "entity_id": rollup["entity_id"],
+        "total_actions": rollup.get("total_actions", 0),
+        "action_counts": rollup.get("action_counts", {}),
+        "unique_users": len(rollup.get("user_ids", [])),
+        "view_count": rollup.get("view_count", 0),
+        "first_timestamp": _iso(rollup.get("first_timestamp")),
+        "last_timestamp": _iso(rollup.get("last_timestamp")),
+    }
+
+
+def rebuild_rollups(db, entity_type=None, entity_id=None):
+    """
+    Recompute rollups from both tiers of the audit log, for one entity or
+    (with no arguments) all of them. Returns the number of rollups written.
+    Appends that land while a rebuild runs can be counted twice or not at
+    all, so run full rebuilds during quiet periods.
+    """
+    from app.audit.archive import iter_chain
+
+    query = None
+    if entity_id is not None:
+        query = {"entity_type": entity_type, "entity_id": entity_id}
+
+    rollups = {}
+    if query:
+        rollups[(entity_type, entity_id)] = _empty_rollup(entity_type, entity_id)
+    for entry in iter_chain(db, query=query):
+        if not entry.get("entity_type") or not entry.get("entity_id"):
+            continue
+        key = (entry["entity_type"], entry["entity_id"])
+        rollup = rollups.setdefault(key, _empty_rollup(*key))
+        rollup["total_actions"] += 1
+        rollup["action_counts"][entry["action"]] = rollup["action_counts"].get(entry["action"], 0) + 1
+        if entry["action"] in VIEW_ACTIONS:
+            rollup["view_count"] += 1
+        if entry.get("user_id") and entry["user_id"] not in rollup["user_ids"]:
+            rollup["user_ids"].append(entry["user_id"])
+        timestamp = _naive(entry["timestamp"])
+        if rollup["first_timestamp"] is None or timestamp < rollup["first_timestamp"]:
+            rollup["first_timestamp"] = timestamp
+        if rollup["last_timestamp"] is None or timestamp > rollup["last_timestamp"]:
+            rollup["last_timestamp"] = timestamp
+        rollup["last_sequence"] = entry["chain_sequence"]
+
+    if rollups:
+        db.audit_rollups.bulk_write([
+            # Unset timestamps are left out: $min treats a stored null as smaller than any date.
+            ReplaceOne(
+                {"entity_type": rollup["entity_type"], "entity_id": rollup["entity_id"]},
+                {key: value for key, value in rollup.items() if value is not None},
+                upsert=True,
+            )
+            for rollup in rollups.values()
+        ], ordered=False)
+    return len(rollups)
+
+
+def _empty_rollup(entity_type, entity_id):
+    return {
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "total_actions": 0,
+        "action_counts": {},
+        "view_count": 0,
+        "user_ids": [],
+        "first_timestamp": None,
+        "last_timestamp": None,
+        "last_sequence": 0,
+        "complete": True,
+    }
+
+
+def _naive(timestamp):
+    # Archived entries carry aware UTC datetimes; hot ones come back naive UTC.
+    if isinstance(timestamp, datetime) and timestamp.tzinfo is not None:
+        return timestamp.replace(tzinfo=None)
+    return timestamp
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
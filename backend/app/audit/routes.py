@@ -1,11 +1,11 @@
-from flask import jsonify, request
-from flask_jwt_extended import jwt_required
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
 
 from app.audit import audit_bp
 from app.audit.services import get_audit_logs, verify_chain_integrity
 from app.auth.decorators import permission_required
 from app.common.constants import Permissions
-from app.common.errors import NotFoundError
+from app.common.errors import NotFoundError, ValidationError
 
 
 @audit_bp.route("/", methods=["GET"])
@@ -16,6 +16,7 @@ def list_audit_logs():
     entity_type = request.args.get("entity_type")
     action = request.args.get("action")
     user_id = request.args.get("user_id")
+    cursor = request.args.get("cursor")
 
     result = get_audit_logs(
         page=page,
@@ -23,6 +24,8 @@ def list_audit_logs():
         entity_type=entity_type,
         action=action,
         user_id=user_id,
+        cursor=cursor,
+        include_total=_include_total(cursor),
     )
     return jsonify(result)
 
@@ -32,23 +35,96 @@ def list_audit_logs():
 def evidence_audit_logs(evidence_id):
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 50, type=int)
+    cursor = request.args.get("cursor")
 
     result = get_audit_logs(
         page=page,
         per_page=per_page,
         entity_type="evidence",
         entity_id=evidence_id,
+        cursor=cursor,
+        include_total=_include_total(cursor),
     )
     return jsonify(result)
 
 
+def _include_total(cursor):
+    """Totals default on for page-numbered requests and off for cursor requests."""
+    default = "false" if cursor is not None else "true"
+    return request.args.get("include_total", default).lower() == "true"
+
+
 @audit_bp.route("/verify-chain", methods=["GET"])
 @permission_required(Permissions.ADMIN)
 def verify_chain():
-    result = verify_chain_integrity()
+    mode = request.args.get("mode")
+    if mode == "parallel":
+        from app.audit.parallel_verify import verify_chain_parallel
+
+        workers = request.args.get("workers", type=int)
+        return jsonify(verify_chain_parallel(workers=workers, verified_by=get_jwt_identity()))
+
+    result = verify_chain_integrity(full=mode == "full", verified_by=get_jwt_identity())
     return jsonify(result)
 
 
+@audit_bp.route("/archive/segments", methods=["GET"])
+@permission_required(Permissions.ADMIN)
+def archive_segments():
+    from app.audit.archive import get_seal_state, list_segments, serialize_segment
+    from app.extensions import mongo
+
+    segments = [serialize_segment(s) for s in list_segments(mongo.db)]
+    state = get_seal_state(mongo.db)
+    return jsonify({
+        "segments": segments,
+        "total": len(segments),
+        "last_seal": serialize_segment(state) if state else None,
+    })
+
+
+@audit_bp.route("/archive/seal", methods=["POST"])
+@permission_required(Permissions.ADMIN)
+def seal_archive():
+    """Start moving verified, old audit entries into sealed archive segments in the background."""
+    from app.audit.archive import start_sealing
+
+    max_segments = request.args.get("max_segments", type=int)
+    start_sealing(current_app._get_current_object(), sealed_by=get_jwt_identity(), max_segments=max_segments)
+    return jsonify({"status": "started"}), 202
+
+
+@audit_bp.route("/merkle/root", methods=["GET"])
+@jwt_required()
+def merkle_root():
+    from app.audit.merkle import get_tree_head
+
+    return jsonify(get_tree_head())
+
+
+@audit_bp.route("/merkle/proof/<log_id>", methods=["GET"])
+@jwt_required()
+def merkle_inclusion_proof(log_id):
+    """Inclusion proof for a single audit entry, verifiable in O(log n)."""
+    from app.audit.merkle import get_inclusion_proof
+
+    tree_size = request.args.get("tree_size", type=int)
+    return jsonify(get_inclusion_proof(log_id, tree_size=tree_size))
+
+
+@audit_bp.route("/merkle/consistency", methods=["GET"])
+@jwt_required()
+def merkle_consistency_proof():
+    """Proof that an earlier tree size is a prefix of a later one."""
+    from app.audit.merkle import get_consistency_proof
+
+    first = request.args.get("first", type=int)
+    second = request.args.get("second", type=int)
+    if not first:
+        raise ValidationError("first is required")
+    return jsonify(get_consistency_proof(first, second))
+
+
 @audit_bp.route("/summary/evidence/<evidence_id>", methods=["GET"])
 @jwt_required()
 def evidence_summary(evidence_id):
@@ -60,3 +136,22 @@ def evidence_summary(evidence_id):
         raise NotFoundError("Evidence not found")
 
     return jsonify(result)
+
+
+@audit_bp.route("/rollups/<entity_type>/<entity_id>", methods=["GET"])
+@jwt_required()
+def entity_rollup(entity_type, entity_id):
+    from app.audit.rollups import get_rollup, serialize_rollup
+    from app.extensions import mongo
+
+    return jsonify(serialize_rollup(get_rollup(mongo.db, entity_type, entity_id)))
+
+
+@audit_bp.route("/rollups/rebuild", methods=["POST"])
+@permission_required(Permissions.ADMIN)
+def rebuild_audit_rollups():
+    """Recompute every per-entity rollup from the audit log (backfill / repair)."""
+    from app.audit.rollups import rebuild_rollups
+    from app.extensions import mongo
+
+    return jsonify({"rebuilt": rebuild_rollups(mongo.db)})
@@ -1,37 +1,51 @@
-import hashlib
+import base64
+import json
+import time
 import uuid
 from datetime import datetime, timezone
 
 from flask import has_request_context, request
 
+from app.audit.archive import (
+    ArchiveIntegrityError,
+    count_archived,
+    find_archived,
+    find_entry,
+    iter_chain,
+    last_segment,
+    list_segments,
+)
+from app.audit.chain import GENESIS_HASH, append_entry, chain_timestamp, compute_entry_hash
+from app.audit.checkpoints import get_latest_checkpoint, save_checkpoint, serialize_checkpoint
+from app.audit.query_plans import LOG_ORDER
+from app.audit.writer import get_audit_writer
+from app.common.errors import ValidationError
+from app.common.validators import clamp_page
 from app.extensions import mongo
 
-GENESIS_HASH = "GENESIS_0000000000000000000000000000000000000000000000000000000000000000"
+COUNT_CACHE_SECONDS = 30
+COUNT_CACHE_SIZE = 1000
+_count_cache = {}
+_archived_count_cache = {}
 
+VERIFY_BATCH_SIZE = 1000
+VERIFY_PROJECTION = {
+    "_id": 0, "action": 1, "entity_id": 1, "user_id": 1, "details": 1, "timestamp": 1,
+    "previous_log_hash": 1, "hash_of_entry": 1, "chain_sequence": 1,
+}
 
-def log_action(action, entity_type, entity_id, user_id, user_email, user_role, details, metadata=None):
+
+def log_action(action, entity_type, entity_id, user_id, user_email, user_role, details, metadata=None,
+               durable=False):
     """
     Append a new entry to the audit log with hash chaining.
     This is the ONLY function that writes to audit_logs.
-    """
-    db = mongo.db
-
-    # Get the last log entry for chaining
-    last_entry = db.audit_logs.find_one(sort=[("chain_sequence", -1)])
-
-    if last_entry:
-        previous_hash = last_entry["hash_of_entry"]
-        sequence = last_entry["chain_sequence"] + 1
-    else:
-        previous_hash = GENESIS_HASH
-        sequence = 1
 
+    Entries are group-committed by the background audit writer. Pass
+    ``durable=True`` for actions that must be persisted before responding;
+    only then are the chain fields guaranteed to be set on the result.
+    """
     timestamp = datetime.now(timezone.utc)
-    timestamp_iso = timestamp.isoformat()
-
-    # Deterministic hash input
-    hash_input = f"{action}|{entity_id}|{user_id}|{details}|{timestamp_iso}|{previous_hash}"
-    hash_of_entry = hashlib.sha256(hash_input.encode("utf-8")).hexdigest()
 
     # Get request context info if available
     ip_address = "system"
@@ -52,18 +66,28 @@ def log_action(action, entity_type, entity_id, user_id, user_email, user_role, d
         "metadata": metadata or {},
         "ip_address": ip_address,
         "user_agent": user_agent,
-        "hash_of_entry": hash_of_entry,
-        "previous_log_hash": previous_hash,
-        "chain_sequence": sequence,
         "timestamp": timestamp,
     }
 
-    db.audit_logs.insert_one(log_entry)
-    return log_entry
+    # Sequence, previous hash and entry hash are assigned by the append engine
+    writer = get_audit_writer()
+    if writer is None:
+        return append_entry(mongo.db, log_entry)
+    return writer.submit(log_entry, durable=durable)
+
 
+def get_audit_logs(page=1, per_page=20, entity_type=None, entity_id=None, action=None, user_id=None,
+                   cursor=None, include_total=True):
+    """
+    Fetch audit logs with optional filters and pagination.
 
-def get_audit_logs(page=1, per_page=20, entity_type=None, entity_id=None, action=None, user_id=None):
-    """Fetch audit logs with optional filters and pagination."""
+    Passing ``cursor`` (an empty string for the first page) switches to keyset
+    pagination on (timestamp, chain_sequence): each page is an index range
+    scan that costs the same however deep it is, and ``next_cursor`` resumes
+    after the last returned entry. ``page`` is only used without a cursor.
+    Totals come from a short-lived cached count and can be skipped with
+    ``include_total=False``.
+    """
     db = mongo.db
     query = {}
 
@@ -76,62 +100,194 @@ def get_audit_logs(page=1, per_page=20, entity_type=None, entity_id=None, action
     if user_id:
         query["user_id"] = user_id
 
-    total = db.audit_logs.count_documents(query)
-    logs = list(
-        db.audit_logs.find(query, {"_id": 0})
-        .sort("timestamp", -1)
-        .skip((page - 1) * per_page)
-        .limit(per_page)
-    )
+    page, per_page = clamp_page(page, per_page, default_per_page=20)
+    find_query = query
+    if cursor:
+        # Bounding timestamp keeps the scan on the (filters, timestamp, chain_sequence) index.
+        timestamp, sequence = _decode_cursor(cursor)
+        find_query = dict(query, timestamp={"$lte": timestamp}, **{"$or": [
+            {"timestamp": {"$lt": timestamp}},
+            {"chain_sequence": {"$lt": sequence}},
+        ]})
+
+    skip = 0 if cursor is not None else (page - 1) * per_page
+    logs = list(db.audit_logs.find(find_query, {"_id": 0}).sort(LOG_ORDER).skip(skip).limit(per_page + 1))
+    if len(logs) <= per_page and last_segment(db):
+        # The hot tier ran out; continue into the sealed archive, which only holds older entries.
+        archive_skip = max(0, skip - db.audit_logs.count_documents(query)) if skip and not logs else 0
+        logs += find_archived(db, find_query, skip=archive_skip, limit=per_page + 1 - len(logs))
+
+    has_more = len(logs) > per_page
+    logs = logs[:per_page]
+    next_cursor = _encode_cursor(logs[-1]) if has_more else None
 
-    # Convert datetime objects to ISO strings
+    # Hot entries come back naive and archived ones aware; both are emitted as UTC with an offset
     for log in logs:
         if isinstance(log.get("timestamp"), datetime):
-            log["timestamp"] = log["timestamp"].isoformat()
+            log["timestamp"] = _utc(log["timestamp"]).isoformat()
 
-    return {
+    result = {
         "logs": logs,
-        "total": total,
-        "page": page,
         "per_page": per_page,
-        "total_pages": max(1, (total + per_page - 1) // per_page),
+        "has_more": has_more,
+        "next_cursor": next_cursor,
     }
+    if cursor is None:
+        result["page"] = page
+    if include_total:
+        total = _count_logs(db, query)
+        result["total"] = total
+        result["total_pages"] = max(1, (total + per_page - 1) // per_page)
+    return result
 
 
-def verify_chain_integrity():
-    """Walk the entire audit chain and verify all hashes."""
-    db = mongo.db
-    entries = list(db.audit_logs.find().sort("chain_sequence", 1))
+def _encode_cursor(log):
+    timestamp = log["timestamp"]
+    if isinstance(timestamp, datetime):
+        timestamp = _utc(timestamp).isoformat()
+    raw = json.dumps({"t": timestamp, "s": log["chain_sequence"]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
 
-    if not entries:
-        return {"intact": True, "total_entries": 0}
 
-    expected_previous = GENESIS_HASH
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return _utc(datetime.fromisoformat(data["t"])), int(data["s"])
+    except (ValueError, KeyError, TypeError):
+        raise ValidationError("Invalid cursor")
 
-    for entry in entries:
-        # Recompute hash
-        timestamp_iso = entry["timestamp"].isoformat() if isinstance(entry["timestamp"], datetime) else entry["timestamp"]
-        hash_input = f"{entry['action']}|{entry['entity_id']}|{entry['user_id']}|{entry['details']}|{timestamp_iso}|{entry['previous_log_hash']}"
-        computed_hash = hashlib.sha256(hash_input.encode("utf-8")).hexdigest()
 
-        # Check previous hash link
-        if entry["previous_log_hash"] != expected_previous:
-            return {
-                "intact": False,
-                "broken_at": entry["chain_sequence"],
-                "error": "Previous hash mismatch",
-                "total_entries": len(entries),
-            }
+def _utc(timestamp):
+    """Aware UTC form of a stored timestamp (MongoDB hands them back naive UTC)."""
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+def _count_logs(db, query):
+    """Total matching logs in both tiers, from the collection estimate when unfiltered, else a cached count."""
+    segments = list_segments(db)
+    if not query:
+        return db.audit_logs.estimated_document_count() + sum(s["entry_count"] for s in segments)
 
-        # Check self hash
-        if entry["hash_of_entry"] != computed_hash:
+    key = (tuple(sorted(query.items())), len(segments))
+    cached = _count_cache.get(key)
+    now = time.monotonic()
+    if cached and now - cached[1] < COUNT_CACHE_SECONDS:
+        return cached[0]
+
+    total = db.audit_logs.count_documents(query)
+    if segments:
+        # Segments are immutable, so their counts only change when another one is sealed.
+        if key not in _archived_count_cache:
+            if len(_archived_count_cache) >= COUNT_CACHE_SIZE:
+                _archived_count_cache.clear()
+            _archived_count_cache[key] = count_archived(db, query)
+        total += _archived_count_cache[key]
+    if len(_count_cache) >= COUNT_CACHE_SIZE:
+        _count_cache.clear()
+    _count_cache[key] = (total, now)
+    return total
+
+
+def verify_chain_integrity(full=False, verified_by=None):
+    """
+    Verify the audit hash chain.
+
+    By default only entries appended after the latest signed checkpoint are
+    walked, anchored on the checkpointed hash. ``full=True`` re-verifies from
+    the genesis entry, including the sealed archive segments and their file
+    checksums. Either way entries are streamed rather than loaded into
+    memory, and a new checkpoint is recorded on success.
+    """
+    db = mongo.db
+    started = time.monotonic()
+
+    checkpoint = None if full else get_latest_checkpoint(db)
+    if checkpoint:
+        anchor = find_entry(db, checkpoint["chain_sequence"])
+        if not anchor or anchor["hash_of_entry"] != checkpoint["hash_of_entry"]:
             return {
                 "intact": False,
-                "broken_at": entry["chain_sequence"],
-                "error": "Entry hash mismatch (data tampered)",
-                "total_entries": len(entries),
+                "mode": "incremental",
+                "broken_at": checkpoint["chain_sequence"],
+                "error": "Checkpointed entry does not match its recorded hash",
+                "total_entries": _chain_length(db),
+                "checkpoint": serialize_checkpoint(checkpoint),
             }
+        expected_previous = checkpoint["hash_of_entry"]
+        last_sequence = checkpoint["chain_sequence"]
+    else:
+        expected_previous = GENESIS_HASH
+        last_sequence = 0
+
+    entries = iter_chain(
+        db, after_sequence=last_sequence, projection=VERIFY_PROJECTION,
+        verify_files=True, batch_size=VERIFY_BATCH_SIZE,
+    )
+
+    result = {
+        "intact": True,
+        "mode": "incremental" if checkpoint else "full",
+        "checkpoint": serialize_checkpoint(checkpoint),
+    }
+    entries_verified = 0
+
+    try:
+        for entry in entries:
+            error = _check_entry(entry, expected_previous)
+            if error:
+                result.update({
+                    "intact": False,
+                    "broken_at": entry["chain_sequence"],
+                    "error": error,
+                    "total_entries": _chain_length(db),
+                })
+                break
+
+            expected_previous = entry["hash_of_entry"]
+            last_sequence = entry["chain_sequence"]
+            entries_verified += 1
+    except ArchiveIntegrityError as e:
+        result.update({
+            "intact": False,
+            "broken_at": e.sequence,
+            "error": e.message,
+            "total_entries": _chain_length(db),
+        })
+
+    result["entries_verified"] = entries_verified
+    result["elapsed_seconds"] = round(time.monotonic() - started, 3)
+    if not result["intact"]:
+        return result
+
+    result["total_entries"] = last_sequence
+    if entries_verified:
+        result["new_checkpoint"] = serialize_checkpoint(
+            save_checkpoint(db, last_sequence, expected_previous, entries_verified, verified_by)
+        )
+    return result
+
+
+def _check_entry(entry, expected_previous):
+    """Return an error message if ``entry`` does not chain onto ``expected_previous``."""
+    computed_hash = compute_entry_hash(
+        entry["action"], entry["entity_id"], entry["user_id"],
+        entry["details"], chain_timestamp(entry["timestamp"]), entry["previous_log_hash"],
+    )
+
+    # Check previous hash link
+    if entry["previous_log_hash"] != expected_previous:
+        return "Previous hash mismatch"
+
+    # Check self hash
+    if entry["hash_of_entry"] != computed_hash:
+        return "Entry hash mismatch (data tampered)"
+
+    return None
 
-        expected_previous = entry["hash_of_entry"]
 
-    return {"intact": True, "total_entries": len(entries)}
+def _chain_length(db):
+    last_entry = db.audit_logs.find_one(sort=[("chain_sequence", -1)], projection={"chain_sequence": 1})
+    return last_entry["chain_sequence"] if last_entry else 0
@@ -1,13 +1,15 @@
 """
 AI-Generated Audit Summary Engine.
 
-Template-based natural language generation that converts raw audit logs
-into human-readable, court-friendly narratives with risk analysis.
+Template-based natural language generation that converts audit rollups,
+hash records and transfers into human-readable, court-friendly narratives
+with risk analysis.
 """
 
-from collections import Counter
 from datetime import datetime, timezone
 
+from app.audit.rollups import get_rollup
+from app.auth.services import find_user_by_id
 from app.extensions import mongo
 
 
@@ -17,11 +19,7 @@ def generate_evidence_summary(evidence_id):
     if not ev:
         return None
 
-    audit_logs = list(
-        mongo.db.audit_logs.find(
-            {"entity_type": "evidence", "entity_id": evidence_id}, {"_id": 0}
-        ).sort("timestamp", 1)
-    )
+    rollup = get_rollup(mongo.db, "evidence", evidence_id)
     hash_records = list(
         mongo.db.hash_records.find({"evidence_id": evidence_id}, {"_id": 0})
         .sort("computed_at", 1)
@@ -32,15 +30,15 @@ def generate_evidence_summary(evidence_id):
     )
 
     # Enrich names
-    uploader = mongo.db.users.find_one({"user_id": ev.get("uploaded_by")})
-    custodian = mongo.db.users.find_one({"user_id": ev.get("current_custodian_id")})
+    uploader = find_user_by_id(ev.get("uploaded_by"))
+    custodian = find_user_by_id(ev.get("current_custodian_id"))
 
     uploader_name = (uploader.get("full_name") or uploader.get("email")) if uploader else "Unknown"
     custodian_name = (custodian.get("full_name") or custodian.get("email")) if custodian else "Unknown"
 
-    statistics = _compute_statistics(audit_logs, hash_records, transfers)
-    key_events = _identify_key_events(ev, audit_logs, hash_records, transfers)
-    risk_flags = _identify_risk_flags(ev, audit_logs, hash_records, transfers)
+    statistics = _compute_statistics(rollup, hash_records, transfers)
+    key_events = _identify_key_events(ev, hash_records, transfers)
+    risk_flags = _identify_risk_flags(ev, rollup, hash_records, transfers)
 
     summary_text = _build_summary_text(ev, statistics, uploader_name, custodian_name)
     custody_narrative = _build_custody_narrative(ev, transfers, custodian_name)
@@ -63,35 +61,24 @@ def generate_evidence_summary(evidence_id):
 # Statistics
 # ---------------------------------------------------------------------------
 
-def _compute_statistics(audit_logs, hash_records, transfers):
+def _compute_statistics(rollup, hash_records, transfers):
     verifications = [r for r in hash_records if r.get("event_type") == "verification"]
-    action_counts = Counter(log.get("action", "unknown") for log in audit_logs)
-    unique_users = len(set(log.get("user_id") for log in audit_logs if log.get("user_id")))
+    first = rollup.get("first_timestamp")
+    last = rollup.get("last_timestamp")
 
-    timestamps = []
-    for log in audit_logs:
-        ts = log.get("timestamp")
-        if isinstance(ts, datetime):
-            timestamps.append(ts)
-        elif isinstance(ts, str):
-            try:
-                timestamps.append(datetime.fromisoformat(ts.replace("Z", "+00:00")))
-            except ValueError:
-                pass
-
-    first_action = min(timestamps).isoformat() if timestamps else None
-    last_action = max(timestamps).isoformat() if timestamps else None
-    time_span_days = int((max(timestamps) - min(timestamps)).total_seconds() / 86400) if len(timestamps) >= 2 else 0
+    first_action = first.isoformat() if first else None
+    last_action = last.isoformat() if last else None
+    time_span_days = int((last - first).total_seconds() / 86400) if first and last else 0
 
     return {
-        "total_actions": len(audit_logs),
+        "total_actions": rollup.get("total_actions", 0),
         "total_verifications": len(verifications),
         "total_transfers": len(transfers),
-        "unique_users": unique_users,
+        "unique_users": len(rollup.get("user_ids", [])),
         "first_action": first_action,
         "last_action": last_action,
         "time_span_days": time_span_days,
-        "actions_by_type": dict(action_counts),
+        "actions_by_type": rollup.get("action_counts", {}),
     }
 
 
@@ -99,7 +86,7 @@ def _compute_statistics(audit_logs, hash_records, transfers):
 # Key Events
 # ---------------------------------------------------------------------------
 
-def _identify_key_events(ev, audit_logs, hash_records, transfers):
+def _identify_key_events(ev, hash_records, transfers):
     events = []
 
     # Upload event
@@ -133,8 +120,8 @@ def _identify_key_events(ev, audit_logs, hash_records, transfers):
         if isinstance(ts, datetime):
             ts = ts.isoformat()
         status = t.get("status", "unknown")
-        from_user = mongo.db.users.find_one({"user_id": t.get("from_user_id")})
-        to_user = mongo.db.users.find_one({"user_id": t.get("to_user_id")})
+        from_user = find_user_by_id(t.get("from_user_id"))
+        to_user = find_user_by_id(t.get("to_user_id"))
         from_name = (from_user.get("full_name") if from_user else "Unknown")
         to_name = (to_user.get("full_name") if to_user else "Unknown")
 
@@ -157,7 +144,7 @@ def _identify_key_events(ev, audit_logs, hash_records, transfers):
 # Risk Flags
 # ---------------------------------------------------------------------------
 
-def _identify_risk_flags(ev, audit_logs, hash_records, transfers):
+def _identify_risk_flags(ev, rollup, hash_records, transfers):
     flags = []
     verifications = [r for r in hash_records if r.get("event_type") == "verification"]
 
@@ -201,13 +188,8 @@ def _identify_risk_flags(ev, audit_logs, hash_records, transfers):
             "recommendation": "Review transfer rejection reasons to ensure no procedural concerns.",
         })
 
-    if len(audit_logs) < 3 and len(audit_logs) > 0:
-        first_ts = audit_logs[0].get("timestamp")
-        if isinstance(first_ts, str):
-            try:
-                first_ts = datetime.fromisoformat(first_ts.replace("Z", "+00:00"))
-            except ValueError:
-                first_ts = None
+    if 0 < rollup.get("total_actions", 0) < 3:
+        first_ts = rollup.get("first_timestamp")
         if isinstance(first_ts, datetime):
             if first_ts.tzinfo is None:
                 first_ts = first_ts.replace(tzinfo=timezone.utc)
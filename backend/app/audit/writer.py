@@ -0,0 +1,325 @@
+"""
+Group-commit writer for the audit log.
+
+log_action hands entries to a per-process background appender instead of
+writing them on the request path. The appender drains whatever is queued,
+chains and hashes the batch in order against the tail, and flushes it with
+a single insert_many, so batches grow naturally while a previous flush is
+in flight. Callers that must not respond before their entry is persisted
+(uploads, transfers) pass durable=True and wait for the batch to commit.
+
+A batch that still fails after WRITE_RETRIES attempts fails its durable
+callers; its other entries are spilled as JSON lines to
+``AUDIT_SPILL_FOLDER/audit-spill-<host>-<pid>.jsonl`` and appended again
+once writes succeed, by the same process or, if it died, by the next writer
+on the host to start. A replaying writer first claims a file by renaming it
+to ``audit-replaying-<host>-<pid>-<token>.jsonl``; the rename is atomic, so
+writers starting together never append the same spilled entries twice.
+"""
+
+import atexit
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from app.audit.chain import append_entries, index_committed
+from app.common.errors import APIError
+
+WRITE_RETRIES = 5
+DURABLE_WAIT_SECONDS = 30
+SPILL_REPLAY_INTERVAL_SECONDS = 60
+SPILL_PREFIX = "audit-spill-"
+# Files being replayed, named after the replaying process; another process takes them over if it dies.
+SPILL_CLAIMED_PREFIX = "audit-replaying-"
+CHAIN_FIELDS = ("chain_sequence", "previous_log_hash", "hash_of_entry")
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+class _Item:
+    __slots__ = ("entry", "done", "error")
+
+    def __init__(self, entry, durable):
+        self.entry = entry
+        self.done = threading.Event() if durable else None
+        self.error = None
+
+
+_STOP = object()
+
+
+class AuditWriter:
+    """Background appender that flushes queued audit entries in batches."""
+
+    def __init__(self, db, batch_size=200, queue_size=10000, enqueue_timeout=2.0, spill_folder=None):
+        self.db = db
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self.spill_folder = spill_folder
+        self._replayed_at = None
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._closed = False
+
+    def submit(self, entry, durable=False):
+        """
+        Queue ``entry`` for the next batch. With ``durable`` the call blocks
+        until the entry is committed and returns it with its chain fields.
+
+        A full queue blocks the caller for up to ``enqueue_timeout`` seconds
+        (backpressure) and then falls back to a synchronous append.
+        """
+        if self._closed:
+            return append_entries(self.db, [entry])[0]
+
+        self._ensure_started()
+        item = _Item(entry, durable)
+        try:
+            self._queue.put(item, timeout=self.enqueue_timeout)
+        except queue.Full:
+            print(f"WARNING: Audit queue full ({self.queue_size}), writing entry synchronously")
+            return append_entries(self.db, [entry])[0]
+
+        if durable:
+            self._wait(item)
+        return entry
+
+    def flush(self, timeout=DURABLE_WAIT_SECONDS):
+        """
+        Block for up to ``timeout`` seconds until everything queued before
+        this call has been written; returns whether it was.
+        """
+        if self._thread is None or self._pid != os.getpid():
+            return True
+        deadline = time.monotonic() + timeout
+        barrier = _Item(None, durable=True)
+        try:
+            self._queue.put(barrier, timeout=timeout)
+        except queue.Full:
+            return False
+        return barrier.done.wait(max(0.0, deadline - time.monotonic()))
+
+    def close(self, timeout=DURABLE_WAIT_SECONDS):
+        """Flush pending entries and stop the background thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _wait(self, item):
+        if not item.done.wait(DURABLE_WAIT_SECONDS):
+            raise APIError("Timed out persisting audit log entry", 503)
+        if item.error is not None:
+            raise APIError("Failed to persist audit log entry", 503)
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so each gunicorn worker starts its own.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with _writer_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._thread = threading.Thread(target=self._run, name="audit-writer")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(item is _STOP for item in batch)
+            items = [item for item in batch if item is not _STOP]
+            if self._write(items):
+                self._replay_spilled()
+                # After the batch's callers are released, so anchoring stays off the request path.
+                index_committed(self.db)
+            if stop:
+                # Drain anything that raced in behind the stop marker.
+                leftover = []
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not _STOP:
+                        leftover.append(item)
+                self._write(leftover)
+                return
+
+    def _write(self, items):
+        """Append the batch with retries; returns whether any entries were written."""
+        entries = [item.entry for item in items if item.entry is not None]
+        error = None
+        for attempt in range(WRITE_RETRIES if entries else 0):
+            try:
+                if attempt:
+                    entries = self._unwritten(entries)
+                append_entries(self.db, entries)
+                error = None
+                break
+            except Exception as e:
+                error = e
+                print(f"ERROR: Audit batch write failed (attempt {attempt + 1}/{WRITE_RETRIES}): {e}")
+                if attempt + 1 < WRITE_RETRIES:
+                    time.sleep(min(5.0, 0.2 * 2 ** attempt))
+
+        if error is not None:
+            # Durable callers get the error; everyone else's entries are kept for a later replay.
+            unwritten = {id(entry) for entry in entries}
+            self._spill([item.entry for item in items if item.done is None and id(item.entry) in unwritten])
+
+        for item in items:
+            item.error = error if item.entry is not None else None
+            if item.done is not None:
+                item.done.set()
+        return bool(entries) and error is None
+
+    def _spill_path(self, pid=None):
+        return os.path.join(self.spill_folder, f"{SPILL_PREFIX}{socket.gethostname()}-{pid or os.getpid()}.jsonl")
+
+    def _spill(self, entries):
+        if not entries:
+            return
+        lines = "".join(json.dumps(_spillable(entry), default=str) + "\n" for entry in entries)
+        if self.spill_folder:
+            try:
+                os.makedirs(self.spill_folder, exist_ok=True)
+                with open(self._spill_path(), "a", encoding="utf-8") as f:
+                    f.write(lines)
+                    f.flush()
+                    os.fsync(f.fileno())
+                print(f"WARNING: Spilled {len(entries)} unwritten audit entries to {self._spill_path()}")
+                return
+            except OSError as e:
+                print(f"ERROR: Could not spill unwritten audit entries: {e}")
+        # Last resort: keep them recoverable from the worker log.
+        for line in lines.splitlines():
+            print(f"ERROR: Unwritten audit entry: {line}", file=sys.stderr)
+
+    def _replay_spilled(self):
+        """Append entries spilled by this process, or by dead ones on this host, at most once a minute."""
+        now = time.monotonic()
+        if not self.spill_folder or (
+            self._replayed_at is not None and now - self._replayed_at < SPILL_REPLAY_INTERVAL_SECONDS
+        ):
+            return
+        self._replayed_at = now
+        try:
+            names = os.listdir(self.spill_folder)
+        except FileNotFoundError:
+            return
+        for name in sorted(names):
+            pid = _spill_owner(name)
+            if pid is None or (pid != os.getpid() and _pid_alive(pid)):
+                continue
+            path = self._claim_spill(name)
+            if path is None:
+                continue
+            try:
+                with open(path, encoding="utf-8") as f:
+                    entries = [_from_spill(json.loads(line)) for line in f if line.strip()]
+                entries = self._unwritten(entries)
+                for start in range(0, len(entries), self.batch_size):
+                    append_entries(self.db, entries[start:start + self.batch_size])
+                os.remove(path)
+                print(f"INFO: Replayed {len(entries)} spilled audit entries from {name}")
+            except Exception as e:
+                # The claimed file stays ours; it is retried on the next replay.
+                print(f"ERROR: Replaying spilled audit entries from {name} failed: {e}")
+                return
+
+    def _claim_spill(self, name):
+        """
+        Rename a spill file to a name only this process uses, so two writers
+        can never replay it both; returns the new path, or None if another
+        writer claimed it first.
+        """
+        token = uuid.uuid4().hex[:8]
+        claimed = os.path.join(
+            self.spill_folder, f"{SPILL_CLAIMED_PREFIX}{socket.gethostname()}-{os.getpid()}-{token}.jsonl"
+        )
+        try:
+            os.rename(os.path.join(self.spill_folder, name), claimed)
+        except FileNotFoundError:
+            return None
+        return claimed
+
+    def _unwritten(self, entries):
+        """Drop entries a failed attempt managed to commit before erroring."""
+        written = set(
+            doc["log_id"] for doc in self.db.audit_logs.find(
+                {"log_id": {"$in": [e["log_id"] for e in entries]}}, {"log_id": 1}
+            )
+        )
+        return [e for e in entries if e["log_id"] not in written]
+
+
+def init_audit_writer(app, db):
+    """Configure the process-wide writer from app config (started lazily)."""
+    global _writer
+    if not app.config.get("AUDIT_ASYNC_WRITES", True):
+        _writer = None
+        return None
+
+    _writer = AuditWriter(
+        db,
+        batch_size=app.config.get("AUDIT_BATCH_SIZE", 200),
+        queue_size=app.config.get("AUDIT_QUEUE_SIZE", 10000),
+        enqueue_timeout=app.config.get("AUDIT_ENQUEUE_TIMEOUT", 2.0),
+        spill_folder=app.config.get("AUDIT_SPILL_FOLDER"),
+    )
+    atexit.register(_writer.close)
+    return _writer
+
+
+def get_audit_writer():
+    return _writer
+
+
+def _spillable(entry):
+    # Chain fields from the failed attempt are stale; they are assigned again on replay.
+    return {key: value for key, value in entry.items() if key not in CHAIN_FIELDS and key != "_id"}
+
+
+def _from_spill(entry):
+    entry["timestamp"] = datetime.fromisoformat(entry["timestamp"])
+    return entry
+
+
+def _spill_owner(name):
+    """PID of the process that wrote (or is replaying) a spill file of this host, else None."""
+    host = socket.gethostname()
+    for prefix in (f"{SPILL_PREFIX}{host}-", f"{SPILL_CLAIMED_PREFIX}{host}-"):
+        if name.startswith(prefix) and name.endswith(".jsonl"):
+            pid = name[len(prefix):-len(".jsonl")].split("-", 1)[0]
+            return int(pid) if pid.isdigit() else None
+    return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -7,7 +7,7 @@ from flask_jwt_extended import (
 )
 
 from app.auth import auth_bp
-from app.auth.decorators import role_required
+from app.auth.decorators import permission_required, role_required
 from app.auth.services import (
     create_user,
     find_user_by_email,
@@ -17,7 +17,7 @@ from app.auth.services import (
     update_user,
     verify_password,
 )
-from app.common.constants import ALL_ROLES, Roles
+from app.common.constants import ALL_ROLES, Permissions, Roles
 from app.common.errors import APIError, ValidationError
 from app.common.validators import validate_email, validate_required_fields
 
@@ -167,3 +167,11 @@ def update_user_route(user_id):
     )
     
     return jsonify({"user": sanitize_user(user)})
+
+
+@auth_bp.route("/cache/stats", methods=["GET"])
+@permission_required(Permissions.ADMIN)
+def identity_cache_stats_route():
+    from app.common.cache import identity_cache_stats
+
+    return jsonify({"caches": identity_cache_stats()})
@@ -2,6 +2,8 @@ import uuid
 from datetime import datetime, timezone
 
 import bcrypt
+from app.common.invalidation import publish
+from app.common.lookups import cached_users
 from app.extensions import mongo
 
 
@@ -27,6 +29,7 @@ def create_user(email, password, full_name, role, department=""):
         "updated_at": datetime.now(timezone.utc),
     }
     mongo.db.users.insert_one(user)
+    publish("users", user_id)
     return sanitize_user(user)
 
 
@@ -35,7 +38,10 @@ def find_user_by_email(email):
 
 
 def find_user_by_id(user_id):
-    return mongo.db.users.find_one({"user_id": user_id})
+    """The user document without password_hash, served from the identity cache."""
+    user = cached_users([user_id]).get(user_id)
+    # A copy: callers may annotate it, the cached one is shared across requests.
+    return dict(user) if user else None
 
 
 def get_all_users():
@@ -50,6 +56,11 @@ def update_user(user_id, updates):
         return None
     filtered["updated_at"] = datetime.now(timezone.utc)
     mongo.db.users.update_one({"user_id": user_id}, {"$set": filtered})
+    publish("users", user_id)
+    if "full_name" in filtered:
+        from app.evidence.read_model import on_user_renamed
+
+        on_user_renamed(user_id, filtered["full_name"])
     return find_user_by_id(user_id)
 
 
@@ -6,6 +6,7 @@ from app.cases import cases_bp
 from app.cases.services import create_case, get_case, get_cases, update_case
 from app.common.constants import Permissions
 from app.common.errors import APIError, NotFoundError
+from app.common.lookups import user_names
 from app.common.validators import validate_required_fields
 from app.extensions import mongo
 
@@ -122,18 +123,15 @@ def get_case_evidence(case_id):
     if not case:
         raise NotFoundError("Case not found")
 
-    evidence_list = list(
-        mongo.db.evidence.find({"case_id": case_id}, {"_id": 0})
-        .sort("created_at", -1)
-    )
-
-    from datetime import datetime
-    for e in evidence_list:
-        for field in ["created_at", "updated_at", "last_verified_at"]:
-            if isinstance(e.get(field), datetime):
-                e[field] = e[field].isoformat()
+    from app.evidence.services import get_case_evidence as list_case_evidence, parse_fields
 
-    return jsonify({"evidence": evidence_list})
+    result = list_case_evidence(
+        case_id,
+        fields=parse_fields(request.args.get("fields")),
+        page=request.args.get("page", type=int),
+        per_page=request.args.get("per_page", type=int),
+    )
+    return jsonify(result)
 
 
 @cases_bp.route("/<case_id>/timeline", methods=["GET"])
@@ -146,6 +144,8 @@ def get_case_timeline(case_id):
 
     from datetime import datetime
 
+    from app.audit.archive import find_logs
+
     timeline = []
 
     # Case creation event
@@ -182,10 +182,9 @@ def get_case_timeline(case_id):
                 {"evidence_id": {"$in": evidence_ids}}, {"_id": 0}
             ).sort("requested_at", 1)
         )
+        names = user_names([t.get("from_user_id") for t in transfers] + [t.get("to_user_id") for t in transfers])
+        file_names = {e["evidence_id"]: e.get("file_name") for e in evidence_list}
         for t in transfers:
-            from_user = mongo.db.users.find_one({"user_id": t.get("from_user_id")})
-            to_user = mongo.db.users.find_one({"user_id": t.get("to_user_id")})
-            ev = mongo.db.evidence.find_one({"evidence_id": t.get("evidence_id")})
             timestamp = t.get("requested_at")
             if isinstance(timestamp, datetime):
                 timestamp = timestamp.isoformat()
@@ -200,8 +199,8 @@ def get_case_timeline(case_id):
             timeline.append({
                 "type": "transfer",
                 "action": f"transfer_{t.get('status', 'unknown')}",
-                "title": f"Transfer {t.get('status', 'unknown')}: {ev['file_name'] if ev else 'Unknown'}",
-                "description": f"{from_user['full_name'] if from_user else 'Unknown'} -> {to_user['full_name'] if to_user else 'Unknown'}: {t.get('reason', '')}",
+                "title": f"Transfer {t.get('status', 'unknown')}: {file_names.get(t.get('evidence_id')) or 'Unknown'}",
+                "description": f"{names.get(t.get('from_user_id')) or 'Unknown'} -> {names.get(t.get('to_user_id')) or 'Unknown'}: {t.get('reason', '')}",
                 "timestamp": timestamp,
                 "icon": icon_map.get(t.get("status"), "transfer"),
                 "entity_id": t.get("transfer_id"),
@@ -209,14 +208,13 @@ def get_case_timeline(case_id):
 
     # Verification events from audit logs
     if evidence_ids:
-        verifications = list(
-            mongo.db.audit_logs.find(
-                {
-                    "entity_id": {"$in": evidence_ids},
-                    "action": {"$in": ["evidence_verified", "evidence_verification_failed"]},
-                },
-                {"_id": 0},
-            ).sort("timestamp", 1)
+        verifications = find_logs(
+            mongo.db,
+            {
+                "entity_id": {"$in": evidence_ids},
+                "action": {"$in": ["evidence_verified", "evidence_verification_failed"]},
+            },
+            {"_id": 0},
         )
         for v in verifications:
             timestamp = v.get("timestamp")
@@ -1,6 +1,9 @@
 import uuid
 from datetime import datetime, timezone
 
+from app.common.invalidation import publish
+from app.common.lookups import cached_users
+from app.common.validators import clamp_page
 from app.extensions import mongo
 
 
@@ -42,6 +45,7 @@ def create_case(title, description, created_by_id, created_by_name):
             "updated_at": datetime.now(timezone.utc),
         }
         mongo.db.cases.insert_one(case)
+        publish("cases", case_id)
         print(f"DEBUG: Case inserted successfully: {case_id}")
         return _serialize(case)
     except Exception as e:
@@ -50,6 +54,7 @@ def create_case(title, description, created_by_id, created_by_name):
 
 
 def get_cases(page=1, per_page=10, status=None, search=None):
+    page, per_page = clamp_page(page, per_page)
     query = {}
     if status:
         query["status"] = status
@@ -66,6 +71,12 @@ def get_cases(page=1, per_page=10, status=None, search=None):
         .skip((page - 1) * per_page)
         .limit(per_page)
     )
+    # Old cases lack created_by_name; resolve them all at once rather than in _serialize.
+    users = cached_users(c.get("created_by") for c in cases if "created_by_name" not in c)
+    for c in cases:
+        if "created_by" in c and "created_by_name" not in c:
+            user = users.get(c["created_by"])
+            c["created_by_name"] = (user.get("full_name") or user.get("email")) if user else "Unknown"
     return {
         "cases": [_serialize(c) for c in cases],
         "total": total,
@@ -87,6 +98,11 @@ def update_case(case_id, updates):
         return None
     filtered["updated_at"] = datetime.now(timezone.utc)
     mongo.db.cases.update_one({"case_id": case_id}, {"$set": filtered})
+    publish("cases", case_id)
+    if "title" in filtered:
+        from app.evidence.read_model import on_case_retitled
+
+        on_case_retitled(case_id, filtered["title"])
     
     # Auto-archive evidence if case is closed
     if filtered.get("status") == "closed":
@@ -111,7 +127,9 @@ def _serialize(case):
     
     # Ensure created_by_name is available for old cases
     if "created_by" in case and "created_by_name" not in case:
-        user = mongo.db.users.find_one({"user_id": case["created_by"]})
+        from app.auth.services import find_user_by_id
+
+        user = find_user_by_id(case["created_by"])
         if user:
             case["created_by_name"] = user.get("full_name") or user.get("email")
         else:
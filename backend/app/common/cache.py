@@ -0,0 +1,130 @@
+"""
+Process-local identity caches.
+
+Every decorated route resolves the caller with find_user_by_id, and
+listings, reports and summaries resolve the same few hundred users and
+cases over and over. ``user_cache`` (user_id -> user document without
+secrets) and ``case_cache`` (case_id -> number/title/status) keep them in
+memory for IDENTITY_CACHE_TTL_SECONDS, bounded to IDENTITY_CACHE_MAX_SIZE
+entries with least-recently-used eviction.
+
+Every user and case writer (create_user, update_user - which covers role
+changes and deactivation - create_case, update_case) publishes an
+invalidation for the entry it changes on the cache-invalidation bus
+(app.common.invalidation), which drops it here at once and in the other
+API processes within about INVALIDATION_POLL_SECONDS. The TTL is the backstop if a message is
+lost.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_MAX_SIZE = 4096
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire ``ttl`` seconds after they are set."""
+
+    def __init__(self, name, maxsize=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL_SECONDS):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def get(self, key):
+        """The cached value, or MISSING."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return MISSING
+
+    def get_many(self, keys):
+        """({key: value} for the cached keys, [keys that missed])."""
+        found, missing = {}, []
+        for key in keys:
+            value = self.get(key)
+            if value is MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        return found, missing
+
+    def set(self, key, value):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def handle_invalidation(self, key):
+        """Invalidation-bus handler: key None clears the whole cache."""
+        if key is None:
+            self.clear()
+        else:
+            self.invalidate(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def configure(self, maxsize, ttl):
+        with self._lock:
+            self.maxsize, self.ttl = maxsize, ttl
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+user_cache = TTLCache("users")
+case_cache = TTLCache("cases")
+
+
+def init_identity_caches(app):
+    """Size the identity caches from app config (IDENTITY_CACHE_TTL_SECONDS 0 disables them)."""
+    from app.common.invalidation import subscribe
+
+    maxsize = app.config.get("IDENTITY_CACHE_MAX_SIZE", DEFAULT_MAX_SIZE)
+    ttl = app.config.get("IDENTITY_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+    for cache in (user_cache, case_cache):
+        cache.configure(maxsize, ttl)
+        subscribe(cache.name, cache.handle_invalidation)
+
+
+def identity_cache_stats():
+    return {cache.name: cache.stats() for cache in (user_cache, case_cache)}
@@ -38,6 +38,9 @@ EVIDENCE_STATUSES = ["active", "archived", "disposed"]
 
 CASE_STATUSES = ["open", "closed", "archived"]
 
+# Upper bound on page sizes requested by clients
+MAX_PER_PAGE = 100
+
 TRANSFER_STATUSES = ["pending", "approved", "rejected", "completed", "cancelled"]
 
 AUDIT_ACTIONS = [
@@ -0,0 +1,180 @@
+"""
+Cache invalidation across API processes.
+
+Each gunicorn worker keeps its own in-process caches (app.common.cache),
+so an update in one worker must reach the others. publish(channel, key)
+drops the key from this process's caches at once and inserts a message
+into ``cache_invalidations``. Every process runs a listener thread that
+reads other processes' messages and invalidates the same keys locally.
+
+The collection is capped and read with a tailable cursor, which works on
+a standalone dev mongod as well as a replica set, unlike change streams.
+Deployments that cannot create capped collections get a plain collection
+with a TTL index, polled every INVALIDATION_POLL_SECONDS. If the listener
+loses its cursor it may have missed messages, so it clears every
+subscribed cache before resuming; the caches' TTL remains the backstop.
+"""
+
+import atexit
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+COLLECTION = "cache_invalidations"
+CAPPED_SIZE_BYTES = 4 * 1024 * 1024
+CAPPED_MAX_DOCUMENTS = 20000
+# Uncapped fallback: how long messages are kept.
+MESSAGE_TTL_SECONDS = 3600
+# Messages are re-read this far back on every (re)query: ObjectIds from
+# different processes are not strictly ordered, and invalidation is idempotent.
+OVERLAP = timedelta(seconds=5)
+
+_handlers = {}
+_handlers_lock = threading.Lock()
+_bus = None
+
+
+def subscribe(channel, handler):
+    """Call ``handler(key)`` for every invalidation on ``channel``; key None means everything."""
+    with _handlers_lock:
+        handlers = _handlers.setdefault(channel, [])
+        if handler not in handlers:
+            handlers.append(handler)
+
+
+def publish(channel, key=None):
+    """Invalidate ``key`` on ``channel`` in this process now and in the others shortly."""
+    _dispatch(channel, key)
+    if _bus is not None:
+        try:
+            _bus.publish(channel, key)
+        except Exception as e:
+            print(f"WARNING: Could not publish cache invalidation {channel}:{key}: {e}")
+
+
+class InvalidationBus:
+    def __init__(self, db, mode="auto", poll_seconds=1.0):
+        self.collection = db[COLLECTION]
+        self.poll_seconds = poll_seconds
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.tailable = self._ensure_collection(db) if mode != "poll" else False
+        self._seen = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def publish(self, channel, key):
+        self.collection.insert_one({
+            "channel": channel,
+            "key": key,
+            "origin": self.origin,
+            "at": datetime.now(timezone.utc),
+        })
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _ensure_collection(self, db):
+        """Create the capped collection if needed; returns whether it can be tailed."""
+        try:
+            db.create_collection(COLLECTION, capped=True, size=CAPPED_SIZE_BYTES, max=CAPPED_MAX_DOCUMENTS)
+            return True
+        except CollectionInvalid:
+            # Already exists; an uncapped one (from the fallback) cannot be tailed.
+            return bool(self.collection.options().get("capped"))
+        except OperationFailure as e:
+            print(f"WARNING: Capped collections unavailable ({e}); polling {COLLECTION} instead")
+            self.collection.create_index("at", expireAfterSeconds=MESSAGE_TTL_SECONDS)
+            return False
+
+    def _run(self):
+        since = datetime.now(timezone.utc)
+        while not self._stop.is_set():
+            try:
+                if self.tailable:
+                    since = self._tail(since)
+                else:
+                    since = self._poll(since)
+                    self._stop.wait(self.poll_seconds)
+            except Exception as e:
+                print(f"WARNING: Cache invalidation listener lost its cursor: {e}")
+                # Messages may have been missed while disconnected.
+                _dispatch_all()
+                since = datetime.now(timezone.utc)
+                self._stop.wait(self.poll_seconds)
+
+    def _tail(self, since):
+        cursor = self.collection.find(
+            self._query(since), cursor_type=CursorType.TAILABLE_AWAIT
+        ).max_await_time_ms(int(self.poll_seconds * 1000))
+        while cursor.alive and not self._stop.is_set():
+            for message in cursor:
+                since = self._handle(message)
+        # A tailable cursor dies when the collection is empty or it falls off the end of the cap.
+        self._stop.wait(self.poll_seconds)
+        return since
+
+    def _poll(self, since):
+        for message in self.collection.find(self._query(since)).sort("_id", 1):
+            since = self._handle(message)
+        return since
+
+    def _query(self, since):
+        return {"_id": {"$gte": ObjectId.from_datetime(since - OVERLAP)}, "origin": {"$ne": self.origin}}
+
+    def _handle(self, message):
+        """Dispatch a message once; returns its time, to resume from."""
+        at = message["_id"].generation_time
+        if message["_id"] not in self._seen:
+            self._seen[message["_id"]] = at
+            _dispatch(message["channel"], message.get("key"))
+        cutoff = at - 2 * OVERLAP
+        for message_id in [m for m, seen_at in self._seen.items() if seen_at < cutoff]:
+            del self._seen[message_id]
+        return at
+
+
+def init_invalidation_bus(app, db):
+    """Start this process's listener (INVALIDATION_BUS_MODE: auto, poll or off)."""
+    global _bus
+    mode = app.config.get("INVALIDATION_BUS_MODE", "auto")
+    if mode == "off":
+        _bus = None
+        return None
+    _bus = InvalidationBus(db, mode=mode, poll_seconds=app.config.get("INVALIDATION_POLL_SECONDS", 1.0))
+    _bus.start()
+    atexit.register(_bus.stop, 2)
+    return _bus
+
+
+def get_invalidation_bus():
+    return _bus
+
+
+def _dispatch(channel, key):
+    with _handlers_lock:
+        handlers = list(_handlers.get(channel, ()))
+    for handler in handlers:
+        try:
+            handler(key)
+        except Exception as e:
+            print(f"ERROR: Cache invalidation handler for {channel} failed: {e}")
+
+
+def _dispatch_all():
+    with _handlers_lock:
+        channels = list(_handlers)
+    for channel in channels:
+        _dispatch(channel, None)
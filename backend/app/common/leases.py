@@ -0,0 +1,43 @@
+"""
+Named leases in ``scheduler_leases`` for work that only one API process
+should do at a time (scheduled re-verification, backfills, archive
+sealing). A lease is held until ``expires_at``; the holder renews it by
+acquiring it again, and another process can take it over once it lapses.
+"""
+
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+
+def new_holder():
+    """A holder id that is unique per process and caller."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def acquire_lease(db, name, holder, seconds):
+    """Take or renew the lease ``name`` for ``seconds``; returns whether ``holder`` now holds it."""
+    now = datetime.now(timezone.utc)
+    try:
+        lease = db.scheduler_leases.find_one_and_update(
+            {"name": name, "$or": [{"holder": holder}, {"expires_at": {"$lt": now}}]},
+            {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=seconds)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # Someone else holds an unexpired lease (the upsert collided with it).
+        return False
+    return lease is not None and lease["holder"] == holder
+
+
+def release_lease(db, name, holder):
+    # Set in the past: stored times have millisecond precision, so "now" could still look held.
+    db.scheduler_leases.update_one(
+        {"name": name, "holder": holder},
+        {"$set": {"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)}},
+    )
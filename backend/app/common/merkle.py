@@ -0,0 +1,162 @@
+"""
+Merkle tree primitives (RFC 6962 / RFC 9162 hashing).
+
+Trees are described by a ``get_node(level, index)`` callable returning the
+hash of the perfect subtree covering leaves
+``[index * 2**level, (index + 1) * 2**level)``. Level 0 nodes are leaf
+hashes. Only those perfect subtrees ever need to be stored; every other
+range hash, audit path and consistency proof is derived from them in
+O(log n) lookups.
+"""
+
+import hashlib
+
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+
+def leaf_hash(data):
+    return hashlib.sha256(b"\x00" + data).digest()
+
+
+def node_hash(left, right):
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def completed_nodes(index, leaf, get_node):
+    """
+    Nodes made available by appending ``leaf`` at ``index``: the leaf itself
+    plus every perfect subtree it completes, as (level, index, hash) tuples.
+    """
+    nodes = [(0, index, leaf)]
+    level, position, current = 0, index, leaf
+    while position & 1:
+        current = node_hash(get_node(level, position - 1), current)
+        level += 1
+        position >>= 1
+        nodes.append((level, position, current))
+    return nodes
+
+
+def peak_positions(size):
+    """(level, index) of the perfect subtrees that make up a tree of ``size`` leaves."""
+    peaks = []
+    offset = 0
+    for level in reversed(range(size.bit_length())):
+        if size & (1 << level):
+            peaks.append((level, offset >> level))
+            offset += 1 << level
+    return peaks
+
+
+def subtree_hash(start, end, get_node):
+    """MTH(D[start:end])."""
+    count = end - start
+    if count == 0:
+        return EMPTY_ROOT
+    if count & (count - 1) == 0 and start % count == 0:
+        return get_node(count.bit_length() - 1, start // count)
+    split = _split(count)
+    return node_hash(
+        subtree_hash(start, start + split, get_node),
+        subtree_hash(start + split, end, get_node),
+    )
+
+
+def root_hash(size, get_node):
+    return subtree_hash(0, size, get_node)
+
+
+def inclusion_path(index, size, get_node):
+    """Audit path for leaf ``index`` in the tree of the first ``size`` leaves."""
+    return _path(index, 0, size, get_node)
+
+
+def consistency_proof(first, second, get_node):
+    """Proof that the tree of ``first`` leaves is a prefix of the tree of ``second``."""
+    if first == second:
+        return []
+    return _subproof(first, 0, second, True, get_node)
+
+
+def verify_inclusion(leaf, index, size, path, root):
+    """Check an audit path (RFC 9162 section 2.1.3.2)."""
+    if index >= size:
+        return False
+    fn, sn = index, size - 1
+    current = leaf
+    for sibling in path:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            current = node_hash(sibling, current)
+            if not fn & 1:
+                while not fn & 1 and fn != 0:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            current = node_hash(current, sibling)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and current == root
+
+
+def verify_consistency(first, second, first_root, second_root, proof):
+    """Check a consistency proof (RFC 9162 section 2.1.4.2)."""
+    if first > second or first == 0:
+        return False
+    if first == second:
+        return not proof and first_root == second_root
+    if not proof:
+        return False
+
+    proof = list(proof)
+    if first & (first - 1) == 0:
+        proof.insert(0, first_root)
+
+    fn, sn = first - 1, second - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+
+    first_hash = second_hash = proof[0]
+    for node in proof[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            first_hash = node_hash(node, first_hash)
+            second_hash = node_hash(node, second_hash)
+            if not fn & 1:
+                while not fn & 1 and fn != 0:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            second_hash = node_hash(second_hash, node)
+        fn >>= 1
+        sn >>= 1
+
+    return sn == 0 and first_hash == first_root and second_hash == second_root
+
+
+def _split(count):
+    """Largest power of two strictly smaller than ``count``."""
+    return 1 << ((count - 1).bit_length() - 1)
+
+
+def _path(index, start, end, get_node):
+    count = end - start
+    if count <= 1:
+        return []
+    split = _split(count)
+    if index < split:
+        return _path(index, start, start + split, get_node) + [subtree_hash(start + split, end, get_node)]
+    return _path(index - split, start + split, end, get_node) + [subtree_hash(start, start + split, get_node)]
+
+
+def _subproof(first, start, end, complete, get_node):
+    count = end - start
+    if first == count:
+        return [] if complete else [subtree_hash(start, end, get_node)]
+    split = _split(count)
+    if first <= split:
+        return _subproof(first, start, start + split, complete, get_node) + [subtree_hash(start + split, end, get_node)]
+    return _subproof(first - split, start + split, end, False, get_node) + [subtree_hash(start, start + split, get_node)]
@@ -1,4 +1,5 @@
 import re
+from app.common.constants import MAX_PER_PAGE
 from app.common.errors import ValidationError
 
 
@@ -15,3 +16,8 @@ def validate_email(email):
     if not re.match(pattern, email):
         raise ValidationError("Invalid email format")
     return email.lower().strip()
+
+
+def clamp_page(page, per_page, default_per_page=10):
+    """Page number and page size from client input, bounded to 1..MAX_PER_PAGE."""
+    return max(1, page or 1), min(max(1, per_page or default_per_page), MAX_PER_PAGE)
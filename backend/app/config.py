@@ -11,8 +11,73 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     UPLOAD_FOLDER = os.path.join(basedir, "uploads")
-    MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # 500MB
+    MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # 500MB per request; larger files use chunked uploads
+    UPLOAD_CHUNK_MAX_SIZE = 64 * 1024 * 1024
+    UPLOAD_MAX_FILE_SIZE = int(os.environ.get("UPLOAD_MAX_FILE_SIZE", 0)) or None  # None = unlimited
+    UPLOAD_SESSION_HOURS = 24
     CORS_ORIGINS = "*"
+    # sha256 is always computed; add sha1/md5 for forensic tool interop
+    EVIDENCE_HASH_ALGORITHMS = tuple(
+        a.strip() for a in os.environ.get("EVIDENCE_HASH_ALGORITHMS", "sha256").split(",") if a.strip()
+    )
+    # Hash read size in bytes (0 = sized per file); mmap local files instead of read() when hashing.
+    # Tune both per deployment with benchmark_hashing.py.
+    EVIDENCE_HASH_BUFFER_SIZE = int(os.environ.get("EVIDENCE_HASH_BUFFER_SIZE", 0))
+    EVIDENCE_HASH_MMAP = os.environ.get("EVIDENCE_HASH_MMAP", "false").lower() == "true"
+
+    # Per-process user/case identity caches (TTL bounds staleness across processes; 0 disables)
+    IDENTITY_CACHE_TTL_SECONDS = int(os.environ.get("IDENTITY_CACHE_TTL_SECONDS", 60))
+    IDENTITY_CACHE_MAX_SIZE = int(os.environ.get("IDENTITY_CACHE_MAX_SIZE", 4096))
+    # Cross-process cache invalidation: "auto" (tail a capped collection, else poll), "poll" or "off"
+    INVALIDATION_BUS_MODE = os.environ.get("INVALIDATION_BUS_MODE", "auto")
+    INVALIDATION_POLL_SECONDS = float(os.environ.get("INVALIDATION_POLL_SECONDS", 1))
+
+    # Evidence file storage: "local" (UPLOAD_FOLDER) or "s3" (needs boto3; set
+    # S3_ENDPOINT_URL for MinIO or another S3-compatible store)
+    STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "local")
+    S3_BUCKET = os.environ.get("S3_BUCKET", "evidence")
+    S3_PREFIX = os.environ.get("S3_PREFIX", "")
+    S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL")
+    S3_REGION = os.environ.get("S3_REGION")
+    S3_ACCESS_KEY = os.environ.get("S3_ACCESS_KEY")
+    S3_SECRET_KEY = os.environ.get("S3_SECRET_KEY")
+
+    # Background bulk verification
+    BULK_VERIFY_MAX_ITEMS = 1000
+    BULK_VERIFY_WORKERS = int(os.environ.get("BULK_VERIFY_WORKERS", 0)) or None  # None = min(8, CPU count)
+
+    # Backfill the denormalized evidence read model (names, case numbers) at startup
+    READ_MODEL_BACKFILL = os.environ.get("READ_MODEL_BACKFILL", "true").lower() == "true"
+
+    # Transfers reuse a verification this recent as the custody hash (0 = always re-hash, in the background)
+    TRANSFER_HASH_REUSE_MINUTES = int(os.environ.get("TRANSFER_HASH_REUSE_MINUTES", 60))
+    TRANSFER_HASH_RETRY_MINUTES = 30  # stuck/failed custody hashes are retried by the reverify sweep
+
+    # Fast-tier checks escalate to a full SHA-256 at least this often
+    VERIFY_FULL_CADENCE_DAYS = int(os.environ.get("VERIFY_FULL_CADENCE_DAYS", 30))
+
+    # Scheduled re-verification daemon (one active sweeper across processes, via a lease)
+    REVERIFY_ENABLED = os.environ.get("REVERIFY_ENABLED", "true").lower() == "true"
+    REVERIFY_INTERVAL_DAYS = int(os.environ.get("REVERIFY_INTERVAL_DAYS", 7))
+    REVERIFY_BANDWIDTH_MBPS = float(os.environ.get("REVERIFY_BANDWIDTH_MBPS", 20))  # 0 = unlimited
+    REVERIFY_CONCURRENCY = int(os.environ.get("REVERIFY_CONCURRENCY", 2))
+    REVERIFY_BATCH_SIZE = 20
+    REVERIFY_IDLE_SECONDS = 300  # pause when nothing is due
+    REVERIFY_LEASE_SECONDS = 120
+
+    # Audit log group-commit writer
+    AUDIT_ASYNC_WRITES = os.environ.get("AUDIT_ASYNC_WRITES", "true").lower() == "true"
+    AUDIT_BATCH_SIZE = 200
+    AUDIT_QUEUE_SIZE = 10000
+    AUDIT_ENQUEUE_TIMEOUT = 2.0  # seconds a full queue blocks callers
+    AUDIT_SPILL_FOLDER = os.environ.get("AUDIT_SPILL_FOLDER", os.path.join(basedir, "audit_spill"))
+    AUDIT_CHECKPOINT_KEY = os.environ.get("AUDIT_CHECKPOINT_KEY")  # falls back to SECRET_KEY
+    AUDIT_VERIFY_WORKERS = int(os.environ.get("AUDIT_VERIFY_WORKERS", 0)) or None  # None = CPU count
+    AUDIT_CHECK_QUERY_PLANS = True  # explain() audit query shapes at startup
+    # Segments sealed before they went through the storage backend
+    AUDIT_ARCHIVE_FOLDER = os.environ.get("AUDIT_ARCHIVE_FOLDER", os.path.join(basedir, "audit_archive"))
+    AUDIT_HOT_RETENTION_DAYS = int(os.environ.get("AUDIT_HOT_RETENTION_DAYS", 90))
+    AUDIT_SEGMENT_SIZE = 50000  # entries per sealed archive segment
 
 
 class DevelopmentConfig(Config):
@@ -26,6 +91,10 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     MONGO_URI = "mongodb://localhost:27017/dcoc_test"
+    AUDIT_ASYNC_WRITES = False
+    REVERIFY_ENABLED = False
+    INVALIDATION_BUS_MODE = "off"
+    READ_MODEL_BACKFILL = False
 
 
 config = {
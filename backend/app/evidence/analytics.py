@@ -8,6 +8,7 @@ to provide chart-ready statistics.
 from datetime import datetime, timezone, timedelta
 from collections import Counter
 
+from app.audit.archive import find_logs
 from app.extensions import mongo
 
 
@@ -70,10 +71,11 @@ def get_dashboard_analytics():
 
     # --- Activity over last 7 days (Bar chart) ---
     seven_days_ago = now - timedelta(days=7)
-    recent_logs = list(mongo.db.audit_logs.find(
+    recent_logs = find_logs(
+        mongo.db,
         {"timestamp": {"$gte": seven_days_ago}},
         {"action": 1, "timestamp": 1, "_id": 0}
-    ))
+    )
     activity_by_day = []
     for i in range(7):
         day = seven_days_ago + timedelta(days=i)
@@ -0,0 +1,100 @@
+"""
+Content-addressed, reference-counted evidence file store.
+
+Files live once under the storage key ``blobs/ab/cd/<sha256>`` no matter
+how many evidence records point at them. ``evidence_blobs`` keeps one document
+per blob with its reference count; every evidence record holds one
+reference (``blob_sha256``) and gives it back when it is disposed.
+
+The count is bumped before a file is put in place and a blob is freed by
+deleting its document first, then moving the object aside and re-checking
+the count, so an upload of the same bytes racing a disposal either keeps
+the file or puts it back. An object already at a blob's key is only
+reused after its size and SHA-256 are checked; a truncated or altered one
+is overwritten with the freshly uploaded bytes.
+"""
+
+import os
+import uuid
+from datetime import datetime, timezone
+
+from flask import current_app
+from pymongo import ReturnDocument
+
+from app.evidence.hashing import hash_chunks
+from app.evidence.storage import get_storage
+from app.extensions import mongo
+
+
+def blob_key(sha256):
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def store_blob(temp_path, sha256, size):
+    """
+    Move the already hashed local file at ``temp_path`` into storage, or drop
+    it if identical bytes are already stored (checked, not assumed). Takes
+    one reference; returns the blob's storage key.
+    """
+    now = datetime.now(timezone.utc)
+    mongo.db.evidence_blobs.update_one(
+        {"sha256": sha256},
+        {"$inc": {"ref_count": 1}, "$set": {"last_referenced_at": now},
+         "$setOnInsert": {"size": size, "created_at": now}},
+        upsert=True,
+    )
+
+    key = blob_key(sha256)
+    storage = get_storage()
+    stat = storage.stat(key)
+    if stat is not None and _stored_blob_matches(storage, key, stat, sha256, size):
+        os.remove(temp_path)
+    else:
+        if stat is not None:
+            print(f"WARNING: Stored blob {sha256} does not match its hash; replacing it with the uploaded bytes")
+        storage.put_file(key, temp_path)
+    return key
+
+
+def _stored_blob_matches(storage, key, stat, sha256, size):
+    if stat["size"] != size:
+        return False
+    try:
+        return hash_chunks(storage.open(key))["sha256"] == sha256
+    except FileNotFoundError:
+        return False
+
+
+def release_blob(sha256):
+    """Drop one reference; the file is deleted with the last one. Returns True if it was freed."""
+    blob = mongo.db.evidence_blobs.find_one_and_update(
+        {"sha256": sha256}, {"$inc": {"ref_count": -1}}, return_document=ReturnDocument.AFTER
+    )
+    if blob is None or blob["ref_count"] > 0:
+        return False
+    if mongo.db.evidence_blobs.delete_one({"sha256": sha256, "ref_count": {"$lte": 0}}).deleted_count != 1:
+        return False
+
+    key = blob_key(sha256)
+    storage = get_storage()
+    doomed = f"{key}.{uuid.uuid4().hex}.deleting"
+    try:
+        storage.move(key, doomed)
+    except FileNotFoundError:
+        return True
+    if mongo.db.evidence_blobs.find_one({"sha256": sha256}, {"_id": 1}) and storage.stat(key) is None:
+        # The same bytes were uploaded again while this blob was being freed.
+        storage.move(doomed, key)
+        return False
+    storage.delete(doomed)
+    # A re-upload racing this keeps its blob but may lose the tree; it is rebuilt on demand.
+    from app.evidence.merkle import delete_chunk_tree
+    delete_chunk_tree(sha256)
+    return True
+
+
+def staging_path():
+    """A fresh local temp path, on the same filesystem as the store when storage is local."""
+    staging_dir = os.path.join(current_app.config["UPLOAD_FOLDER"], ".staging")
+    os.makedirs(staging_dir, exist_ok=True)
+    return os.path.join(staging_dir, f"{uuid.uuid4().hex}.part")
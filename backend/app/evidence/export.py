@@ -9,8 +9,12 @@ import csv
 import io
 from datetime import datetime
 
+from app.common.lookups import user_names
+from app.evidence.services import enrich_evidence
 from app.extensions import mongo
 
+AUDIT_EXPORT_BATCH_SIZE = 500
+
 
 def export_evidence_csv(case_id=None):
     """Export evidence list to CSV."""
@@ -19,6 +23,7 @@ def export_evidence_csv(case_id=None):
         query["case_id"] = case_id
 
     evidence = list(mongo.db.evidence.find(query, {"_id": 0, "file_path": 0}).sort("created_at", -1))
+    enrich_evidence(evidence)
 
     output = io.StringIO()
     writer = csv.writer(output)
@@ -35,10 +40,6 @@ def export_evidence_csv(case_id=None):
     ])
 
     for e in evidence:
-        # Resolve user names
-        uploader = mongo.db.users.find_one({"user_id": e.get("uploaded_by")})
-        custodian = mongo.db.users.find_one({"user_id": e.get("current_custodian_id")})
-
         writer.writerow([
             e.get("evidence_id", ""),
             e.get("file_name", ""),
@@ -49,8 +50,8 @@ def export_evidence_csv(case_id=None):
             e.get("original_hash", ""),
             e.get("file_size", 0),
             e.get("case_id", ""),
-            uploader["full_name"] if uploader else "",
-            custodian["full_name"] if custodian else "",
+            e.get("uploaded_by_name", ""),
+            e.get("custodian_name", ""),
             e.get("latitude", ""),
             e.get("longitude", ""),
             e.get("collection_location", ""),
@@ -63,9 +64,34 @@ def export_evidence_csv(case_id=None):
     return output.getvalue()
 
 
-def export_audit_csv():
-    """Export audit logs to CSV."""
-    logs = list(mongo.db.audit_logs.find({}, {"_id": 0}).sort("timestamp", -1).limit(5000))
+def export_audit_csv(start=None, end=None, from_sequence=None, to_sequence=None):
+    """
+    Stream audit logs as CSV in chain order.
+
+    Yields CSV text a few hundred rows at a time from a batched cursor, so
+    memory stays flat however long the chain is. ``start``/``end`` bound the
+    timestamp and ``from_sequence``/``to_sequence`` the chain_sequence
+    (all inclusive).
+    """
+    from app.audit.archive import iter_chain
+
+    query = {}
+    if start or end:
+        query["timestamp"] = {}
+        if start:
+            query["timestamp"]["$gte"] = start
+        if end:
+            query["timestamp"]["$lte"] = end
+
+    # Reads the sealed archive segments first, then the hot collection.
+    logs = iter_chain(
+        mongo.db,
+        after_sequence=max(0, (from_sequence or 1) - 1),
+        end_sequence=to_sequence,
+        query=query or None,
+        projection={"_id": 0, "metadata": 0},
+        batch_size=AUDIT_EXPORT_BATCH_SIZE,
+    )
 
     output = io.StringIO()
     writer = csv.writer(output)
@@ -77,6 +103,7 @@ def export_audit_csv():
         "Timestamp",
     ])
 
+    rows = 0
     for log in logs:
         writer.writerow([
             log.get("log_id", ""),
@@ -86,18 +113,24 @@ def export_audit_csv():
             log.get("user_email", ""),
             log.get("user_role", ""),
             log.get("details", ""),
-            log.get("hash", ""),
-            log.get("previous_hash", ""),
+            log.get("hash_of_entry", ""),
+            log.get("previous_log_hash", ""),
             log.get("chain_sequence", ""),
             _fmt_date(log.get("timestamp")),
         ])
+        rows += 1
+        if rows % AUDIT_EXPORT_BATCH_SIZE == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
 
-    return output.getvalue()
+    yield output.getvalue()
 
 
 def export_cases_csv():
     """Export cases list to CSV."""
     cases = list(mongo.db.cases.find({}, {"_id": 0}).sort("created_at", -1))
+    names = user_names(c.get("created_by") for c in cases)
 
     output = io.StringIO()
     writer = csv.writer(output)
@@ -110,14 +143,13 @@ def export_cases_csv():
     ])
 
     for c in cases:
-        creator = mongo.db.users.find_one({"user_id": c.get("created_by")})
         writer.writerow([
             c.get("case_id", ""),
             c.get("case_number", ""),
             c.get("title", ""),
             c.get("description", ""),
             c.get("status", ""),
-            creator["full_name"] if creator else c.get("created_by_name", ""),
+            names.get(c.get("created_by")) or c.get("created_by_name", ""),
             c.get("retention_days", ""),
             c.get("closing_reason", ""),
             c.get("closed_by_name", ""),
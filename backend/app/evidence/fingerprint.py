@@ -0,0 +1,70 @@
+"""
+Cheap integrity fingerprints for the fast verification tier.
+
+A fingerprint is the stored object's stat identity (size, mtime and inode
+on local disk; size, mtime and ETag on S3) plus a SHA-256 over a fixed set
+of sampled blocks: the first and last block and evenly spaced ones in
+between. Checking it costs one stat and SAMPLE_COUNT small reads however
+large the file is. It is a tripwire, not a proof: any change it sees
+escalates to a full SHA-256, and a full hash is still forced every
+VERIFY_FULL_CADENCE_DAYS because edits that keep size and sampled blocks
+and restore the mtime would slip past it.
+"""
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+FULL_CADENCE_DAYS = 30
+SAMPLE_COUNT = 16
+SAMPLE_BLOCK_SIZE = 64 * 1024
+FINGERPRINT_VERSION = 1
+IDENTITY_FIELDS = ("size", "modified_at", "inode", "etag")
+
+
+def compute_fingerprint(storage, key, throttle=None):
+    """Fingerprint the stored object ``key``; raises FileNotFoundError if it is gone."""
+    info = storage.stat(key)
+    if info is None:
+        raise FileNotFoundError(key)
+    fingerprint = {field: info[field] for field in IDENTITY_FIELDS if info.get(field) is not None}
+    fingerprint["version"] = FINGERPRINT_VERSION
+    fingerprint["sample_digest"] = sample_digest(storage, key, info["size"], throttle)
+    return fingerprint
+
+
+def sample_digest(storage, key, size, throttle=None):
+    hasher = hashlib.sha256(size.to_bytes(8, "big"))
+    for offset in sample_offsets(size):
+        for chunk in storage.open(key, offset, min(size, offset + SAMPLE_BLOCK_SIZE)):
+            if throttle is not None:
+                throttle(len(chunk))
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def sample_offsets(size):
+    """Block offsets to sample, deterministic in the file size."""
+    if size <= SAMPLE_COUNT * SAMPLE_BLOCK_SIZE:
+        return list(range(0, size, SAMPLE_BLOCK_SIZE))
+    last = size - SAMPLE_BLOCK_SIZE
+    return [last * i // (SAMPLE_COUNT - 1) for i in range(SAMPLE_COUNT)]
+
+
+def fingerprint_matches(stored, current):
+    """True when nothing the fingerprint can see has changed."""
+    if not stored or stored.get("version") != current.get("version"):
+        return False
+    return all(stored.get(field) == current.get(field) for field in IDENTITY_FIELDS + ("sample_digest",))
+
+
+def full_hash_due(ev, cadence_days=FULL_CADENCE_DAYS):
+    """Whether ``ev`` needs a full SHA-256 regardless of its fingerprint."""
+    # Only a full hash may clear a tampered (or never checked) status.
+    if not ev.get("fingerprint") or ev.get("integrity_status") != "intact":
+        return True
+    last_full = ev.get("last_full_verified_at") or ev.get("created_at")
+    if not isinstance(last_full, datetime):
+        return True
+    if last_full.tzinfo is None:
+        last_full = last_full.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - last_full >= timedelta(days=cadence_days)
@@ -0,0 +1,170 @@
+"""
+Evidence file hashing.
+
+Uploads are hashed while they are written (copy_and_hash), so each byte
+is read from the request stream exactly once and never re-read from disk.
+SHA-256 is always computed; SHA-1 and MD5 can be added for interop with
+forensic tools that still report them.
+
+Reads go through ``readinto`` on one reusable buffer per call, so hashing
+a large file does not allocate a new bytes object per chunk. The buffer
+is sized to the file (buffer_size_for): small files are read in one call,
+large ones in multi-megabyte reads that keep NVMe and network storage
+busy. hashlib releases the GIL for buffers this size, so files hashed on
+separate threads really do hash in parallel. Local files can optionally be
+hashed straight from an mmap (EVIDENCE_HASH_MMAP), which skips the copy
+into userspace; whether that wins depends on the filesystem, so
+benchmark_hashing.py measures both on the deployment's own storage.
+"""
+
+import hashlib
+import mmap
+import os
+
+from app.common.errors import ValidationError
+
+HASH_CHUNK_SIZE = 1024 * 1024
+MIN_BUFFER_SIZE = 64 * 1024
+MAX_BUFFER_SIZE = 8 * 1024 * 1024
+SUPPORTED_ALGORITHMS = ("sha256", "sha1", "md5")
+
+# Set from app config by configure_hashing; 0 means adaptive.
+_buffer_size = 0
+_use_mmap = False
+
+
+def configure_hashing(app):
+    """Apply EVIDENCE_HASH_BUFFER_SIZE / EVIDENCE_HASH_MMAP from app config."""
+    global _buffer_size, _use_mmap
+    _buffer_size = app.config.get("EVIDENCE_HASH_BUFFER_SIZE") or 0
+    _use_mmap = bool(app.config.get("EVIDENCE_HASH_MMAP"))
+
+
+def buffer_size_for(file_size=None):
+    """Read size for a file of ``file_size`` bytes (unknown size: HASH_CHUNK_SIZE)."""
+    if _buffer_size:
+        return _buffer_size
+    if file_size is None:
+        return HASH_CHUNK_SIZE
+    if file_size <= HASH_CHUNK_SIZE:
+        # Small files: one read.
+        return max(MIN_BUFFER_SIZE, _round_up(file_size, MIN_BUFFER_SIZE))
+    # Large files: ~64 reads, between HASH_CHUNK_SIZE and MAX_BUFFER_SIZE each.
+    return max(HASH_CHUNK_SIZE, min(MAX_BUFFER_SIZE, _round_up(file_size // 64, MIN_BUFFER_SIZE)))
+
+
+def new_hashers(algorithms=("sha256",)):
+    """hashlib objects for ``algorithms``, always including sha256."""
+    algorithms = ["sha256"] + [a for a in algorithms if a != "sha256"]
+    hashers = {}
+    for algorithm in algorithms:
+        if algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValidationError(f"Unsupported hash algorithm: {algorithm}")
+        # sha1/md5 are fingerprints here, not security primitives; keeps FIPS builds working.
+        hashers[algorithm] = hashlib.new(algorithm, usedforsecurity=algorithm == "sha256")
+    return hashers
+
+
+def copy_and_hash(source, destination, algorithms=("sha256",), chunk_size=HASH_CHUNK_SIZE, tree=None):
+    """
+    Copy the readable stream ``source`` into the writable ``destination``,
+    hashing on the way through. Returns (bytes_copied, {algorithm: hexdigest}).
+    A ChunkTreeHasher passed as ``tree`` is fed the same bytes.
+    """
+    hashers = new_hashers(algorithms)
+    size = 0
+    for chunk in read_chunks(source, chunk_size):
+        for hasher in hashers.values():
+            hasher.update(chunk)
+        if tree is not None:
+            tree.update(chunk)
+        destination.write(chunk)
+        size += len(chunk)
+    return size, _hexdigests(hashers)
+
+
+def read_chunks(source, chunk_size=HASH_CHUNK_SIZE, limit=None):
+    """
+    Iterate over ``source`` as memoryviews into one reusable buffer, up to
+    ``limit`` bytes. Each view is only valid until the next one is yielded:
+    hash or write it, do not keep it. Streams without readinto fall back
+    to read().
+    """
+    readinto = getattr(source, "readinto", None)
+    if readinto is None:
+        yield from _read_chunks_copying(source, chunk_size, limit)
+        return
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    remaining = limit
+    while remaining is None or remaining > 0:
+        n = readinto(view if remaining is None or remaining >= chunk_size else view[:remaining])
+        if not n:
+            break
+        if remaining is not None:
+            remaining -= n
+        yield view[:n]
+
+
+def hash_file(file_path, algorithms=("sha256",), buffer_size=None, use_mmap=None, throttle=None):
+    """
+    Hash a file on disk; returns {algorithm: hexdigest}. ``throttle(n)`` is
+    called before each block is hashed. ``use_mmap`` defaults to the
+    configured EVIDENCE_HASH_MMAP.
+    """
+    hashers = new_hashers(algorithms)
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        buffer_size = buffer_size or buffer_size_for(size)
+        if _use_mmap if use_mmap is None else use_mmap:
+            # mmap cannot map an empty file; there is nothing to hash anyway.
+            if size:
+                _update_from_mmap(hashers, f, size, buffer_size, throttle)
+            return _hexdigests(hashers)
+        for chunk in read_chunks(f, buffer_size):
+            if throttle is not None:
+                throttle(len(chunk))
+            for hasher in hashers.values():
+                hasher.update(chunk)
+    return _hexdigests(hashers)
+
+
+def hash_chunks(chunks, algorithms=("sha256",)):
+    """Hash an iterable of byte chunks, e.g. a storage backend stream; returns {algorithm: hexdigest}."""
+    hashers = new_hashers(algorithms)
+    for chunk in chunks:
+        for hasher in hashers.values():
+            hasher.update(chunk)
+    return _hexdigests(hashers)
+
+
+def _update_from_mmap(hashers, f, size, block_size, throttle):
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if hasattr(mapped, "madvise"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        with memoryview(mapped) as view:
+            for offset in range(0, size, block_size):
+                with view[offset:offset + block_size] as block:
+                    if throttle is not None:
+                        throttle(len(block))
+                    for hasher in hashers.values():
+                        hasher.update(block)
+
+
+def _read_chunks_copying(source, chunk_size, limit):
+    remaining = limit
+    while remaining is None or remaining > 0:
+        chunk = source.read(chunk_size if remaining is None else min(chunk_size, remaining))
+        if not chunk:
+            break
+        if remaining is not None:
+            remaining -= len(chunk)
+        yield chunk
+
+
+def _round_up(n, multiple):
+    return -(-n // multiple) * multiple
+
+
+def _hexdigests(hashers):
+    return {name: hasher.hexdigest() for name, hasher in hashers.items()}
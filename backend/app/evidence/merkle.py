@@ -0,0 +1,230 @@
+"""
+Chunk-level Merkle trees over evidence files.
+
+Each file is split into CHUNK_SIZE chunks; leaf ``i`` is the RFC 6962 leaf
+hash of chunk ``i`` and the tree is the same one app.common.merkle builds
+for the audit log. Leaves are computed in the same pass that computes the
+upload's SHA-256 and stored once per blob in ``evidence_chunk_trees``;
+evidence records keep the root as ``merkle_root`` next to
+``original_hash``. Leaves are packed 32-byte digests inside the document
+up to MAX_INLINE_LEAVES (1 TiB of file at the default chunk size); larger
+trees keep them in the storage backend under ``chunk-trees/`` so the
+document stays far below MongoDB's 16 MB limit.
+
+With the leaves on hand:
+- the "chunked" verification tier hashes chunks in parallel and reports
+  which byte ranges changed instead of a bare mismatch,
+- a byte range can be verified by hashing only the chunks that cover it,
+- a client can verify a downloaded range itself against the root with
+  per-chunk inclusion proofs.
+"""
+
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app.common import merkle
+from app.common.errors import ValidationError
+from app.evidence.storage import get_storage
+from app.extensions import mongo
+
+CHUNK_SIZE = 4 * 1024 * 1024
+MAX_PROOF_CHUNKS = 256
+MAX_INLINE_LEAVES = 256 * 1024  # 8 MiB of packed leaves
+LEAVES_PREFIX = "chunk-trees"
+
+
+class ChunkTreeHasher:
+    """Incremental leaf hashing: feed the file in order through update(), any buffer sizes."""
+
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.leaves = []
+        self._current = hashlib.sha256(b"\x00")
+        self._filled = 0
+
+    def update(self, data):
+        view = memoryview(data)
+        while len(view):
+            take = min(len(view), self.chunk_size - self._filled)
+            self._current.update(view[:take])
+            self._filled += take
+            view = view[take:]
+            if self._filled == self.chunk_size:
+                self._finish_leaf()
+
+    def finish(self):
+        """All leaf hashes, including a final partial chunk."""
+        if self._filled:
+            self._finish_leaf()
+        return self.leaves
+
+    def _finish_leaf(self):
+        self.leaves.append(self._current.digest())
+        self._current = hashlib.sha256(b"\x00")
+        self._filled = 0
+
+
+def tree_root(leaves):
+    return merkle.root_hash(len(leaves), _node_getter(leaves)).hex()
+
+
+def save_chunk_tree(sha256, size, leaves, chunk_size=CHUNK_SIZE):
+    """Store the leaves for blob ``sha256``; identical content always has identical leaves."""
+    root = tree_root(leaves)
+    tree = {"chunk_size": chunk_size, "size": size, "leaf_count": len(leaves), "root": root}
+    # Packed 32-byte digests: half the size of hex.
+    packed = b"".join(leaves)
+    if len(leaves) > MAX_INLINE_LEAVES:
+        tree["leaves_key"] = _leaves_key(sha256)
+        get_storage().put(tree["leaves_key"], io.BytesIO(packed))
+    else:
+        tree["leaves"] = packed
+    mongo.db.evidence_chunk_trees.update_one({"sha256": sha256}, {"$setOnInsert": tree}, upsert=True)
+    return root
+
+
+def get_chunk_tree(sha256):
+    tree = mongo.db.evidence_chunk_trees.find_one({"sha256": sha256}, {"_id": 0})
+    if tree:
+        if "leaves_key" in tree:
+            packed = b"".join(get_storage().open(tree["leaves_key"]))
+        else:
+            packed = bytes(tree["leaves"])
+        tree["leaves"] = [packed[i:i + 32] for i in range(0, len(packed), 32)]
+    return tree
+
+
+def ensure_chunk_tree(storage, key, sha256):
+    """
+    The blob's tree, built by reading the stored file if it was not computed
+    at upload (older evidence). Returns None if the file no longer matches
+    ``sha256``: a tree built from altered bytes must never become the baseline.
+    """
+    tree = get_chunk_tree(sha256)
+    if tree is None:
+        hasher = ChunkTreeHasher()
+        content_hash = hashlib.sha256()
+        size = 0
+        for chunk in storage.open(key):
+            hasher.update(chunk)
+            content_hash.update(chunk)
+            size += len(chunk)
+        if content_hash.hexdigest() != sha256:
+            return None
+        save_chunk_tree(sha256, size, hasher.finish())
+        tree = get_chunk_tree(sha256)
+    return tree
+
+
+def delete_chunk_tree(sha256):
+    tree = mongo.db.evidence_chunk_trees.find_one_and_delete({"sha256": sha256}, {"leaves_key": 1})
+    if tree and tree.get("leaves_key"):
+        get_storage().delete(tree["leaves_key"])
+
+
+def verify_chunks(storage, key, tree, start=0, end=None, throttle=None, workers=None):
+    """
+    Re-hash the chunks covering bytes [start, end) in parallel and compare
+    them with the stored leaves. Returns {"matches", "chunks_checked",
+    "mismatched_ranges", "merkle_root"}; merkle_root is recomputed only for
+    a whole-file check.
+    """
+    size, chunk_size = tree["size"], tree["chunk_size"]
+    whole_file = start == 0 and end in (None, size)
+    end = size if end is None else end
+    if whole_file:
+        info = storage.stat(key)
+        if info is None:
+            raise FileNotFoundError(key)
+        current_size = info["size"]
+    indices = range(0) if whole_file and size == 0 else range(*_chunk_span(tree, start, end))
+
+    workers = max(1, workers or min(8, os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        leaves = list(pool.map(lambda i: _leaf(storage, key, i, chunk_size, size, throttle), indices))
+
+    mismatched = []
+    for index, leaf in zip(indices, leaves):
+        if leaf != tree["leaves"][index]:
+            chunk_start = index * chunk_size
+            chunk_end = min(size, chunk_start + chunk_size)
+            if mismatched and mismatched[-1][1] == chunk_start:
+                mismatched[-1][1] = chunk_end
+            else:
+                mismatched.append([chunk_start, chunk_end])
+
+    if whole_file and current_size != size:
+        # Truncated or appended to: everything past the shorter length differs.
+        tail = [min(size, current_size), max(size, current_size)]
+        if mismatched and mismatched[-1][1] >= tail[0]:
+            mismatched[-1] = [min(mismatched[-1][0], tail[0]), max(mismatched[-1][1], tail[1])]
+        else:
+            mismatched.append(tail)
+
+    result = {"matches": not mismatched, "chunks_checked": len(leaves), "mismatched_ranges": mismatched}
+    if whole_file:
+        result["merkle_root"] = tree_root(leaves)
+    return result
+
+
+def range_proof(tree, start, end):
+    """Leaf hashes and inclusion paths for the chunks covering bytes [start, end)."""
+    first, stop = _chunk_span(tree, start, end)
+    if stop - first > MAX_PROOF_CHUNKS:
+        raise ValidationError(f"Range spans more than {MAX_PROOF_CHUNKS} chunks")
+    leaves = tree["leaves"]
+    get_node = _node_getter(leaves)
+    return {
+        "chunk_size": tree["chunk_size"],
+        "file_size": tree["size"],
+        "tree_size": len(leaves),
+        "root_hash": tree["root"],
+        # Download exactly these bytes, hash each chunk as leaf_hash(chunk) and check its path.
+        "byte_range": [first * tree["chunk_size"], min(tree["size"], stop * tree["chunk_size"])],
+        "chunks": [
+            {
+                "index": index,
+                "leaf_hash": leaves[index].hex(),
+                "audit_path": [h.hex() for h in merkle.inclusion_path(index, len(leaves), get_node)],
+            }
+            for index in range(first, stop)
+        ],
+    }
+
+
+def _chunk_span(tree, start, end):
+    """(first, stop) chunk indices covering bytes [start, end)."""
+    if not 0 <= start < end <= tree["size"]:
+        raise ValidationError(f"Byte range must satisfy 0 <= start < end <= {tree['size']}")
+    return start // tree["chunk_size"], (end - 1) // tree["chunk_size"] + 1
+
+
+def _leaves_key(sha256):
+    return f"{LEAVES_PREFIX}/{sha256[:2]}/{sha256[2:4]}/{sha256}.leaves"
+
+
+def _leaf(storage, key, index, chunk_size, size, throttle):
+    hasher = hashlib.sha256(b"\x00")
+    chunk_start = index * chunk_size
+    for data in storage.open(key, chunk_start, min(size, chunk_start + chunk_size)):
+        if throttle is not None:
+            throttle(len(data))
+        hasher.update(data)
+    return hasher.digest()
+
+
+def _node_getter(leaves):
+    """get_node over an in-memory leaf list, memoizing the perfect subtrees it computes."""
+    nodes = {}
+
+    def get_node(level, index):
+        if level == 0:
+            return leaves[index]
+        key = (level, index)
+        if key not in nodes:
+            nodes[key] = merkle.node_hash(get_node(level - 1, 2 * index), get_node(level - 1, 2 * index + 1))
+        return nodes[key]
+
+    return get_node
@@ -0,0 +1,149 @@
+"""
+Denormalized evidence read model.
+
+Evidence documents carry the names and case numbers that lists, exports
+and reports show: custodian_name, uploaded_by_name, case_number,
+case_numbers and linked_cases. A list page is then one indexed query with
+no joins. The copies are kept current by the writes that change them:
+- create_evidence embeds them,
+- completing a transfer updates custodian_name,
+- renaming a user rewrites the names on that user's evidence,
+- linking/unlinking a case, or retitling one, refreshes linked_cases.
+
+Documents carry READ_MODEL_VERSION once the fields are embedded. Readers
+fall back to batched enrichment for documents without it, and
+backfill_read_model fills those in the background, in one API process at
+a time under the ``evidence_read_model_backfill`` lease.
+"""
+
+import threading
+import time
+
+from pymongo import UpdateOne
+
+from app.common.leases import acquire_lease, new_holder, release_lease
+from app.common.lookups import cases_by_id, user_names
+from app.extensions import mongo
+
+READ_MODEL_VERSION = 1
+BACKFILL_BATCH_SIZE = 500
+BACKFILL_LEASE_NAME = "evidence_read_model_backfill"
+BACKFILL_LEASE_SECONDS = 120
+
+
+def read_model_fields(evidence):
+    """{evidence_id: {embedded fields}} for a list of evidence documents, resolved in one pass."""
+    names = user_names(
+        [ev.get("current_custodian_id") for ev in evidence] + [ev.get("uploaded_by") for ev in evidence]
+    )
+    cases = cases_by_id(cid for ev in evidence for cid in case_ids_of(ev))
+    fields = {}
+    for ev in evidence:
+        linked = [cases[cid] for cid in case_ids_of(ev) if cid in cases]
+        fields[ev["evidence_id"]] = {
+            "custodian_name": names.get(ev.get("current_custodian_id")) or "Unknown",
+            "uploaded_by_name": names.get(ev.get("uploaded_by")) or "Unknown",
+            "case_number": linked[0]["case_number"] if linked else None,
+            "case_numbers": [c["case_number"] for c in linked],
+            "linked_cases": [
+                {"case_id": c["case_id"], "case_number": c["case_number"], "title": c["title"]} for c in linked
+            ],
+            "read_model_version": READ_MODEL_VERSION,
+        }
+    return fields
+
+
+def refresh_read_model(evidence_ids):
+    """Recompute and store the embedded fields of ``evidence_ids``."""
+    evidence = list(mongo.db.evidence.find(
+        {"evidence_id": {"$in": list(evidence_ids)}},
+        {"_id": 0, "evidence_id": 1, "current_custodian_id": 1, "uploaded_by": 1, "case_id": 1, "case_ids": 1},
+    ))
+    if not evidence:
+        return 0
+    updates = [
+        UpdateOne({"evidence_id": evidence_id}, {"$set": fields})
+        for evidence_id, fields in read_model_fields(evidence).items()
+    ]
+    mongo.db.evidence.bulk_write(updates, ordered=False)
+    return len(updates)
+
+
+def custodian_fields(custodian_id):
+    """Extra $set fields for a write that changes the custodian."""
+    return {"custodian_name": user_names([custodian_id]).get(custodian_id) or "Unknown"}
+
+
+def on_user_renamed(user_id, full_name):
+    mongo.db.evidence.update_many({"current_custodian_id": user_id}, {"$set": {"custodian_name": full_name}})
+    mongo.db.evidence.update_many({"uploaded_by": user_id}, {"$set": {"uploaded_by_name": full_name}})
+
+
+def on_case_retitled(case_id, title):
+    # Documents without the read model have no linked_cases for the array filter; the backfill covers them.
+    mongo.db.evidence.update_many(
+        {"$or": [{"case_ids": case_id}, {"case_id": case_id}], "read_model_version": READ_MODEL_VERSION},
+        {"$set": {"linked_cases.$[linked].title": title}},
+        array_filters=[{"linked.case_id": case_id}],
+    )
+
+
+def backfill_read_model(batch_size=BACKFILL_BATCH_SIZE, keep_going=None):
+    """
+    Embed the fields in every document that predates them (or an older
+    version); returns the count. ``keep_going()`` is called before each
+    batch and stops the backfill when it returns False.
+    """
+    total = 0
+    while keep_going is None or keep_going():
+        ids = [
+            ev["evidence_id"] for ev in mongo.db.evidence.find(
+                {"read_model_version": {"$ne": READ_MODEL_VERSION}}, {"_id": 0, "evidence_id": 1}
+            ).limit(batch_size)
+        ]
+        if not ids:
+            break
+        total += refresh_read_model(ids)
+    return total
+
+
+def start_read_model_backfill(app):
+    """
+    Run backfill_read_model in a daemon thread if READ_MODEL_BACKFILL is
+    enabled. Only the process holding the backfill lease works; the others
+    wait and take over if it lapses before every document is done.
+    """
+    if not app.config.get("READ_MODEL_BACKFILL"):
+        return None
+    holder = new_holder()
+
+    def renew():
+        return acquire_lease(mongo.db, BACKFILL_LEASE_NAME, holder, BACKFILL_LEASE_SECONDS)
+
+    def run():
+        try:
+            while _backfill_pending():
+                if not renew():
+                    time.sleep(BACKFILL_LEASE_SECONDS)
+                    continue
+                try:
+                    count = backfill_read_model(keep_going=renew)
+                finally:
+                    release_lease(mongo.db, BACKFILL_LEASE_NAME, holder)
+                if not count:
+                    return
+                print(f"INFO: Embedded read-model fields in {count} evidence documents")
+        except Exception as e:
+            print(f"ERROR: Evidence read-model backfill failed: {e}")
+
+    thread = threading.Thread(target=run, name="evidence-read-model-backfill", daemon=True)
+    thread.start()
+    return thread
+
+
+def _backfill_pending():
+    return mongo.db.evidence.find_one({"read_model_version": {"$ne": READ_MODEL_VERSION}}, {"_id": 1}) is not None
+
+
+def case_ids_of(ev):
+    return ev.get("case_ids") or ([ev.get("case_id")] if ev.get("case_id") else [])
@@ -110,8 +110,8 @@ def dispose_evidence(evidence_id, disposed_by_id, reason):
     if ev.get("status") == "disposed":
         return {"error": "Evidence is already disposed"}
 
-    mongo.db.evidence.update_one(
-        {"evidence_id": evidence_id},
+    result = mongo.db.evidence.update_one(
+        {"evidence_id": evidence_id, "status": {"$ne": "disposed"}},
         {"$set": {
             "status": "disposed",
             "disposed_at": now,
@@ -120,6 +120,14 @@ def dispose_evidence(evidence_id, disposed_by_id, reason):
             "updated_at": now,
         }}
     )
+    if result.modified_count != 1:
+        return {"error": "Evidence is already disposed"}
+
+    # Give back this record's reference; the file goes only when no other evidence shares it.
+    blob_freed = False
+    if ev.get("blob_sha256"):
+        from app.evidence.blobs import release_blob
+        blob_freed = release_blob(ev["blob_sha256"])
 
     from app.auth.services import find_user_by_id
     user = find_user_by_id(disposed_by_id)
@@ -133,7 +141,13 @@ def dispose_evidence(evidence_id, disposed_by_id, reason):
         user_email=user["email"] if user else "unknown",
         user_role=user["role"] if user else "unknown",
         details=f"Disposed evidence {ev.get('file_name')} - Reason: {reason}",
-        metadata={"reason": reason},
+        metadata={"reason": reason, "file_deleted": blob_freed},
+        durable=True,
     )
 
-    return {"evidence_id": evidence_id, "status": "disposed", "disposed_at": now.isoformat()}
+    return {
+        "evidence_id": evidence_id,
+        "status": "disposed",
+        "disposed_at": now.isoformat(),
+        "file_deleted": blob_freed,
+    }
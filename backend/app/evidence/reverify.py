@@ -0,0 +1,176 @@
+"""
+Scheduled background re-verification.
+
+A daemon thread keeps re-hashing the evidence whose last verification is
+oldest, so trust scores and summaries do not decay just because nobody
+clicked "verify". Every API process starts one; a lease in
+``scheduler_leases`` lets only one of them sweep at a time, and another
+takes over within a lease period if the holder dies.
+
+Sweeps must never starve interactive downloads: reads share a token bucket
+capped at REVERIFY_BANDWIDTH_MBPS and at most REVERIFY_CONCURRENCY files are
+hashed at once. Sweeps run the fast (fingerprint) tier, which escalates
+to a full hash when needed. Results are written like a bulk verification
+job, so a mismatch raises the usual integrity_failure notification.
+
+Each sweep also retries custody-transfer hashes that failed or whose
+background thread was lost (see retry_custody_hashes).
+"""
+
+import atexit
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+
+from app.common.leases import acquire_lease, new_holder, release_lease
+from app.evidence.storage import get_storage
+from app.evidence.verification import VERIFY_PROJECTION, check_evidence, record_outcomes, verification_outcome
+from app.extensions import mongo
+from app.transfers.services import retry_custody_hashes
+
+LEASE_NAME = "evidence_reverify"
+SYSTEM_USER = {"user_id": "system", "email": "system", "role": "system"}
+
+_scheduler = None
+
+
+class TokenBucket:
+    """Blocking rate limiter: consume(n) waits until n tokens (bytes) are available."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, amount):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Go into debt rather than splitting chunks larger than the bucket.
+            self.tokens -= amount
+            wait_seconds = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait_seconds:
+            time.sleep(wait_seconds)
+
+
+class ReverifyScheduler:
+    def __init__(self, storage, interval_days=7, bandwidth_mbps=20, concurrency=2, batch_size=20,
+                 idle_seconds=300, lease_seconds=120, full_cadence_days=30, custody_hash_retry_minutes=30):
+        self.storage = storage
+        self.interval = timedelta(days=interval_days)
+        self.full_cadence_days = full_cadence_days
+        self.custody_hash_retry_minutes = custody_hash_retry_minutes
+        self.throttle = TokenBucket(bandwidth_mbps * 1024 * 1024).consume if bandwidth_mbps else None
+        self.concurrency = max(1, concurrency)
+        self.batch_size = batch_size
+        self.idle_seconds = idle_seconds
+        self.lease_seconds = lease_seconds
+        self.holder = new_holder()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="evidence-reverify", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_once(self):
+        """
+        Verify one batch of the stalest evidence, and retry stuck custody
+        hashes, if this process holds the lease; returns the number of files hashed.
+        """
+        if not self._acquire_lease():
+            return 0
+        retried = retry_custody_hashes(
+            self.storage, self.custody_hash_retry_minutes, limit=self.batch_size, throttle=self.throttle
+        )
+        now = datetime.now(timezone.utc)
+        cutoff = now - self.interval
+        batch = list(mongo.db.evidence.find(
+            {
+                "status": {"$ne": "disposed"},
+                "$and": [
+                    {"$or": [{"last_verified_at": {"$lt": cutoff}}, {"last_verified_at": None}]},
+                    # Items that could not be hashed (missing file) wait a full interval before a retry.
+                    {"$or": [{"reverify_attempted_at": {"$lt": cutoff}}, {"reverify_attempted_at": None}]},
+                ],
+            },
+            VERIFY_PROJECTION,
+        ).sort("last_verified_at", 1).limit(self.batch_size))
+        if not batch:
+            return retried
+        mongo.db.evidence.update_many(
+            {"evidence_id": {"$in": [ev["evidence_id"] for ev in batch]}},
+            {"$set": {"reverify_attempted_at": now}},
+        )
+
+        outcomes = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {
+                pool.submit(check_evidence, self.storage, ev, "fast", self.throttle, self.full_cadence_days): ev
+                for ev in batch
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=self.lease_seconds / 3, return_when=FIRST_COMPLETED)
+                outcomes.extend(verification_outcome(futures[future], future) for future in done)
+                # Throttled hashing of a large file can outlast the lease.
+                self._acquire_lease()
+        for outcome in outcomes:
+            if "error" in outcome:
+                print(f"WARNING: Scheduled re-verification of {outcome['evidence_id']} failed: {outcome['error']}")
+        record_outcomes(outcomes, SYSTEM_USER, "Scheduled re-verification")
+        return retried + len(outcomes)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                verified = self.run_once()
+            except Exception as e:
+                print(f"ERROR: Scheduled re-verification failed: {e}")
+                verified = 0
+            if not verified:
+                self._stop.wait(self.idle_seconds)
+        self._release_lease()
+
+    def _acquire_lease(self):
+        return acquire_lease(mongo.db, LEASE_NAME, self.holder, self.lease_seconds)
+
+    def _release_lease(self):
+        release_lease(mongo.db, LEASE_NAME, self.holder)
+
+
+def init_reverify_scheduler(app):
+    """Start the process-wide re-verification daemon if enabled in config."""
+    global _scheduler
+    if not app.config.get("REVERIFY_ENABLED"):
+        _scheduler = None
+        return None
+
+    _scheduler = ReverifyScheduler(
+        get_storage(),
+        interval_days=app.config.get("REVERIFY_INTERVAL_DAYS", 7),
+        bandwidth_mbps=app.config.get("REVERIFY_BANDWIDTH_MBPS", 20),
+        concurrency=app.config.get("REVERIFY_CONCURRENCY", 2),
+        batch_size=app.config.get("REVERIFY_BATCH_SIZE", 20),
+        idle_seconds=app.config.get("REVERIFY_IDLE_SECONDS", 300),
+        lease_seconds=app.config.get("REVERIFY_LEASE_SECONDS", 120),
+        full_cadence_days=app.config.get("VERIFY_FULL_CADENCE_DAYS", 30),
+        custody_hash_retry_minutes=app.config.get("TRANSFER_HASH_RETRY_MINUTES", 30),
+    )
+    _scheduler.start()
+    atexit.register(_scheduler.stop, 5)
+    return _scheduler
+
+
+def get_reverify_scheduler():
+    return _scheduler
@@ -5,7 +5,7 @@ from flask_jwt_extended import get_jwt_identity, jwt_required
 
 from app.auth.decorators import permission_required
 from app.common.constants import EVIDENCE_CATEGORIES, EVIDENCE_CLASSIFICATIONS, Permissions
-from app.common.errors import APIError, NotFoundError
+from app.common.errors import APIError, ForbiddenError, NotFoundError, ValidationError
 from app.evidence import evidence_bp
 from app.common.constants import Roles
 from app.evidence.services import (
@@ -14,14 +14,17 @@ from app.evidence.services import (
     get_evidence_list,
     get_hash_history,
     link_evidence_to_case,
-    resolve_file_path,
+    parse_fields,
     store_evidence_file,
     unlink_evidence_from_case,
     update_evidence,
     verify_evidence_integrity,
 )
+from app.evidence.storage import get_storage, send_stored_file
 from app.extensions import mongo
 
+VERIFY_TIERS = ("full", "fast", "chunked")
+
 
 @evidence_bp.route("/", methods=["POST"])
 @permission_required(Permissions.UPLOAD)
@@ -49,26 +52,32 @@ def upload_evidence():
         raise NotFoundError("Case not found")
 
     # Store file
-    file_path, original_name, file_size = store_evidence_file(
-        file, current_app.config["UPLOAD_FOLDER"]
+    file_path, original_name, file_size, digests = store_evidence_file(
+        file, current_app.config.get("EVIDENCE_HASH_ALGORITHMS", ("sha256",))
     )
 
     # Create evidence record
-    evidence = create_evidence(
-        file_path=file_path,
-        original_name=original_name,
-        file_size=file_size,
-        file_type=file.content_type,
-        case_id=case_id,
-        category=request.form.get("category", "other"),
-        classification=request.form.get("classification", "internal"),
-        description=request.form.get("description", ""),
-        tags=request.form.get("tags", ""),
-        uploaded_by_id=user["user_id"],
-        latitude=request.form.get("latitude"),
-        longitude=request.form.get("longitude"),
-        collection_location=request.form.get("collection_location", ""),
-    )
+    try:
+        evidence = create_evidence(
+            file_path=file_path,
+            original_name=original_name,
+            file_size=file_size,
+            file_type=file.content_type,
+            case_id=case_id,
+            category=request.form.get("category", "other"),
+            classification=request.form.get("classification", "internal"),
+            description=request.form.get("description", ""),
+            tags=request.form.get("tags", ""),
+            uploaded_by_id=user["user_id"],
+            latitude=request.form.get("latitude"),
+            longitude=request.form.get("longitude"),
+            collection_location=request.form.get("collection_location", ""),
+            digests=digests,
+        )
+    except Exception:
+        from app.evidence.blobs import release_blob
+        release_blob(digests["sha256"])
+        raise
 
     from app.audit.services import log_action
     log_action(
@@ -85,6 +94,139 @@ def upload_evidence():
             "hash_value": evidence["original_hash"],
             "case_number": case["case_number"],
         },
+        durable=True,
+    )
+
+    return jsonify({"evidence": evidence}), 201
+
+
+UPLOAD_FORM_FIELDS = (
+    "category", "classification", "description", "tags", "latitude", "longitude", "collection_location",
+)
+
+
+@evidence_bp.route("/uploads", methods=["POST"])
+@permission_required(Permissions.UPLOAD)
+def init_chunked_upload():
+    """
+    Start a resumable upload. Body: case_id, file_name, file_size, optional
+    file_type and sha256 (checked at finalize) plus the usual upload form
+    fields. Chunks are then PUT to /uploads/<upload_id>?offset=N.
+    """
+    from werkzeug.utils import secure_filename
+    from app.evidence.uploads import init_upload
+
+    data = request.get_json() or {}
+    case_id = data.get("case_id")
+    if not case_id:
+        raise APIError("case_id is required")
+    if not data.get("file_name"):
+        raise APIError("file_name is required")
+    if not mongo.db.cases.find_one({"case_id": case_id}):
+        raise NotFoundError("Case not found")
+
+    session = init_upload(
+        user_id=get_jwt_identity(),
+        case_id=case_id,
+        file_name=secure_filename(data["file_name"]) or "unnamed",
+        file_size=data.get("file_size"),
+        file_type=data.get("file_type"),
+        expected_sha256=data.get("sha256"),
+        fields={field: data[field] for field in UPLOAD_FORM_FIELDS if field in data},
+    )
+    return jsonify({"upload": session}), 201
+
+
+@evidence_bp.route("/uploads/<upload_id>", methods=["PUT"])
+@permission_required(Permissions.UPLOAD)
+def upload_chunk(upload_id):
+    """Write the raw request body at ?offset=N. Chunks may arrive in any order and in parallel."""
+    from app.evidence.uploads import write_chunk
+
+    offset = request.args.get("offset", type=int)
+    if offset is None:
+        raise APIError("offset is required")
+    max_chunk = current_app.config.get("UPLOAD_CHUNK_MAX_SIZE")
+    if max_chunk and (request.content_length or 0) > max_chunk:
+        raise APIError(f"Chunks may be at most {max_chunk} bytes", 413)
+
+    status = write_chunk(upload_id, get_jwt_identity(), offset, request.stream, request.content_length)
+    return jsonify({"upload": status})
+
+
+@evidence_bp.route("/uploads/<upload_id>", methods=["GET"])
+@permission_required(Permissions.UPLOAD)
+def chunked_upload_status(upload_id):
+    """Received and missing byte ranges, for resuming after a dropped connection."""
+    from app.evidence.uploads import get_upload_status
+
+    return jsonify({"upload": get_upload_status(upload_id, get_jwt_identity())})
+
+
+@evidence_bp.route("/uploads/<upload_id>", methods=["DELETE"])
+@permission_required(Permissions.UPLOAD)
+def abort_chunked_upload(upload_id):
+    from app.evidence.uploads import abort_upload
+
+    abort_upload(upload_id, get_jwt_identity())
+    return jsonify({"message": "Upload aborted"})
+
+
+@evidence_bp.route("/uploads/<upload_id>/finalize", methods=["POST"])
+@permission_required(Permissions.UPLOAD)
+def finalize_chunked_upload(upload_id):
+    """Complete a resumable upload and register the file as evidence."""
+    from app.auth.services import find_user_by_id
+    from app.evidence.uploads import finalize_upload, mark_finalized, release_upload
+
+    user = find_user_by_id(get_jwt_identity())
+    if not user:
+        raise APIError("User not found", 404)
+
+    session, file_path, digests = finalize_upload(upload_id, user["user_id"])
+    fields = session["fields"]
+    try:
+        case = mongo.db.cases.find_one({"case_id": session["case_id"]})
+        if not case:
+            raise NotFoundError("Case not found")
+        evidence = create_evidence(
+            file_path=file_path,
+            original_name=session["file_name"],
+            file_size=session["file_size"],
+            file_type=session["file_type"],
+            case_id=session["case_id"],
+            category=fields.get("category", "other"),
+            classification=fields.get("classification", "internal"),
+            description=fields.get("description", ""),
+            tags=fields.get("tags", ""),
+            uploaded_by_id=user["user_id"],
+            latitude=fields.get("latitude"),
+            longitude=fields.get("longitude"),
+            collection_location=fields.get("collection_location", ""),
+            digests=digests,
+        )
+    except Exception:
+        release_upload(upload_id)
+        raise
+    mark_finalized(upload_id, evidence["evidence_id"])
+
+    from app.audit.services import log_action
+    log_action(
+        action="evidence_uploaded",
+        entity_type="evidence",
+        entity_id=evidence["evidence_id"],
+        user_id=user["user_id"],
+        user_email=user["email"],
+        user_role=user["role"],
+        details=f"Uploaded {session['file_name']} to case {case['case_number']}",
+        metadata={
+            "file_name": session["file_name"],
+            "file_size": session["file_size"],
+            "hash_value": evidence["original_hash"],
+            "case_number": case["case_number"],
+            "upload_id": upload_id,
+        },
+        durable=True,
     )
 
     return jsonify({"evidence": evidence}), 201
@@ -103,6 +245,7 @@ def list_evidence():
     category = request.args.get("category")
     status = request.args.get("status")
     search = request.args.get("search")
+    fields = parse_fields(request.args.get("fields"))
 
     # Data isolation: non-admins only see evidence they are custodian of
     custodian_id = None
@@ -113,7 +256,7 @@ def list_evidence():
         page=page, per_page=per_page,
         case_id=case_id, category=category,
         status=status, search=search,
-        custodian_id=custodian_id,
+        custodian_id=custodian_id, fields=fields,
     )
     return jsonify(result)
 
@@ -202,6 +345,7 @@ def delete_evidence_route(evidence_id):
         user_email=user["email"],
         user_role=user["role"],
         details=f"Soft-deleted evidence {ev['file_name']}",
+        durable=True,
     )
 
     return jsonify({"message": "Evidence marked as disposed"})
@@ -216,7 +360,14 @@ def verify_evidence_route(evidence_id):
     if not user:
         raise APIError("User not found", 404)
 
-    result = verify_evidence_integrity(evidence_id, user["user_id"])
+    tier = request.args.get("tier", "full")
+    if tier not in VERIFY_TIERS:
+        raise ValidationError(f"tier must be one of: {', '.join(VERIFY_TIERS)}")
+
+    result = verify_evidence_integrity(
+        evidence_id, user["user_id"], tier=tier,
+        full_cadence_days=current_app.config.get("VERIFY_FULL_CADENCE_DAYS"),
+    )
     if not result:
         raise NotFoundError("Evidence not found")
 
@@ -229,8 +380,50 @@ def verify_evidence_route(evidence_id):
         user_id=user["user_id"],
         user_email=user["email"],
         user_role=user["role"],
-        details=f"Integrity verification: {'INTACT' if result['matches'] else 'TAMPERED'}",
-        metadata={"current_hash": result["current_hash"], "matches": result["matches"]},
+        details=f"Integrity verification ({result['tier']}): {'INTACT' if result['matches'] else 'TAMPERED'}",
+        metadata={
+            "current_hash": result["current_hash"],
+            "matches": result["matches"],
+            "tier": result["tier"],
+            "mismatched_ranges": result.get("mismatched_ranges"),
+        },
+    )
+
+    if not result["matches"]:
+        ev = mongo.db.evidence.find_one({"evidence_id": evidence_id})
+        if ev:
+            from app.notifications.services import notify_integrity_failure
+            notify_integrity_failure(ev.get("current_custodian_id"), ev.get("file_name", "Unknown"), evidence_id)
+
+    return jsonify(result)
+
+
+@evidence_bp.route("/<evidence_id>/verify/range", methods=["POST"])
+@permission_required(Permissions.VERIFY)
+def verify_evidence_range_route(evidence_id):
+    """Verify bytes [start, end) by re-hashing only the Merkle chunks that cover them."""
+    user_id = get_jwt_identity()
+    from app.auth.services import find_user_by_id
+    user = find_user_by_id(user_id)
+    if not user:
+        raise APIError("User not found", 404)
+
+    start, end = _byte_range_args()
+    from app.evidence.services import verify_evidence_range
+    result = verify_evidence_range(evidence_id, start, end)
+    if not result:
+        raise NotFoundError("Evidence not found")
+
+    from app.audit.services import log_action
+    log_action(
+        action="evidence_range_verified" if result["matches"] else "evidence_verification_failed",
+        entity_type="evidence",
+        entity_id=evidence_id,
+        user_id=user["user_id"],
+        user_email=user["email"],
+        user_role=user["role"],
+        details=f"Range verification of bytes {start}-{end}: {'INTACT' if result['matches'] else 'TAMPERED'}",
+        metadata={"byte_range": [start, end], "mismatched_ranges": result["mismatched_ranges"]},
     )
 
     if not result["matches"]:
@@ -242,6 +435,26 @@ def verify_evidence_route(evidence_id):
     return jsonify(result)
 
 
+@evidence_bp.route("/<evidence_id>/chunks/proof", methods=["GET"])
+@jwt_required()
+def evidence_range_proof(evidence_id):
+    """Chunk inclusion proofs for verifying a downloaded byte range client-side."""
+    start, end = _byte_range_args()
+    from app.evidence.services import get_range_proof
+    result = get_range_proof(evidence_id, start, end)
+    if not result:
+        raise NotFoundError("Evidence not found")
+    return jsonify(result)
+
+
+def _byte_range_args():
+    start = request.args.get("start", type=int)
+    end = request.args.get("end", type=int)
+    if start is None or end is None:
+        raise ValidationError("start and end byte offsets are required")
+    return start, end
+
+
 @evidence_bp.route("/<evidence_id>/history", methods=["GET"])
 @jwt_required()
 def evidence_hash_history(evidence_id):
@@ -273,13 +486,11 @@ def download_evidence(evidence_id):
         details=f"Downloaded evidence {ev['file_name']}",
     )
 
-    import os
-    file_path = resolve_file_path(ev["file_path"])
-    if not os.path.exists(file_path):
-        raise NotFoundError("File not found on disk")
+    if get_storage().stat(ev["file_path"]) is None:
+        raise NotFoundError("File not found in storage")
 
-    return send_file(
-        file_path,
+    return send_stored_file(
+        ev["file_path"],
         as_attachment=True,
         download_name=ev["file_name"],
     )
@@ -302,20 +513,20 @@ def preview_evidence(evidence_id):
     import mimetypes
     mime = ev.get("file_type") or mimetypes.guess_type(ev["file_name"])[0] or "application/octet-stream"
 
-    import os
-    file_path = resolve_file_path(ev["file_path"])
-    if not os.path.exists(file_path):
-        raise NotFoundError("File not found on disk")
+    if get_storage().stat(ev["file_path"]) is None:
+        raise NotFoundError("File not found in storage")
 
     # For images, apply watermark
     previewable_images = {"image/jpeg", "image/png", "image/gif", "image/webp"}
     if mime in previewable_images:
         from app.evidence.preview import create_watermarked_image
-        watermarked = create_watermarked_image(
-            file_path,
-            user["full_name"],
-            user["email"],
-        )
+        from app.evidence.storage import local_copy
+        with local_copy(ev["file_path"]) as file_path:
+            watermarked = create_watermarked_image(
+                file_path,
+                user["full_name"],
+                user["email"],
+            )
         if watermarked:
             from app.audit.services import log_action
             log_action(
@@ -344,7 +555,7 @@ def preview_evidence(evidence_id):
             user_role=user["role"],
             details=f"Previewed evidence {ev['file_name']}",
         )
-        return send_file(file_path, mimetype=mime)
+        return send_stored_file(ev["file_path"], mimetype=mime)
 
     return jsonify({"error": "Preview not available for this file type", "mime_type": mime}), 415
 
@@ -380,7 +591,7 @@ def dispose_evidence_route(evidence_id):
 @evidence_bp.route("/bulk/verify", methods=["POST"])
 @permission_required(Permissions.VERIFY)
 def bulk_verify():
-    """Verify integrity of multiple evidence items at once."""
+    """Start a background job verifying the integrity of multiple evidence items; poll it for progress."""
     user_id = get_jwt_identity()
     from app.auth.services import find_user_by_id
     user = find_user_by_id(user_id)
@@ -391,31 +602,38 @@ def bulk_verify():
     evidence_ids = data.get("evidence_ids", [])
     if not evidence_ids:
         raise APIError("No evidence IDs provided")
+    max_items = current_app.config.get("BULK_VERIFY_MAX_ITEMS", 1000)
+    if len(evidence_ids) > max_items:
+        raise ValidationError(f"At most {max_items} evidence items can be verified per job")
+    tier = data.get("tier", "full")
+    if tier not in VERIFY_TIERS:
+        raise ValidationError(f"tier must be one of: {', '.join(VERIFY_TIERS)}")
+
+    from app.evidence.verification import start_verification_job
+    job = start_verification_job(
+        evidence_ids, user,
+        workers=current_app.config.get("BULK_VERIFY_WORKERS"),
+        tier=tier,
+        full_cadence_days=current_app.config.get("VERIFY_FULL_CADENCE_DAYS", 30),
+    )
+    return jsonify({"job": job}), 202
 
-    results = []
-    for eid in evidence_ids[:50]:  # Limit to 50 at a time
-        result = verify_evidence_integrity(eid, user["user_id"])
-        if result:
-            action = "evidence_verified" if result["matches"] else "evidence_verification_failed"
-            from app.audit.services import log_action
-            log_action(
-                action=action,
-                entity_type="evidence",
-                entity_id=eid,
-                user_id=user["user_id"],
-                user_email=user["email"],
-                user_role=user["role"],
-                details=f"Bulk verification: {'INTACT' if result['matches'] else 'TAMPERED'}",
-            )
-            results.append(result)
 
-    intact = sum(1 for r in results if r["matches"])
-    tampered = sum(1 for r in results if not r["matches"])
+@evidence_bp.route("/bulk/verify/<job_id>", methods=["GET"])
+@permission_required(Permissions.VERIFY)
+def bulk_verify_status(job_id):
+    from app.auth.services import find_user_by_id
+    from app.evidence.verification import get_verification_job
 
-    return jsonify({
-        "results": results,
-        "summary": {"total": len(results), "intact": intact, "tampered": tampered},
-    })
+    job = get_verification_job(job_id)
+    if not job:
+        raise NotFoundError("Verification job not found")
+    # Job results list other users' evidence; only the creator and admins may read them.
+    user_id = get_jwt_identity()
+    user = find_user_by_id(user_id)
+    if job.get("created_by") != user_id and (not user or user.get("role") != Roles.ADMIN):
+        raise ForbiddenError("Verification job belongs to another user")
+    return jsonify({"job": job})
 
 
 @evidence_bp.route("/export/evidence", methods=["GET"])
@@ -438,19 +656,38 @@ def export_evidence():
 @evidence_bp.route("/export/audit", methods=["GET"])
 @jwt_required()
 def export_audit():
-    """Export audit logs as CSV."""
-    from flask import Response
+    """
+    Stream audit logs as CSV. Optional ?start=&end= (ISO dates) and
+    ?from_sequence=&to_sequence= restrict the range.
+    """
+    from flask import Response, stream_with_context
     from app.evidence.export import export_audit_csv
 
-    csv_data = export_audit_csv()
+    csv_data = export_audit_csv(
+        start=_parse_date_arg("start"),
+        end=_parse_date_arg("end"),
+        from_sequence=request.args.get("from_sequence", type=int),
+        to_sequence=request.args.get("to_sequence", type=int),
+    )
 
     return Response(
-        csv_data,
+        stream_with_context(csv_data),
         mimetype="text/csv",
         headers={"Content-Disposition": "attachment;filename=audit-logs-export.csv"},
     )
 
 
+def _parse_date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValidationError(f"Invalid {name} date, expected ISO 8601")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
 @evidence_bp.route("/export/cases", methods=["GET"])
 @jwt_required()
 def export_cases():
@@ -613,12 +850,10 @@ def download_shared_evidence(token):
     if not ev:
         raise NotFoundError("Evidence not found")
 
-    import os
-    file_path = resolve_file_path(ev["file_path"])
-    if not os.path.exists(file_path):
+    if get_storage().stat(ev["file_path"]) is None:
         raise NotFoundError("File not found")
 
-    return send_file(file_path, as_attachment=True, download_name=ev["file_name"])
+    return send_stored_file(ev["file_path"], as_attachment=True, download_name=ev["file_name"])
 
 
 # ============================================================================
@@ -709,14 +944,12 @@ def transcribe_evidence_route(evidence_id):
     if not (mime.startswith("audio/") or mime.startswith("video/") or fname.endswith((".mp3", ".mp4", ".wav", ".m4a"))):
         return jsonify({"error": "File type not supported for transcription"}), 400
 
-    import os
-    file_path = resolve_file_path(ev["file_path"])
-    if not os.path.exists(file_path):
-        raise NotFoundError("File not found on disk")
+    if get_storage().stat(ev["file_path"]) is None:
+        raise NotFoundError("File not found in storage")
 
     try:
         from app.evidence.transcription import start_transcription_task
-        start_transcription_task(evidence_id, file_path)
+        start_transcription_task(evidence_id, ev["file_path"])
     except ImportError:
         return jsonify({"error": "Transcription module not available (whisper not installed)"}), 501
 
@@ -1,56 +1,90 @@
-import hashlib
 import os
+import re
 import uuid
 from datetime import datetime, timezone
 
 from werkzeug.utils import secure_filename
 
+from app.common.errors import ConflictError, ValidationError
+from app.common.validators import clamp_page
+from app.evidence.blobs import staging_path, store_blob
+from app.evidence.hashing import copy_and_hash
+from app.evidence.storage import get_storage
 from app.extensions import mongo
 
+# Left out of list responses unless requested with fields=: a Whisper
+# transcript can be megabytes per item, and fingerprints are internal.
+LIST_EXCLUDED_FIELDS = ("transcript", "fingerprint")
+# Embedded by the read model (read_model.py), and the stored fields they
+# are derived from for documents that predate it.
+ENRICHED_FIELDS = {
+    "custodian_name": ("current_custodian_id",),
+    "uploaded_by_name": ("uploaded_by",),
+    "case_number": ("case_id", "case_ids"),
+    "case_numbers": ("case_id", "case_ids"),
+    "linked_cases": ("case_id", "case_ids"),
+}
+_FIELD_NAME = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+
 
 def compute_sha256(file_path):
-    """Compute SHA-256 hash of a file by reading in chunks."""
-    sha256 = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+    """Compute SHA-256 of a stored evidence file, streamed in chunks from the storage backend."""
+    from app.evidence.verification import hash_stored_file
+
+    return hash_stored_file(get_storage(), file_path)
 
 
 def resolve_file_path(path):
-    """Resolve a stored path to an absolute path. Handles both absolute and relative paths."""
+    """Local filesystem path for a stored file, or None when storage is remote."""
     if not path:
         return None
-    if os.path.isabs(path):
-        return path
-    from flask import current_app
-    return os.path.join(current_app.config["UPLOAD_FOLDER"], path)
+    return get_storage().local_path(path)
 
 
-def store_evidence_file(file_obj, upload_folder):
-    """Save uploaded file with UUID name. Returns (stored_path, original_name, file_size)."""
-    original_name = secure_filename(file_obj.filename) or "unnamed"
-    ext = os.path.splitext(original_name)[1]
-    stored_name = f"{uuid.uuid4().hex}{ext}"
+def store_evidence_file(file_obj, algorithms=("sha256",)):
+    """
+    Save an uploaded file into the content-addressed blob store, hashing it
+    as it is written. Identical bytes are stored once. Returns (storage_key,
+    original_name, file_size, digests) where digests maps each of
+    ``algorithms`` (always including sha256) to its hex digest; the caller
+    owns one reference to the blob.
+    """
+    from app.evidence.merkle import ChunkTreeHasher, save_chunk_tree
 
-    # Organize by date
-    date_folder = datetime.now(timezone.utc).strftime("%Y/%m/%d")
-    target_dir = os.path.join(upload_folder, date_folder)
-    os.makedirs(target_dir, exist_ok=True)
+    original_name = secure_filename(file_obj.filename) or "unnamed"
 
-    file_path = os.path.join(target_dir, stored_name)
-    file_obj.save(file_path)
+    temp_path = staging_path()
+    tree = ChunkTreeHasher()
+    try:
+        with open(temp_path, "wb") as f:
+            file_size, digests = copy_and_hash(file_obj.stream, f, algorithms, tree=tree)
+        save_chunk_tree(digests["sha256"], file_size, tree.finish())
+        storage_key = store_blob(temp_path, digests["sha256"], file_size)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
 
-    file_size = os.path.getsize(file_path)
-    return file_path, original_name, file_size
+    return storage_key, original_name, file_size, digests
 
 
 def create_evidence(file_path, original_name, file_size, file_type, case_id,
                     category, classification, description, tags, uploaded_by_id,
-                    latitude=None, longitude=None, collection_location=None):
-    """Create evidence record with SHA-256 hash."""
+                    latitude=None, longitude=None, collection_location=None, digests=None):
+    """
+    Create evidence record with SHA-256 hash. ``digests`` from
+    store_evidence_file avoids re-reading the file; any extra algorithms in
+    it are kept alongside.
+    """
+    from app.evidence.fingerprint import compute_fingerprint
+    from app.evidence.merkle import ensure_chunk_tree
+    from app.evidence.read_model import read_model_fields
+
     evidence_id = str(uuid.uuid4())
-    original_hash = compute_sha256(file_path)
+    digests = dict(digests) if digests else {"sha256": compute_sha256(file_path)}
+    original_hash = digests["sha256"]
+    chunk_tree = ensure_chunk_tree(get_storage(), file_path, original_hash)
+    now = datetime.now(timezone.utc)
 
     evidence = {
         "evidence_id": evidence_id,
@@ -62,7 +96,13 @@ def create_evidence(file_path, original_name, file_size, file_type, case_id,
         "file_type": file_type or "application/octet-stream",
         "original_hash": original_hash,
         "current_hash": original_hash,
-        "last_verified_at": datetime.now(timezone.utc),
+        "digests": digests,
+        "blob_sha256": original_hash,
+        "merkle_root": chunk_tree["root"] if chunk_tree else None,
+        "chunk_size": chunk_tree["chunk_size"] if chunk_tree else None,
+        "fingerprint": compute_fingerprint(get_storage(), file_path),
+        "last_verified_at": now,
+        "last_full_verified_at": now,
         "integrity_status": "intact",
         "category": category or "other",
         "classification": classification or "internal",
@@ -78,6 +118,7 @@ def create_evidence(file_path, original_name, file_size, file_type, case_id,
         "updated_at": datetime.now(timezone.utc),
     }
 
+    evidence.update(read_model_fields([evidence])[evidence_id])
     mongo.db.evidence.insert_one(evidence)
 
     # Record initial hash
@@ -86,8 +127,38 @@ def create_evidence(file_path, original_name, file_size, file_type, case_id,
     return _serialize(evidence)
 
 
+def parse_fields(value):
+    """
+    A ``fields=`` query value ("file_name,custodian_name") as a list of
+    field names, always including evidence_id; None when absent, meaning
+    the default list fields.
+    """
+    if not value:
+        return None
+    names = [f.strip() for f in value.split(",") if f.strip()]
+    invalid = [f for f in names if not _FIELD_NAME.match(f) or f == "file_path"]
+    if invalid:
+        raise ValidationError(f"Invalid fields: {', '.join(invalid)}")
+    return list(dict.fromkeys(["evidence_id"] + names))
+
+
+def list_projection(fields=None):
+    """Mongo projection for a list of evidence, loading only what ``fields`` needs."""
+    if fields is None:
+        return {"_id": 0, "file_path": 0, **{f: 0 for f in LIST_EXCLUDED_FIELDS}}
+    projection = {"_id": 0}
+    for field in fields:
+        projection[field] = 1
+        if field in ENRICHED_FIELDS:
+            projection["read_model_version"] = 1
+            for stored in ENRICHED_FIELDS[field]:
+                projection[stored] = 1
+    return projection
+
+
 def get_evidence_list(page=1, per_page=10, case_id=None, category=None,
-                      status=None, search=None, custodian_id=None):
+                      status=None, search=None, custodian_id=None, fields=None):
+    page, per_page = clamp_page(page, per_page)
     query = {}
     if case_id:
         query["$or"] = [{"case_id": case_id}, {"case_ids": case_id}]
@@ -109,18 +180,17 @@ def get_evidence_list(page=1, per_page=10, case_id=None, category=None,
 
     total = mongo.db.evidence.count_documents(query)
     evidence = list(
-        mongo.db.evidence.find(query, {"_id": 0})
+        mongo.db.evidence.find(query, list_projection(fields))
         .sort("created_at", -1)
         .skip((page - 1) * per_page)
         .limit(per_page)
     )
 
-    # Enrich with custodian and uploader names
-    for e in evidence:
-        e = _enrich_evidence(e)
+    # Names and case numbers are embedded; only documents that predate that are enriched here
+    enrich_evidence(evidence, fields)
 
     return {
-        "evidence": [_serialize(e) for e in evidence],
+        "evidence": [_sparse(_serialize(e), fields) for e in evidence],
         "total": total,
         "page": page,
         "per_page": per_page,
@@ -128,10 +198,35 @@ def get_evidence_list(page=1, per_page=10, case_id=None, category=None,
     }
 
 
+def get_case_evidence(case_id, fields=None, page=None, per_page=None):
+    """
+    Evidence whose primary case is ``case_id``, newest first. Paginated
+    like get_evidence_list when ``page`` or ``per_page`` is given,
+    otherwise the whole case.
+    """
+    query = {"case_id": case_id}
+    cursor = mongo.db.evidence.find(query, list_projection(fields)).sort("created_at", -1)
+    result = {}
+    if page is not None or per_page is not None:
+        page, per_page = clamp_page(page, per_page, default_per_page=50)
+        total = mongo.db.evidence.count_documents(query)
+        cursor = cursor.skip((page - 1) * per_page).limit(per_page)
+        result = {
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "total_pages": max(1, (total + per_page - 1) // per_page),
+        }
+
+    evidence = enrich_evidence(cursor, fields)
+    result["evidence"] = [_sparse(_serialize(e), fields) for e in evidence]
+    return result
+
+
 def get_evidence(evidence_id):
     ev = mongo.db.evidence.find_one({"evidence_id": evidence_id}, {"_id": 0})
     if ev:
-        ev = _enrich_evidence(ev)
+        enrich_evidence([ev])
         return _serialize(ev)
     return None
 
@@ -148,36 +243,63 @@ def update_evidence(evidence_id, updates):
     return get_evidence(evidence_id)
 
 
-def verify_evidence_integrity(evidence_id, verified_by_id):
-    """Re-hash the file and compare against original."""
+def verify_evidence_integrity(evidence_id, verified_by_id, tier="full", full_cadence_days=None):
+    """
+    Re-check the file against the original hash. ``tier="fast"`` compares
+    the stat/sampled-block fingerprint and only re-hashes the whole file
+    when it changed or a full hash is due; the result says which tier ran.
+    """
+    from app.evidence.fingerprint import FULL_CADENCE_DAYS
+    from app.evidence.verification import check_evidence, verification_writes
+
     ev = mongo.db.evidence.find_one({"evidence_id": evidence_id})
     if not ev:
         return None
 
-    current_hash = compute_sha256(ev["file_path"])
-    matches = current_hash == ev["original_hash"]
-
-    # Update evidence record
-    mongo.db.evidence.update_one(
-        {"evidence_id": evidence_id},
-        {"$set": {
-            "current_hash": current_hash,
-            "integrity_status": "intact" if matches else "tampered",
-            "last_verified_at": datetime.now(timezone.utc),
-            "updated_at": datetime.now(timezone.utc),
-        }}
+    check = check_evidence(get_storage(), ev, tier, full_cadence_days=full_cadence_days or FULL_CADENCE_DAYS)
+    update, record, result = verification_writes(
+        dict(check, evidence=ev), verified_by_id, datetime.now(timezone.utc)
     )
+    mongo.db.evidence.update_one({"evidence_id": evidence_id}, {"$set": update})
+    mongo.db.hash_records.insert_one(record)
+    return result
 
-    # Record hash
-    record_hash(evidence_id, current_hash, "verification", verified_by_id, matches)
 
-    return {
-        "evidence_id": evidence_id,
-        "current_hash": current_hash,
-        "original_hash": ev["original_hash"],
-        "matches": matches,
-        "integrity_status": "intact" if matches else "tampered",
-    }
+def verify_evidence_range(evidence_id, start, end):
+    """
+    Re-hash only the chunks covering bytes [start, end) and compare them with
+    the chunk tree recorded at upload. A changed range marks the evidence
+    tampered; an intact range says nothing about the rest of the file.
+    """
+    from app.evidence.merkle import ensure_chunk_tree, verify_chunks
+
+    ev = mongo.db.evidence.find_one({"evidence_id": evidence_id})
+    if not ev:
+        return None
+    tree = ensure_chunk_tree(get_storage(), ev["file_path"], ev.get("blob_sha256") or ev["original_hash"])
+    if tree is None:
+        raise ConflictError("File no longer matches its original hash; run a full verification")
+
+    result = verify_chunks(get_storage(), ev["file_path"], tree, start, end)
+    if not result["matches"]:
+        mongo.db.evidence.update_one(
+            {"evidence_id": evidence_id},
+            {"$set": {"integrity_status": "tampered", "updated_at": datetime.now(timezone.utc)}},
+        )
+    return dict(result, evidence_id=evidence_id, byte_range=[start, end])
+
+
+def get_range_proof(evidence_id, start, end):
+    """Inclusion proofs letting a client verify downloaded bytes [start, end) against the chunk root."""
+    from app.evidence.merkle import ensure_chunk_tree, range_proof
+
+    ev = mongo.db.evidence.find_one({"evidence_id": evidence_id})
+    if not ev:
+        return None
+    tree = ensure_chunk_tree(get_storage(), ev["file_path"], ev.get("blob_sha256") or ev["original_hash"])
+    if tree is None:
+        raise ConflictError("File no longer matches its original hash; run a full verification")
+    return dict(range_proof(tree, start, end), evidence_id=evidence_id, original_hash=ev["original_hash"])
 
 
 def get_hash_history(evidence_id):
@@ -193,6 +315,8 @@ def get_hash_history(evidence_id):
 
 def link_evidence_to_case(evidence_id, case_id):
     """Link evidence to an additional case."""
+    from app.evidence.read_model import refresh_read_model
+
     mongo.db.evidence.update_one(
         {"evidence_id": evidence_id},
         {
@@ -200,11 +324,14 @@ def link_evidence_to_case(evidence_id, case_id):
             "$set": {"updated_at": datetime.now(timezone.utc)}
         }
     )
+    refresh_read_model([evidence_id])
     return get_evidence(evidence_id)
 
 
 def unlink_evidence_from_case(evidence_id, case_id):
     """Remove a link between evidence and a case."""
+    from app.evidence.read_model import refresh_read_model
+
     mongo.db.evidence.update_one(
         {"evidence_id": evidence_id},
         {
@@ -212,51 +339,72 @@ def unlink_evidence_from_case(evidence_id, case_id):
             "$set": {"updated_at": datetime.now(timezone.utc)}
         }
     )
+    refresh_read_model([evidence_id])
     return get_evidence(evidence_id)
 
 
-def record_hash(evidence_id, hash_value, event_type, computed_by, matches_original=True):
-    record = {
+def record_hash(evidence_id, hash_value, event_type, computed_by, matches_original=True, tier="full"):
+    record = build_hash_record(evidence_id, hash_value, event_type, computed_by, matches_original, tier=tier)
+    mongo.db.hash_records.insert_one(record)
+    return record
+
+
+def build_hash_record(evidence_id, hash_value, event_type, computed_by, matches_original=True,
+                      tier="full", algorithm="sha256"):
+    """
+    A hash_records document, for callers that insert records in batches.
+    ``tier`` is "full" for a whole-file hash and "fast" for a fingerprint
+    check, whose hash_value is the sampled-block digest.
+    """
+    return {
         "record_id": str(uuid.uuid4()),
         "evidence_id": evidence_id,
         "hash_value": hash_value,
-        "algorithm": "sha256",
+        "algorithm": algorithm,
+        "tier": tier,
         "event_type": event_type,
         "computed_at": datetime.now(timezone.utc),
         "computed_by": computed_by,
         "matches_original": matches_original,
     }
-    mongo.db.hash_records.insert_one(record)
-    return record
 
 
-def _enrich_evidence(ev):
-    """Add custodian and uploader names, and multi-case info."""
-    if ev.get("current_custodian_id"):
-        custodian = mongo.db.users.find_one({"user_id": ev["current_custodian_id"]})
-        ev["custodian_name"] = custodian["full_name"] if custodian else "Unknown"
-    if ev.get("uploaded_by"):
-        uploader = mongo.db.users.find_one({"user_id": ev["uploaded_by"]})
-        ev["uploaded_by_name"] = uploader["full_name"] if uploader else "Unknown"
-
-    # Enrich with multiple case numbers
-    case_ids = ev.get("case_ids") or ([ev.get("case_id")] if ev.get("case_id") else [])
-    if case_ids:
-        cases = list(mongo.db.cases.find({"case_id": {"$in": case_ids}}))
-        ev["case_numbers"] = [c["case_number"] for c in cases]
-        ev["linked_cases"] = [{"case_id": c["case_id"], "case_number": c["case_number"], "title": c["title"]} for c in cases]
-        if cases:
-            ev["case_number"] = cases[0]["case_number"]
-    return ev
+def enrich_evidence(evidence, fields=None):
+    """
+    Make sure each item of ``evidence`` has the read-model fields
+    (custodian and uploader names, case numbers), in place. Documents that
+    already embed them cost nothing; older ones are resolved with one
+    query per collection for the whole list. A ``fields`` list naming none
+    of them skips the lookups. Returns the list.
+    """
+    from app.evidence.read_model import READ_MODEL_VERSION, read_model_fields
+
+    evidence = list(evidence)
+    if fields is not None and not any(f in ENRICHED_FIELDS for f in fields):
+        return evidence
+    stale = [ev for ev in evidence if ev.get("read_model_version") != READ_MODEL_VERSION]
+    if stale:
+        computed = read_model_fields(stale)
+        for ev in stale:
+            ev.update({k: v for k, v in computed[ev["evidence_id"]].items() if k != "read_model_version"})
+    return evidence
+
+
+def _sparse(ev, fields):
+    """Only the requested ``fields`` of a serialized item (all of it when fields is None)."""
+    if fields is None:
+        return ev
+    return {f: ev[f] for f in fields if f in ev}
 
 
 def _serialize(ev):
     if not ev:
         return None
-    for field in ["created_at", "updated_at", "last_verified_at"]:
+    for field in ["created_at", "updated_at", "last_verified_at", "last_full_verified_at", "reverify_attempted_at"]:
         if isinstance(ev.get(field), datetime):
             ev[field] = ev[field].isoformat()
     ev.pop("_id", None)
+    ev.pop("read_model_version", None)
     # Don't expose file_path to the client
     ev.pop("file_path", None)
     return ev
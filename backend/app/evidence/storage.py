@@ -0,0 +1,300 @@
+"""
+Pluggable storage for evidence file bytes.
+
+Files are addressed by keys relative to the store root, e.g.
+``blobs/ab/cd/<sha256>``; that key is what evidence records keep in
+``file_path``. LocalStorage keeps files under UPLOAD_FOLDER (and still
+accepts the absolute paths of records created before the blob store);
+S3Storage keeps them in an S3-compatible bucket, so API instances do not
+need a shared POSIX volume. Point S3_ENDPOINT_URL at a MinIO container to
+run against a local stand-in. boto3 is only needed for the S3 backend.
+
+Upload staging files stay on local disk either way: chunked uploads write
+into them at random offsets, which object stores cannot do. An upload is
+therefore pinned to the host that opened it, and multi-host deployments
+need sticky routing for upload requests (see app.evidence.uploads).
+"""
+
+import abc
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+from flask import Response, request, send_file, stream_with_context
+
+from app.evidence.hashing import HASH_CHUNK_SIZE
+
+_storage = None
+
+
+class StorageBackend(abc.ABC):
+    """put / ranged get / stat / delete over keys; subclasses implement the primitives."""
+
+    @abc.abstractmethod
+    def put(self, key, stream):
+        """Store everything readable from ``stream`` under ``key``."""
+        raise NotImplementedError
+
+    def put_file(self, key, path):
+        """Store the local file at ``path`` under ``key``, consuming the file."""
+        with open(path, "rb") as f:
+            self.put(key, f)
+        os.remove(path)
+
+    @abc.abstractmethod
+    def open(self, key, start=0, end=None):
+        """Iterate over the bytes of [start, end) in chunks; raises FileNotFoundError."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def stat(self, key):
+        """{"size", "modified_at", plus "inode" or "etag"} for the object, or None if it does not exist."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, key):
+        """Delete the object; returns False if it was already gone."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def move(self, key, new_key):
+        """Rename an object; raises FileNotFoundError if ``key`` does not exist."""
+        raise NotImplementedError
+
+    def local_path(self, key):
+        """A filesystem path for the object if the backend has one, else None."""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        # Records from before the blob store hold absolute paths.
+        return key if os.path.isabs(key) else os.path.join(self.root, key)
+
+    def put(self, key, stream):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                shutil.copyfileobj(stream, f, HASH_CHUNK_SIZE)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def put_file(self, key, path):
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+
+    def open(self, key, start=0, end=None):
+        f = open(self._path(key), "rb")
+        return _read_range(f, start, end)
+
+    def stat(self, key):
+        try:
+            st = os.stat(self._path(key))
+        except FileNotFoundError:
+            return None
+        return {"size": st.st_size, "modified_at": st.st_mtime, "inode": st.st_ino}
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def move(self, key, new_key):
+        os.rename(self._path(key), self._path(new_key))
+
+    def local_path(self, key):
+        return self._path(key)
+
+
+class S3Storage(StorageBackend):
+    def __init__(self, bucket, prefix="", endpoint_url=None, region=None, access_key=None, secret_key=None):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix else ""
+        self._client_args = {
+            "endpoint_url": endpoint_url,
+            "region_name": region,
+            "aws_access_key_id": access_key,
+            "aws_secret_access_key": secret_key,
+        }
+        self.client = self._make_client()
+
+    def _make_client(self):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires boto3 (pip install boto3)")
+        return boto3.client("s3", **self._client_args)
+
+    def __getstate__(self):
+        # Clients cannot be pickled; worker processes (parallel audit verification) make their own.
+        state = dict(self.__dict__)
+        del state["client"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.client = self._make_client()
+
+    def _key(self, key):
+        return self.prefix + key.lstrip("/")
+
+    def put(self, key, stream):
+        # Managed transfer: multipart for large files, without buffering them whole.
+        self.client.upload_fileobj(stream, self.bucket, self._key(key))
+
+    def put_file(self, key, path):
+        self.client.upload_file(path, self.bucket, self._key(key))
+        os.remove(path)
+
+    def open(self, key, start=0, end=None):
+        params = {"Bucket": self.bucket, "Key": self._key(key)}
+        if start or end is not None:
+            params["Range"] = f"bytes={start}-{'' if end is None else end - 1}"
+        try:
+            body = self.client.get_object(**params)["Body"]
+        except self.client.exceptions.NoSuchKey:
+            raise FileNotFoundError(key)
+        return _iter_body(body)
+
+    def stat(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return {
+            "size": head["ContentLength"],
+            "modified_at": head["LastModified"].timestamp(),
+            "etag": head.get("ETag", "").strip('"'),
+        }
+
+    def delete(self, key):
+        if self.stat(key) is None:
+            return False
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+        return True
+
+    def move(self, key, new_key):
+        if self.stat(key) is None:
+            raise FileNotFoundError(key)
+        self.client.copy({"Bucket": self.bucket, "Key": self._key(key)}, self.bucket, self._key(new_key))
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+
+def init_storage(app):
+    """Configure the process-wide storage backend from app config."""
+    global _storage
+    backend = app.config.get("STORAGE_BACKEND", "local")
+    if backend == "local":
+        _storage = LocalStorage(app.config["UPLOAD_FOLDER"])
+    elif backend == "s3":
+        _storage = S3Storage(
+            app.config["S3_BUCKET"],
+            prefix=app.config.get("S3_PREFIX", ""),
+            endpoint_url=app.config.get("S3_ENDPOINT_URL"),
+            region=app.config.get("S3_REGION"),
+            access_key=app.config.get("S3_ACCESS_KEY"),
+            secret_key=app.config.get("S3_SECRET_KEY"),
+        )
+    else:
+        raise RuntimeError(f"Unknown STORAGE_BACKEND: {backend}")
+    return _storage
+
+
+def get_storage():
+    return _storage
+
+
+@contextmanager
+def local_copy(key, storage=None):
+    """
+    A local path to the object for tools that need a real file (Pillow,
+    Whisper); remote objects are downloaded to a temp file for the duration.
+    """
+    storage = storage or get_storage()
+    path = storage.local_path(key)
+    if path is not None:
+        if not os.path.exists(path):
+            raise FileNotFoundError(key)
+        yield path
+        return
+
+    fd, temp_path = tempfile.mkstemp(suffix=os.path.splitext(key)[1])
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in storage.open(key):
+                f.write(chunk)
+        yield temp_path
+    finally:
+        os.remove(temp_path)
+
+
+def send_stored_file(key, mimetype=None, as_attachment=False, download_name=None):
+    """
+    Respond with a stored object. Local files go through send_file; remote
+    objects are streamed, honouring a single Range header so media seeking
+    does not pull the whole object through the API.
+    """
+    storage = get_storage()
+    path = storage.local_path(key)
+    if path is not None:
+        return send_file(path, mimetype=mimetype, as_attachment=as_attachment, download_name=download_name)
+
+    info = storage.stat(key)
+    if info is None:
+        raise FileNotFoundError(key)
+    size = info["size"]
+    start, end, status = 0, size, 200
+    byte_range = request.range.range_for_length(size) if request.range else None
+    if byte_range:
+        (start, end), status = byte_range, 206
+
+    response = Response(
+        stream_with_context(storage.open(key, start, end)),
+        status=status,
+        mimetype=mimetype or "application/octet-stream",
+        direct_passthrough=True,
+    )
+    response.content_length = end - start
+    response.accept_ranges = "bytes"
+    if status == 206:
+        response.headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    if as_attachment:
+        response.headers.set("Content-Disposition", "attachment", filename=download_name or os.path.basename(key))
+    return response
+
+
+def _read_range(f, start, end):
+    with f:
+        f.seek(start)
+        remaining = None if end is None else end - start
+        while remaining is None or remaining > 0:
+            chunk = f.read(HASH_CHUNK_SIZE if remaining is None else min(HASH_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+def _iter_body(body):
+    try:
+        yield from body.iter_chunks(HASH_CHUNK_SIZE)
+    finally:
+        body.close()
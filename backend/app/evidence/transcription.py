@@ -1,6 +1,6 @@
-import os
 import whisper
 import warnings
+from app.evidence.storage import get_storage, local_copy
 from app.extensions import mongo
 from datetime import datetime, timezone
 import threading
@@ -27,7 +27,7 @@ def get_model():
                 return None
     return _model
 
-def transcribe_evidence(evidence_id, file_path):
+def transcribe_evidence(evidence_id, file_key, storage=None):
     """
     Transcribe audio/video file using OpenAI Whisper.
     This function should ideally run in a background task (e.g., Celery).
@@ -49,12 +49,9 @@ def transcribe_evidence(evidence_id, file_path):
         if not model:
             raise Exception("Failed to load transcription model")
 
-        # Verify file exists
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-
-        # Run transcription
-        result = model.transcribe(file_path)
+        # Run transcription (remote storage is downloaded to a temp file first)
+        with local_copy(file_key, storage) as file_path:
+            result = model.transcribe(file_path)
         text = result["text"].strip()
 
         # Update evidence with transcript
@@ -84,9 +81,9 @@ def transcribe_evidence(evidence_id, file_path):
             }}
         )
 
-def start_transcription_task(evidence_id, file_path):
+def start_transcription_task(evidence_id, file_key):
     """Start transcription in a background thread."""
-    thread = threading.Thread(target=transcribe_evidence, args=(evidence_id, file_path))
+    thread = threading.Thread(target=transcribe_evidence, args=(evidence_id, file_key, get_storage()))
     thread.daemon = True # Daemonize so it doesn't block shutdown
     thread.start()
     return True
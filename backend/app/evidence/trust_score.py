@@ -8,6 +8,7 @@ with SHAP-like feature attribution explaining each factor's contribution.
 import math
 from datetime import datetime, timezone
 
+from app.audit.rollups import get_rollup
 from app.extensions import mongo
 
 
@@ -25,24 +26,20 @@ def compute_trust_score(evidence_id):
         mongo.db.custody_transfers.find({"evidence_id": evidence_id}, {"_id": 0})
         .sort("requested_at", 1)
     )
-    audit_logs = list(
-        mongo.db.audit_logs.find(
-            {"entity_type": "evidence", "entity_id": evidence_id}, {"_id": 0}
-        ).sort("timestamp", 1)
-    )
+    audit_count = get_rollup(mongo.db, "evidence", evidence_id).get("total_actions", 0)
 
     components = [
         _score_integrity(ev, hash_records),
         _score_verification_frequency(hash_records),
         _score_custody_chain(transfers),
-        _score_audit_trail(audit_logs),
+        _score_audit_trail(audit_count),
         _score_verification_recency(ev),
         _score_custodian_count(transfers),
     ]
 
     total_score = round(sum(c["score"] for c in components), 1)
     grade, grade_label = _compute_grade(total_score)
-    risk_flags = _identify_risk_flags(ev, hash_records, transfers, audit_logs)
+    risk_flags = _identify_risk_flags(ev, hash_records, transfers, audit_count)
     summary = _generate_summary(total_score, grade, grade_label, components, risk_flags)
 
     return {
@@ -170,9 +167,8 @@ def _score_custody_chain(transfers):
     }
 
 
-def _score_audit_trail(audit_logs):
+def _score_audit_trail(count):
     """Component 4: Audit Trail Coverage (15 pts max)."""
-    count = len(audit_logs)
     score = min(15.0, count * 1.5)
 
     if count <= 1:
@@ -321,7 +317,7 @@ def _compute_grade(score):
     return "F", "Failing"
 
 
-def _identify_risk_flags(ev, hash_records, transfers, audit_logs):
+def _identify_risk_flags(ev, hash_records, transfers, audit_count):
     flags = []
     verifications = [r for r in hash_records if r.get("event_type") == "verification"]
 
@@ -350,7 +346,7 @@ def _identify_risk_flags(ev, hash_records, transfers, audit_logs):
     if rejected:
         flags.append(f"{rejected} custody transfer(s) were rejected, indicating potential disputes.")
 
-    if len(audit_logs) < 3:
+    if audit_count < 3:
         flags.append("Sparse audit trail may indicate insufficient oversight or logging gaps.")
 
     return flags
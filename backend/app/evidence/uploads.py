@@ -0,0 +1,373 @@
+"""
+Resumable chunked uploads for large evidence files.
+
+A client opens a session (init), PUTs byte ranges of the file at explicit
+offsets in any order and from any number of connections, polls status to
+find what is still missing after a dropped connection, and finalizes once
+every byte is in. Chunks go straight into a sparse staging file, so the
+total size is not bounded by MAX_CONTENT_LENGTH, only each request is.
+
+SHA-256 (plus any extra EVIDENCE_HASH_ALGORITHMS) is computed incrementally
+and strictly in file order: a chunk that lands at the hashed frontier is
+hashed while it is written, and chunks that arrived ahead of it are hashed
+from the staging file once the gap before them fills. Hash state lives in
+the worker process; a worker that missed earlier chunks catches up from
+the staging file, so sessions survive requests landing on any worker.
+The per-process states are an LRU of at most HASH_STATE_MAX_SESSIONS that
+also drops sessions idle for HASH_STATE_IDLE_SECONDS (abandoned uploads,
+sessions finished on another worker); a dropped state is rebuilt from the
+staging file the same way.
+
+The staging file is on the local disk of the host that opened the session,
+whatever STORAGE_BACKEND is, so every request of one upload must reach
+that host: multi-host deployments need sticky sessions (e.g. routing on
+the upload id). A request that lands elsewhere gets a 409 naming the host
+rather than a missing-file error.
+"""
+
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+
+from app.common.cache import MISSING, TTLCache
+from app.common.errors import APIError, ConflictError, ForbiddenError, NotFoundError, ValidationError
+from app.evidence.blobs import blob_key, release_blob, store_blob
+from app.evidence.hashing import HASH_CHUNK_SIZE, new_hashers, read_chunks
+from app.evidence.merkle import ChunkTreeHasher, save_chunk_tree
+from app.extensions import mongo
+
+HASH_STATE_MAX_SESSIONS = 256
+HASH_STATE_IDLE_SECONDS = 3600
+
+_hash_states = TTLCache("upload_hash_states", maxsize=HASH_STATE_MAX_SESSIONS, ttl=HASH_STATE_IDLE_SECONDS)
+_hash_states_lock = threading.Lock()
+
+
+class _HashState:
+    def __init__(self, algorithms):
+        self.hashers = new_hashers(algorithms)
+        self.tree = ChunkTreeHasher()
+        self.offset = 0
+        self.lock = threading.Lock()
+
+    def update(self, chunk):
+        for hasher in self.hashers.values():
+            hasher.update(chunk)
+        self.tree.update(chunk)
+
+
+def init_upload(user_id, case_id, file_name, file_size, file_type=None, expected_sha256=None, fields=None):
+    """Open an upload session and its staging file."""
+    max_size = current_app.config.get("UPLOAD_MAX_FILE_SIZE")
+    if not isinstance(file_size, int) or file_size <= 0:
+        raise ValidationError("file_size must be a positive integer")
+    if max_size and file_size > max_size:
+        raise ValidationError(f"file_size exceeds the {max_size} byte limit")
+
+    purge_expired_uploads()
+
+    upload_id = str(uuid.uuid4())
+    staging_path = os.path.join(_staging_dir(), f"{upload_id}.part")
+    os.makedirs(os.path.dirname(staging_path), exist_ok=True)
+    with open(staging_path, "wb") as f:
+        f.truncate(file_size)
+
+    now = datetime.now(timezone.utc)
+    session = {
+        "upload_id": upload_id,
+        "user_id": user_id,
+        "case_id": case_id,
+        "file_name": file_name,
+        "file_type": file_type or "application/octet-stream",
+        "file_size": file_size,
+        "expected_sha256": expected_sha256.lower() if expected_sha256 else None,
+        "fields": fields or {},
+        "staging_path": staging_path,
+        "staging_host": socket.gethostname(),
+        "received": [],
+        "status": "open",
+        "evidence_id": None,
+        "created_at": now,
+        "updated_at": now,
+        "expires_at": now + timedelta(hours=current_app.config.get("UPLOAD_SESSION_HOURS", 24)),
+    }
+    mongo.db.upload_sessions.insert_one(session)
+    return serialize_upload(session)
+
+
+def write_chunk(upload_id, user_id, offset, stream, length):
+    """
+    Write ``length`` bytes from ``stream`` at ``offset``. Bytes that were
+    already received are skipped, so retrying a chunk is harmless.
+    """
+    session = _get_open_session(upload_id, user_id)
+    if length is None:
+        raise ValidationError("Content-Length is required")
+    if offset < 0 or offset + length > session["file_size"]:
+        raise ValidationError(
+            f"Chunk [{offset}, {offset + length}) is outside the file (size {session['file_size']})"
+        )
+    if length == 0:
+        return get_upload_status(upload_id, user_id)
+    _check_staging(session)
+
+    state = _hash_state(upload_id)
+    contiguous = _contiguous_end(session["received"])
+    skip = min(length, max(0, contiguous - offset))
+    _discard(stream, skip)
+
+    start = offset + skip
+    end = offset + length
+    if start < end:
+        # Tee into the hashers when this chunk is exactly the next bytes to hash.
+        tee = state.lock.acquire(blocking=False)
+        try:
+            if tee and state.offset != start:
+                state.lock.release()
+                tee = False
+            written = _write_at(session["staging_path"], start, stream, end - start, state if tee else None)
+            if tee:
+                state.offset = start + written
+        finally:
+            if tee:
+                state.lock.release()
+
+        # Record whatever landed, even from a cut-off body, so a retry only resends the rest.
+        if written:
+            mongo.db.upload_sessions.update_one(
+                {"upload_id": upload_id},
+                {"$push": {"received": [start, start + written]}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+            )
+        if written != end - start:
+            raise ValidationError(f"Chunk body ended after {written} of {end - start} bytes")
+
+    _advance_hash(upload_id, state)
+    return get_upload_status(upload_id, user_id)
+
+
+def get_upload_status(upload_id, user_id):
+    session = _get_session(upload_id, user_id)
+    return serialize_upload(session)
+
+
+def finalize_upload(upload_id, user_id):
+    """
+    Check that the whole file arrived, finish hashing and move it into the
+    blob store. Returns (session, storage_key, digests); the caller creates
+    the evidence record and then calls mark_finalized(), or
+    release_upload() if that fails.
+    """
+    session = _get_open_session(upload_id, user_id)
+    if session.get("blob_sha256"):
+        # A previous finalize stored the file but could not register it; reuse its blob reference.
+        _claim(upload_id)
+        return session, blob_key(session["blob_sha256"]), session["digests"]
+
+    missing = _missing_ranges(session["received"], session["file_size"])
+    if missing:
+        raise ConflictError(f"Upload is incomplete, {sum(e - s for s, e in missing)} bytes missing")
+    _check_staging(session)
+
+    state = _hash_state(upload_id)
+    _advance_hash(upload_id, state)
+    with state.lock:
+        if state.offset != session["file_size"]:
+            raise APIError("Upload hashing did not complete, retry finalize", 503)
+        digests = {name: hasher.copy().hexdigest() for name, hasher in state.hashers.items()}
+        leaves = state.tree.finish()
+
+    if session["expected_sha256"] and digests["sha256"] != session["expected_sha256"]:
+        raise ValidationError("Uploaded file does not match the expected SHA-256")
+    save_chunk_tree(digests["sha256"], session["file_size"], leaves)
+
+    _claim(upload_id)
+    try:
+        storage_key = store_blob(session["staging_path"], digests["sha256"], session["file_size"])
+    except Exception:
+        release_upload(upload_id)
+        raise
+    mongo.db.upload_sessions.update_one(
+        {"upload_id": upload_id}, {"$set": {"blob_sha256": digests["sha256"], "digests": digests}}
+    )
+    return session, storage_key, digests
+
+
+def release_upload(upload_id):
+    """Reopen a session whose finalize failed; a stored blob stays referenced by the session."""
+    mongo.db.upload_sessions.update_one(
+        {"upload_id": upload_id, "status": "finalizing"},
+        {"$set": {"status": "open", "updated_at": datetime.now(timezone.utc)}},
+    )
+
+
+def mark_finalized(upload_id, evidence_id):
+    mongo.db.upload_sessions.update_one(
+        {"upload_id": upload_id},
+        {"$set": {"status": "finalized", "evidence_id": evidence_id, "updated_at": datetime.now(timezone.utc)}},
+    )
+    _drop_hash_state(upload_id)
+
+
+def abort_upload(upload_id, user_id):
+    session = _get_open_session(upload_id, user_id)
+    mongo.db.upload_sessions.update_one(
+        {"upload_id": upload_id}, {"$set": {"status": "aborted", "updated_at": datetime.now(timezone.utc)}}
+    )
+    _remove_staging(session)
+    _drop_hash_state(upload_id)
+
+
+def purge_expired_uploads():
+    """Abort open sessions past their expiry and delete their staging files."""
+    now = datetime.now(timezone.utc)
+    for session in mongo.db.upload_sessions.find({"status": "open", "expires_at": {"$lt": now}}, {"_id": 0}):
+        _remove_staging(session)
+        _drop_hash_state(session["upload_id"])
+        mongo.db.upload_sessions.update_one(
+            {"upload_id": session["upload_id"]}, {"$set": {"status": "expired", "updated_at": now}}
+        )
+
+
+def serialize_upload(session):
+    received = _merge(session["received"])
+    return {
+        "upload_id": session["upload_id"],
+        "file_name": session["file_name"],
+        "file_size": session["file_size"],
+        "case_id": session["case_id"],
+        "status": session["status"],
+        "received_bytes": sum(end - start for start, end in received),
+        "contiguous_bytes": _contiguous_end(received),
+        "missing_ranges": _missing_ranges(received, session["file_size"]),
+        "evidence_id": session.get("evidence_id"),
+        "expires_at": session["expires_at"].isoformat()
+        if isinstance(session.get("expires_at"), datetime) else session.get("expires_at"),
+    }
+
+
+def _get_session(upload_id, user_id):
+    session = mongo.db.upload_sessions.find_one({"upload_id": upload_id}, {"_id": 0})
+    if not session:
+        raise NotFoundError("Upload not found")
+    if session["user_id"] != user_id:
+        raise ForbiddenError("Upload belongs to another user")
+    return session
+
+
+def _get_open_session(upload_id, user_id):
+    session = _get_session(upload_id, user_id)
+    if session["status"] != "open":
+        raise ConflictError(f"Upload is {session['status']}")
+    return session
+
+
+def _claim(upload_id):
+    """Move the session to finalizing so a concurrent finalize cannot create a second evidence record."""
+    claimed = mongo.db.upload_sessions.update_one(
+        {"upload_id": upload_id, "status": "open"},
+        {"$set": {"status": "finalizing", "updated_at": datetime.now(timezone.utc)}},
+    )
+    if claimed.modified_count != 1:
+        raise ConflictError("Upload is already being finalized")
+
+
+def _hash_state(upload_id):
+    with _hash_states_lock:
+        state = _hash_states.get(upload_id)
+        if state is MISSING:
+            state = _HashState(current_app.config.get("EVIDENCE_HASH_ALGORITHMS", ("sha256",)))
+        # Re-set on every use, so the expiry counts from the last chunk.
+        _hash_states.set(upload_id, state)
+        return state
+
+
+def _drop_hash_state(upload_id):
+    _hash_states.invalidate(upload_id)
+
+
+def _advance_hash(upload_id, state):
+    """Hash the staging file from the hashed frontier up to the end of the received prefix."""
+    with state.lock:
+        session = mongo.db.upload_sessions.find_one(
+            {"upload_id": upload_id}, {"_id": 0, "received": 1, "staging_path": 1, "staging_host": 1}
+        )
+        contiguous = _contiguous_end(session["received"])
+        if state.offset >= contiguous:
+            return
+        _check_staging(session)
+        with open(session["staging_path"], "rb") as f:
+            f.seek(state.offset)
+            for chunk in read_chunks(f, HASH_CHUNK_SIZE, contiguous - state.offset):
+                state.update(chunk)
+                state.offset += len(chunk)
+
+
+def _check_staging(session):
+    """Raise a 409 when the staging file is not on this host (no sticky routing to its owner)."""
+    if not os.path.exists(session["staging_path"]):
+        host = session.get("staging_host") or "another host"
+        raise ConflictError(f"Upload is pinned to {host}; its chunks and finalize must be sent to that host")
+
+
+def _write_at(path, offset, stream, length, hash_state=None):
+    written = 0
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        for chunk in read_chunks(stream, HASH_CHUNK_SIZE, length):
+            if hash_state is not None:
+                hash_state.update(chunk)
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def _discard(stream, count):
+    while count > 0:
+        chunk = stream.read(min(HASH_CHUNK_SIZE, count))
+        if not chunk:
+            break
+        count -= len(chunk)
+
+
+def _merge(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _contiguous_end(ranges):
+    merged = _merge(ranges)
+    return merged[0][1] if merged and merged[0][0] == 0 else 0
+
+
+def _missing_ranges(ranges, size):
+    missing = []
+    position = 0
+    for start, end in _merge(ranges):
+        if start > position:
+            missing.append([position, start])
+        position = max(position, end)
+    if position < size:
+        missing.append([position, size])
+    return missing
+
+
+def _remove_staging(session):
+    if session.get("blob_sha256"):
+        release_blob(session["blob_sha256"])
+    try:
+        os.remove(session["staging_path"])
+    except FileNotFoundError:
+        pass
+
+
+def _staging_dir():
+    return os.path.join(current_app.config["UPLOAD_FOLDER"], ".staging")
@@ -0,0 +1,321 @@
+"""
+Background bulk integrity verification.
+
+A bulk request becomes a job in ``verification_jobs`` and returns at once;
+a background thread hashes the files concurrently in a bounded thread pool
+(hashlib releases the GIL on large buffers, and storage reads are I/O, so
+threads keep disks and cores busy without copying file bytes between
+processes). Finished items are written back in batches: one bulk_write for
+the evidence updates, one insert_many for the hash records and one job
+progress update, so a large job is not three round trips per file. Clients
+poll the job for progress and per-item results.
+
+Checks are tiered (see fingerprint.py): the "full" tier re-hashes the
+whole file, the "fast" tier compares the stat/sampled-block fingerprint
+and escalates to a full hash when it changed or one is due, and the
+"chunked" tier re-hashes the file's Merkle chunks in parallel and reports
+which byte ranges changed (see merkle.py). Every hash record says which
+tier produced it.
+"""
+
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from app.evidence.fingerprint import FULL_CADENCE_DAYS, compute_fingerprint, fingerprint_matches, full_hash_due
+from app.evidence.hashing import hash_chunks, hash_file
+from app.evidence.merkle import ensure_chunk_tree, verify_chunks
+from app.evidence.storage import get_storage
+from app.extensions import mongo
+
+VERIFY_FLUSH_SIZE = 20
+JOB_PROJECTION = {"_id": 0, "evidence_ids": 0}
+VERIFY_PROJECTION = {
+    "_id": 0, "evidence_id": 1, "file_path": 1, "file_name": 1, "original_hash": 1, "current_hash": 1,
+    "current_custodian_id": 1, "integrity_status": 1, "blob_sha256": 1, "merkle_root": 1, "fingerprint": 1, "last_full_verified_at": 1, "created_at": 1,
+}
+
+
+def start_verification_job(evidence_ids, user, workers=None, tier="full", full_cadence_days=FULL_CADENCE_DAYS):
+    """Create a job for ``evidence_ids`` and start verifying in the background."""
+    now = datetime.now(timezone.utc)
+    job = {
+        "job_id": str(uuid.uuid4()),
+        "status": "queued",
+        "evidence_ids": list(dict.fromkeys(evidence_ids)),
+        "tier": tier,
+        "total": len(set(evidence_ids)),
+        "completed": 0,
+        "intact": 0,
+        "tampered": 0,
+        "errors": 0,
+        "results": [],
+        "created_by": user["user_id"],
+        "created_at": now,
+        "updated_at": now,
+        "started_at": None,
+        "finished_at": None,
+    }
+    mongo.db.verification_jobs.insert_one(job)
+
+    workers = max(1, workers or min(8, os.cpu_count() or 1))
+    thread = threading.Thread(
+        target=run_verification_job,
+        args=(job["job_id"], job["evidence_ids"], user, workers, get_storage(), tier, full_cadence_days),
+    )
+    thread.daemon = True
+    thread.start()
+    return serialize_job(job)
+
+
+def run_verification_job(job_id, evidence_ids, user, workers, storage=None, tier="full",
+                         full_cadence_days=FULL_CADENCE_DAYS):
+    storage = storage or get_storage()
+    now = datetime.now(timezone.utc)
+    mongo.db.verification_jobs.update_one(
+        {"job_id": job_id}, {"$set": {"status": "running", "started_at": now, "updated_at": now}}
+    )
+    try:
+        evidence = list(mongo.db.evidence.find({"evidence_id": {"$in": evidence_ids}}, VERIFY_PROJECTION))
+        found = {ev["evidence_id"] for ev in evidence}
+        outcomes = [
+            {"evidence_id": eid, "error": "Evidence not found"} for eid in evidence_ids if eid not in found
+        ]
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(check_evidence, storage, ev, tier, full_cadence_days=full_cadence_days): ev
+                for ev in evidence
+            }
+            for future in as_completed(futures):
+                outcomes.append(verification_outcome(futures[future], future))
+                if len(outcomes) >= VERIFY_FLUSH_SIZE:
+                    record_outcomes(outcomes, user, "Bulk verification", job_id=job_id)
+                    outcomes = []
+        record_outcomes(outcomes, user, "Bulk verification", job_id=job_id)
+
+        status, error = "completed", None
+    except Exception as e:
+        print(f"ERROR: Verification job {job_id} failed: {e}")
+        status, error = "failed", str(e)
+
+    now = datetime.now(timezone.utc)
+    mongo.db.verification_jobs.update_one(
+        {"job_id": job_id},
+        {"$set": {"status": status, "error": error, "finished_at": now, "updated_at": now}},
+    )
+
+
+def get_verification_job(job_id):
+    job = mongo.db.verification_jobs.find_one({"job_id": job_id}, JOB_PROJECTION)
+    return serialize_job(job) if job else None
+
+
+def serialize_job(job):
+    job = {k: v for k, v in job.items() if k not in ("_id", "evidence_ids")}
+    for field in ("created_at", "updated_at", "started_at", "finished_at"):
+        if isinstance(job.get(field), datetime):
+            job[field] = job[field].isoformat()
+    job["summary"] = {
+        "total": job["completed"],
+        "intact": job["intact"],
+        "tampered": job["tampered"],
+        "errors": job["errors"],
+    }
+    return job
+
+
+def check_evidence(storage, ev, tier="full", throttle=None, full_cadence_days=FULL_CADENCE_DAYS):
+    """
+    Check ``ev``'s stored file at ``tier``. Returns {"tier": "fast",
+    "sample_digest", "fingerprint"} when the fast tier could vouch for it,
+    {"tier": "chunked", "merkle_root", "mismatched_ranges"} for a chunk
+    check, otherwise {"tier": "full", "current_hash", "fingerprint",
+    "escalation"} where escalation says why another tier became a full hash.
+    """
+    escalation = None
+    if tier == "chunked":
+        tree = ensure_chunk_tree(storage, ev["file_path"], ev.get("blob_sha256") or ev["original_hash"])
+        if tree is not None:
+            check = verify_chunks(storage, ev["file_path"], tree, throttle=throttle)
+            return {
+                "tier": "chunked",
+                "merkle_root": check["merkle_root"],
+                "mismatched_ranges": check["mismatched_ranges"],
+            }
+        # No baseline could be built because the file no longer matches; a full hash reports it.
+        escalation = "no_chunk_tree"
+    if tier == "fast":
+        if full_hash_due(ev, full_cadence_days):
+            escalation = "full_hash_due"
+        else:
+            fingerprint = compute_fingerprint(storage, ev["file_path"], throttle)
+            if fingerprint_matches(ev.get("fingerprint"), fingerprint):
+                return {"tier": "fast", "sample_digest": fingerprint["sample_digest"], "fingerprint": fingerprint}
+            escalation = "fingerprint_changed"
+
+    current_hash = hash_stored_file(storage, ev["file_path"], throttle)
+    fingerprint = compute_fingerprint(storage, ev["file_path"], throttle)
+    return {"tier": "full", "current_hash": current_hash, "fingerprint": fingerprint, "escalation": escalation}
+
+
+def hash_stored_file(storage, file_path, throttle=None):
+    """SHA-256 of a stored file; ``throttle(n)`` is called before each chunk is hashed."""
+    path = storage.local_path(file_path)
+    if path is not None:
+        # Local files skip the chunk generator: one reused buffer, sized to the file (or an mmap).
+        return hash_file(path, throttle=throttle)["sha256"]
+    chunks = storage.open(file_path)
+    if throttle is not None:
+        chunks = _throttled(chunks, throttle)
+    return hash_chunks(chunks)["sha256"]
+
+
+def verification_outcome(ev, future):
+    """Turn a finished check_evidence future for ``ev`` into an outcome for record_outcomes."""
+    outcome = {"evidence_id": ev["evidence_id"], "evidence": ev}
+    try:
+        outcome.update(future.result())
+    except FileNotFoundError:
+        outcome["error"] = "File not found in storage"
+    except Exception as e:
+        outcome["error"] = str(e)
+    return outcome
+
+
+def verification_writes(outcome, computed_by, now):
+    """(evidence $set, hash record, result) for one successful outcome."""
+    from app.evidence.services import build_hash_record
+
+    ev = outcome["evidence"]
+    if outcome["tier"] == "chunked":
+        matches = not outcome["mismatched_ranges"]
+        update = {
+            "integrity_status": "intact" if matches else "tampered",
+            "last_verified_at": now,
+            "last_full_verified_at": now,
+            "updated_at": now,
+        }
+        record = build_hash_record(
+            ev["evidence_id"], outcome["merkle_root"], "verification", computed_by, matches,
+            tier="chunked", algorithm="sha256-merkle",
+        )
+        record["mismatched_ranges"] = outcome["mismatched_ranges"]
+        current_hash = ev.get("current_hash") or ev["original_hash"]
+    elif outcome["tier"] == "fast":
+        # The fast tier only vouches for an unchanged, already intact file.
+        matches = True
+        update = {"last_verified_at": now, "updated_at": now}
+        record = build_hash_record(
+            ev["evidence_id"], outcome["sample_digest"], "verification", computed_by, True,
+            tier="fast", algorithm="sha256-sampled",
+        )
+        current_hash = ev.get("current_hash") or ev["original_hash"]
+    else:
+        current_hash = outcome["current_hash"]
+        matches = current_hash == ev["original_hash"]
+        update = {
+            "current_hash": current_hash,
+            "integrity_status": "intact" if matches else "tampered",
+            "last_verified_at": now,
+            "last_full_verified_at": now,
+            "updated_at": now,
+        }
+        if matches:
+            # Re-baseline: a restore from backup changes the stat identity, not the bytes.
+            update["fingerprint"] = outcome["fingerprint"]
+        record = build_hash_record(ev["evidence_id"], current_hash, "verification", computed_by, matches, tier="full")
+        if outcome.get("escalation"):
+            record["escalation"] = outcome["escalation"]
+
+    result = {
+        "evidence_id": ev["evidence_id"],
+        "current_hash": current_hash,
+        "original_hash": ev["original_hash"],
+        "matches": matches,
+        "integrity_status": "intact" if matches else "tampered",
+        "tier": outcome["tier"],
+    }
+    if outcome.get("escalation"):
+        result["escalation"] = outcome["escalation"]
+    if outcome["tier"] == "chunked":
+        result["mismatched_ranges"] = outcome["mismatched_ranges"]
+    return update, record, result
+
+
+def record_outcomes(outcomes, user, source, job_id=None):
+    """
+    Write a batch of finished items: evidence updates, hash records, audit
+    entries, failure notifications and (for a job) its progress.
+    """
+    if not outcomes:
+        return
+    from app.audit.services import log_action
+    from app.notifications.services import notify_integrity_failure
+
+    now = datetime.now(timezone.utc)
+    updates, records, results = [], [], []
+    intact = tampered = errors = 0
+    for outcome in outcomes:
+        if "error" in outcome:
+            errors += 1
+            results.append({"evidence_id": outcome["evidence_id"], "error": outcome["error"]})
+            continue
+
+        update, record, result = verification_writes(outcome, user["user_id"], now)
+        if result["matches"]:
+            intact += 1
+        else:
+            tampered += 1
+        updates.append(UpdateOne({"evidence_id": result["evidence_id"]}, {"$set": update}))
+        records.append(record)
+        results.append(result)
+
+    if updates:
+        mongo.db.evidence.bulk_write(updates, ordered=False)
+        mongo.db.hash_records.insert_many(records, ordered=False)
+
+    for result in results:
+        if "error" in result:
+            continue
+        # Group-committed by the audit writer, so this is not one round trip each.
+        log_action(
+            action="evidence_verified" if result["matches"] else "evidence_verification_failed",
+            entity_type="evidence",
+            entity_id=result["evidence_id"],
+            user_id=user["user_id"],
+            user_email=user["email"],
+            user_role=user["role"],
+            details=f"{source} ({result['tier']}): {'INTACT' if result['matches'] else 'TAMPERED'}",
+            metadata={
+                "current_hash": result["current_hash"], "matches": result["matches"],
+                "tier": result["tier"], "job_id": job_id,
+                "mismatched_ranges": result.get("mismatched_ranges"),
+            },
+        )
+    evidence = {outcome["evidence_id"]: outcome.get("evidence") for outcome in outcomes}
+    for result in results:
+        if "error" not in result and not result["matches"]:
+            ev = evidence[result["evidence_id"]]
+            notify_integrity_failure(ev.get("current_custodian_id"), ev.get("file_name", "Unknown"), ev["evidence_id"])
+
+    if job_id is None:
+        return
+    mongo.db.verification_jobs.update_one(
+        {"job_id": job_id},
+        {
+            "$inc": {"completed": len(outcomes), "intact": intact, "tampered": tampered, "errors": errors},
+            "$push": {"results": {"$each": results}},
+            "$set": {"updated_at": now},
+        },
+    )
+
+
+def _throttled(chunks, throttle):
+    for chunk in chunks:
+        throttle(len(chunk))
+        yield chunk
@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
+from app.common.validators import clamp_page
 from app.extensions import mongo
 
 NOTIFICATION_TYPES = [
@@ -32,6 +33,7 @@ def create_notification(user_id, type, title, message, link=None, metadata=None)
 
 def get_notifications(user_id, page=1, per_page=20, unread_only=False):
     """Get notifications for a user."""
+    page, per_page = clamp_page(page, per_page, default_per_page=20)
     query = {"user_id": user_id}
     if unread_only:
         query["is_read"] = False
@@ -14,6 +14,9 @@ from reportlab.platypus import (
     TableStyle,
 )
 
+from app.audit.archive import find_logs
+from app.auth.services import find_user_by_id
+from app.evidence.services import enrich_evidence
 from app.extensions import mongo
 
 
@@ -33,15 +36,10 @@ def generate_evidence_report(evidence_id):
         mongo.db.custody_transfers.find({"evidence_id": evidence_id}, {"_id": 0})
         .sort("requested_at", 1)
     )
-    audit_logs = list(
-        mongo.db.audit_logs.find(
-            {"entity_type": "evidence", "entity_id": evidence_id}, {"_id": 0}
-        ).sort("timestamp", 1)
-    )
+    audit_logs = find_logs(mongo.db, {"entity_type": "evidence", "entity_id": evidence_id}, {"_id": 0})
 
     # Enrich names
-    custodian = mongo.db.users.find_one({"user_id": ev.get("current_custodian_id")})
-    uploader = mongo.db.users.find_one({"user_id": ev.get("uploaded_by")})
+    enrich_evidence([ev])
 
     # Build PDF
     buffer = io.BytesIO()
@@ -81,8 +79,8 @@ def generate_evidence_report(evidence_id):
         ["Status", (ev.get("status", "N/A") or "N/A").title()],
         ["Description", ev.get("description", "N/A") or "N/A"],
         ["Tags", ", ".join(ev.get("tags", [])) or "None"],
-        ["Uploaded By", uploader["full_name"] if uploader else "Unknown"],
-        ["Current Custodian", custodian["full_name"] if custodian else "Unknown"],
+        ["Uploaded By", ev.get("uploaded_by_name", "Unknown")],
+        ["Current Custodian", ev.get("custodian_name", "Unknown")],
         ["Upload Date", _fmt_date(ev.get("created_at"))],
     ]
     elements.append(_make_detail_table(ev_data))
@@ -126,7 +124,7 @@ def generate_evidence_report(evidence_id):
             hash_table_data.append([
                 str(i),
                 r.get("hash_value", "")[:32] + "...",
-                r.get("event_type", "N/A"),
+                r.get("event_type", "N/A") + (f" ({r['tier']})" if r.get("tier") not in (None, "full") else ""),
                 _fmt_date(r.get("computed_at")),
                 "Yes" if r.get("matches_original") else "NO",
             ])
@@ -138,8 +136,8 @@ def generate_evidence_report(evidence_id):
         elements.append(Paragraph("Custody Transfer Timeline", heading_style))
         transfer_table_data = [["#", "From", "To", "Status", "Reason", "Date"]]
         for i, t in enumerate(transfers, 1):
-            from_user = mongo.db.users.find_one({"user_id": t.get("from_user_id")})
-            to_user = mongo.db.users.find_one({"user_id": t.get("to_user_id")})
+            from_user = find_user_by_id(t.get("from_user_id"))
+            to_user = find_user_by_id(t.get("to_user_id"))
             transfer_table_data.append([
                 str(i),
                 from_user["full_name"] if from_user else "Unknown",
@@ -190,7 +188,7 @@ def generate_case_report(case_id):
     if not case:
         return None
 
-    evidence_list = list(
+    evidence_list = enrich_evidence(
         mongo.db.evidence.find({"case_id": case_id}, {"_id": 0}).sort("created_at", 1)
     )
 
@@ -235,14 +233,13 @@ def generate_case_report(case_id):
         elements.append(Paragraph("Evidence Summary", heading_style))
         ev_table = [["#", "File Name", "Category", "Hash (truncated)", "Integrity", "Custodian"]]
         for i, ev in enumerate(evidence_list, 1):
-            custodian = mongo.db.users.find_one({"user_id": ev.get("current_custodian_id")})
             ev_table.append([
                 str(i),
                 ev.get("file_name", "N/A"),
                 (ev.get("category", "N/A") or "N/A").replace("_", " ").title(),
                 (ev.get("original_hash", "N/A") or "N/A")[:24] + "...",
                 (ev.get("integrity_status", "unverified") or "unverified").upper(),
-                custodian["full_name"] if custodian else "Unknown",
+                ev.get("custodian_name", "Unknown"),
             ])
         elements.append(_make_data_table(ev_table))
 
@@ -2,6 +2,7 @@ from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.search import search_bp
 from app.extensions import mongo
+from app.common.constants import MAX_PER_PAGE
 from app.common.errors import ValidationError
 
 
@@ -15,7 +16,7 @@ def global_search():
         - limit: max results per category (default: 5)
     """
     query = request.args.get("q", "").strip()
-    limit = int(request.args.get("limit", 5))
+    limit = min(max(1, request.args.get("limit", 5, type=int) or 5), MAX_PER_PAGE)
     
     if not query:
         raise ValidationError("Search query is required")
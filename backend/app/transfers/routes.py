@@ -1,4 +1,4 @@
-from flask import jsonify, request
+from flask import current_app, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 
 from app.common.errors import APIError, NotFoundError
@@ -44,6 +44,7 @@ def request_transfer():
         user_role=user["role"],
         details=f"Transfer requested: {transfer['evidence_name']} to {transfer['to_user_name']}",
         metadata={"evidence_id": data["evidence_id"], "to_user_id": data["to_user_id"]},
+        durable=True,
     )
 
     from app.notifications.services import notify_transfer_requested
@@ -107,6 +108,7 @@ def approve_transfer_route(transfer_id):
         user_email=user["email"],
         user_role=user["role"],
         details=f"Transfer approved: {transfer['evidence_name']}",
+        durable=True,
     )
 
     from app.notifications.services import notify_transfer_approved
@@ -135,6 +137,7 @@ def reject_transfer_route(transfer_id):
         user_email=user["email"],
         user_role=user["role"],
         details=f"Transfer rejected: {transfer['evidence_name']}",
+        durable=True,
     )
 
     from app.notifications.services import notify_transfer_rejected
@@ -152,7 +155,9 @@ def complete_transfer_route(transfer_id):
     if not user:
         raise APIError("User not found", 404)
 
-    transfer = complete_transfer(transfer_id, user["user_id"])
+    transfer = complete_transfer(
+        transfer_id, user["user_id"], hash_reuse_minutes=current_app.config.get("TRANSFER_HASH_REUSE_MINUTES", 60)
+    )
 
     from app.audit.services import log_action
     log_action(
@@ -163,6 +168,7 @@ def complete_transfer_route(transfer_id):
         user_email=user["email"],
         user_role=user["role"],
         details=f"Transfer completed: {transfer['evidence_name']} to {transfer['to_user_name']}",
+        durable=True,
     )
 
     from app.notifications.services import notify_transfer_completed
@@ -191,6 +197,7 @@ def cancel_transfer_route(transfer_id):
         user_email=user["email"],
         user_role=user["role"],
         details=f"Transfer cancelled: {transfer['evidence_name']}",
+        durable=True,
     )
 
     return jsonify({"transfer": transfer})
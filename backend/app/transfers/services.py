@@ -1,10 +1,15 @@
 import hashlib
+import threading
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
+from app.auth.services import find_user_by_id
 from app.common.errors import APIError, ForbiddenError, NotFoundError
+from app.common.validators import clamp_page
 from app.extensions import mongo
 
+CUSTODY_HASH_MAX_ATTEMPTS = 5
+
 
 def create_transfer(evidence_id, from_user_id, to_user_id, reason):
     """Create a custody transfer request."""
@@ -20,7 +25,7 @@ def create_transfer(evidence_id, from_user_id, to_user_id, reason):
         raise APIError("Cannot transfer evidence that is not active")
 
     # Verify target user exists
-    to_user = mongo.db.users.find_one({"user_id": to_user_id})
+    to_user = find_user_by_id(to_user_id)
     if not to_user:
         raise NotFoundError("Target user not found")
 
@@ -104,8 +109,16 @@ def reject_transfer(transfer_id, user_id):
     return _serialize(_enrich_transfer(transfer))
 
 
-def complete_transfer(transfer_id, user_id):
-    """Complete an approved transfer (by the sender), updating custody."""
+def complete_transfer(transfer_id, user_id, hash_reuse_minutes=60):
+    """
+    Complete an approved transfer (by the sender), updating custody.
+
+    The custody hash reuses a full verification from the last
+    ``hash_reuse_minutes`` when there is one (recorded with tier
+    "reused"); otherwise the file is hashed in the background and the
+    transfer carries custody_hash_status "pending" until the hash record
+    is appended. retry_custody_hashes picks up hashes that never finish.
+    """
     transfer = mongo.db.custody_transfers.find_one({"transfer_id": transfer_id})
     if not transfer:
         raise NotFoundError("Transfer not found")
@@ -130,26 +143,137 @@ def complete_transfer(transfer_id, user_id):
     )
 
     # Update evidence custodian
+    from app.evidence.read_model import custodian_fields
+
     mongo.db.evidence.update_one(
         {"evidence_id": transfer["evidence_id"]},
         {"$set": {
             "current_custodian_id": transfer["to_user_id"],
+            **custodian_fields(transfer["to_user_id"]),
             "updated_at": now,
         }}
     )
 
     # Record hash at transfer
-    from app.evidence.services import compute_sha256, record_hash
     evidence = mongo.db.evidence.find_one({"evidence_id": transfer["evidence_id"]})
     if evidence:
-        current_hash = compute_sha256(evidence["file_path"])
-        matches = current_hash == evidence["original_hash"]
-        record_hash(transfer["evidence_id"], current_hash, "transfer", user_id, matches)
+        transfer.update(_record_custody_hash(transfer_id, evidence, user_id, now, hash_reuse_minutes))
 
     transfer["status"] = "completed"
+    transfer["completed_at"] = now
     return _serialize(_enrich_transfer(transfer))
 
 
+def _record_custody_hash(transfer_id, evidence, user_id, now, hash_reuse_minutes):
+    """Reuse a recent full verification as the transfer hash, or start hashing in the background."""
+    from app.evidence.services import build_hash_record
+
+    # Only a whole-file hash can stand in for one; fingerprint checks also move last_verified_at.
+    last_full = evidence.get("last_full_verified_at")
+    if isinstance(last_full, datetime) and last_full.tzinfo is None:
+        last_full = last_full.replace(tzinfo=timezone.utc)
+    recent = (
+        hash_reuse_minutes
+        and evidence.get("integrity_status") == "intact"
+        and evidence.get("current_hash")
+        and isinstance(last_full, datetime)
+        and now - last_full <= timedelta(minutes=hash_reuse_minutes)
+    )
+    if recent:
+        record = build_hash_record(
+            evidence["evidence_id"], evidence["current_hash"], "transfer", user_id,
+            evidence["current_hash"] == evidence["original_hash"], tier="reused",
+        )
+        record["reused_verification_at"] = last_full
+        mongo.db.hash_records.insert_one(record)
+        fields = {
+            "custody_hash_status": "recorded",
+            "custody_hash": evidence["current_hash"],
+            "custody_hash_reused": True,
+        }
+        mongo.db.custody_transfers.update_one({"transfer_id": transfer_id}, {"$set": fields})
+        return fields
+
+    from app.evidence.storage import get_storage
+
+    fields = {
+        "custody_hash_status": "pending",
+        "custody_hash": None,
+        "custody_hash_reused": False,
+        "custody_hash_attempted_at": now,
+        "custody_hash_attempts": 1,
+    }
+    mongo.db.custody_transfers.update_one({"transfer_id": transfer_id}, {"$set": fields})
+    thread = threading.Thread(
+        target=_hash_for_transfer, args=(transfer_id, evidence, user_id, get_storage())
+    )
+    thread.daemon = True
+    thread.start()
+    return fields
+
+
+def retry_custody_hashes(storage, retry_minutes=30, limit=20, throttle=None):
+    """
+    Hash again for completed transfers whose custody hash failed, or is
+    still pending ``retry_minutes`` after it started (its thread died with
+    the process), up to CUSTODY_HASH_MAX_ATTEMPTS times. Runs in the
+    re-verification scheduler; returns the number of transfers retried.
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(minutes=retry_minutes)
+    transfers = list(mongo.db.custody_transfers.find(
+        {
+            "status": "completed",
+            "custody_hash_status": {"$in": ["pending", "failed"]},
+            "$and": [
+                {"$or": [{"custody_hash_attempted_at": {"$lt": cutoff}}, {"custody_hash_attempted_at": None}]},
+                {"$or": [
+                    {"custody_hash_attempts": {"$lt": CUSTODY_HASH_MAX_ATTEMPTS}},
+                    {"custody_hash_attempts": None},
+                ]},
+            ],
+        },
+        {"_id": 0, "transfer_id": 1, "evidence_id": 1, "from_user_id": 1, "custody_hash_attempted_at": 1},
+    ).sort("completed_at", 1).limit(limit))
+
+    retried = 0
+    for transfer in transfers:
+        # Claim the attempt so a slow sweep and a new lease holder do not both hash it.
+        claimed = mongo.db.custody_transfers.update_one(
+            {"transfer_id": transfer["transfer_id"], "custody_hash_attempted_at": transfer.get("custody_hash_attempted_at")},
+            {"$set": {"custody_hash_attempted_at": now}, "$inc": {"custody_hash_attempts": 1}},
+        )
+        if not claimed.modified_count:
+            continue
+        evidence = mongo.db.evidence.find_one(
+            {"evidence_id": transfer["evidence_id"]},
+            {"_id": 0, "evidence_id": 1, "file_path": 1, "original_hash": 1},
+        )
+        if not evidence:
+            mongo.db.custody_transfers.update_one(
+                {"transfer_id": transfer["transfer_id"]},
+                {"$set": {"custody_hash_status": "failed", "custody_hash_error": "Evidence not found"}},
+            )
+            continue
+        _hash_for_transfer(transfer["transfer_id"], evidence, transfer["from_user_id"], storage, throttle)
+        retried += 1
+    return retried
+
+
+def _hash_for_transfer(transfer_id, evidence, user_id, storage, throttle=None):
+    from app.evidence.services import record_hash
+    from app.evidence.verification import hash_stored_file
+
+    try:
+        current_hash = hash_stored_file(storage, evidence["file_path"], throttle)
+        record_hash(evidence["evidence_id"], current_hash, "transfer", user_id, current_hash == evidence["original_hash"])
+        fields = {"custody_hash_status": "recorded", "custody_hash": current_hash}
+    except Exception as e:
+        print(f"ERROR: Custody hash for transfer {transfer_id} failed: {e}")
+        fields = {"custody_hash_status": "failed", "custody_hash_error": str(e)}
+    mongo.db.custody_transfers.update_one({"transfer_id": transfer_id}, {"$set": fields})
+
+
 def cancel_transfer(transfer_id, user_id):
     """Cancel a pending transfer (by the sender)."""
     transfer = mongo.db.custody_transfers.find_one({"transfer_id": transfer_id})
@@ -172,6 +296,7 @@ def cancel_transfer(transfer_id, user_id):
 
 
 def get_transfers(page=1, per_page=10, from_user=None, to_user=None, status=None, evidence_id=None, involving_user=None):
+    page, per_page = clamp_page(page, per_page)
     query = {}
     if from_user:
         query["from_user_id"] = from_user
@@ -199,7 +324,7 @@ def get_transfers(page=1, per_page=10, from_user=None, to_user=None, status=None
     )
 
     return {
-        "transfers": [_serialize(_enrich_transfer(t)) for t in transfers],
+        "transfers": [_serialize(t) for t in _enrich_transfers(transfers)],
         "total": total,
         "page": page,
         "per_page": per_page,
@@ -222,14 +347,20 @@ def _compute_signature(user_id, transfer_id, timestamp):
 
 def _enrich_transfer(transfer):
     """Add user names and evidence name."""
-    from_user = mongo.db.users.find_one({"user_id": transfer.get("from_user_id")})
-    to_user = mongo.db.users.find_one({"user_id": transfer.get("to_user_id")})
-    evidence = mongo.db.evidence.find_one({"evidence_id": transfer.get("evidence_id")})
+    return _enrich_transfers([transfer])[0]
 
-    transfer["from_user_name"] = from_user["full_name"] if from_user else "Unknown"
-    transfer["to_user_name"] = to_user["full_name"] if to_user else "Unknown"
-    transfer["evidence_name"] = evidence["file_name"] if evidence else "Unknown"
-    return transfer
+
+def _enrich_transfers(transfers):
+    """_enrich_transfer for a whole page, with one users and one evidence query."""
+    from app.common.lookups import evidence_names, user_names
+
+    names = user_names([t.get("from_user_id") for t in transfers] + [t.get("to_user_id") for t in transfers])
+    files = evidence_names(t.get("evidence_id") for t in transfers)
+    for transfer in transfers:
+        transfer["from_user_name"] = names.get(transfer.get("from_user_id")) or "Unknown"
+        transfer["to_user_name"] = names.get(transfer.get("to_user_id")) or "Unknown"
+        transfer["evidence_name"] = files.get(transfer.get("evidence_id")) or "Unknown"
+    return transfers
 
 
 def _serialize(transfer):
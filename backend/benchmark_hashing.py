@@ -0,0 +1,139 @@
+"""
+Benchmark evidence hashing throughput on this machine's storage.
+
+Writes random files of each size into --dir (default: a temp dir; point it
+at the real UPLOAD_FOLDER volume to measure that disk), then hashes each
+with every strategy and prints MB/s:
+
+    small-read   read(8 KiB) into fresh bytes objects (the old behaviour)
+    readinto     read_chunks with the adaptive buffer (EVIDENCE_HASH_BUFFER_SIZE=0)
+    readinto-N   readinto with a fixed N-MiB buffer
+    mmap         hash_file(use_mmap=True) (EVIDENCE_HASH_MMAP=true)
+
+--threads N also hashes N files at once per strategy, to check that
+hashing scales across cores (hashlib releases the GIL).
+
+Caches: files just written are usually in the page cache, so numbers are
+warm-cache unless --drop-caches is given (Linux, needs root).
+
+Usage: python benchmark_hashing.py [--sizes 1M,16M,256M,1G] [--repeat 3] [--threads 4] [--dir PATH]
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.evidence.hashing import buffer_size_for, hash_file
+
+UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(text):
+    text = text.strip().upper()
+    if text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(size):
+    for unit in ("G", "M", "K"):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return str(size)
+
+
+def write_file(path, size):
+    block = os.urandom(min(size, 4 * 1024 * 1024))
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining:
+            f.write(block[:remaining])
+            remaining -= min(remaining, len(block))
+
+
+def small_read(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(8192), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def strategies(fixed_sizes_mib):
+    yield "small-read", small_read
+    yield "readinto", lambda path: hash_file(path, use_mmap=False)["sha256"]
+    for mib in fixed_sizes_mib:
+        yield f"readinto-{mib}", lambda path, mib=mib: hash_file(path, buffer_size=mib * 1024 * 1024, use_mmap=False)["sha256"]
+    yield "mmap", lambda path: hash_file(path, use_mmap=True)["sha256"]
+
+
+def drop_caches():
+    subprocess.run(["sync"], check=False)
+    try:
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+    except OSError as e:
+        raise SystemExit(f"--drop-caches failed: {e}")
+
+
+def measure(fn, paths, threads, repeat, cold):
+    """Best MB/s over ``repeat`` runs of hashing every path in ``paths``."""
+    total = sum(os.path.getsize(p) for p in paths)
+    best = 0.0
+    for _ in range(repeat):
+        if cold:
+            drop_caches()
+        start = time.perf_counter()
+        if threads > 1:
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                list(pool.map(fn, paths))
+        else:
+            for path in paths:
+                fn(path)
+        elapsed = time.perf_counter() - start
+        best = max(best, total / elapsed / (1024 * 1024))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="64K,1M,16M,256M", help="comma-separated file sizes, e.g. 1M,1G")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=1, help="also hash this many files concurrently")
+    parser.add_argument("--buffers", default="1,4,8", help="fixed buffer sizes to compare, in MiB")
+    parser.add_argument("--dir", help="directory to write test files in (default: a temp dir)")
+    parser.add_argument("--drop-caches", action="store_true", help="drop the page cache before each run")
+    args = parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    fixed = [int(m) for m in args.buffers.split(",") if m.strip()]
+    workdir = tempfile.mkdtemp(prefix="hashbench-", dir=args.dir)
+    thread_counts = [1] if args.threads <= 1 else [1, args.threads]
+    try:
+        names = [name for name, _ in strategies(fixed)]
+        print(f"{'size':>6} {'buffer':>7} {'threads':>7}  " + "  ".join(f"{n:>12}" for n in names) + "   (MB/s)")
+        for size in sizes:
+            paths = []
+            for i in range(max(thread_counts)):
+                path = os.path.join(workdir, f"{format_size(size)}-{i}.bin")
+                write_file(path, size)
+                paths.append(path)
+            for threads in thread_counts:
+                row = [measure(fn, paths[:threads], threads, args.repeat, args.drop_caches) for _, fn in strategies(fixed)]
+                print(
+                    f"{format_size(size):>6} {format_size(buffer_size_for(size)):>7} {threads:>7}  "
+                    + "  ".join(f"{rate:>12.0f}" for rate in row)
+                )
+            for path in paths:
+                os.remove(path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
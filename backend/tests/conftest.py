@@ -0,0 +1,101 @@
+"""
+Test fixtures: a Flask app on TestingConfig backed by an in-memory
+mongomock database, with upload/archive folders under pytest's tmp_path.
+"""
+
+import uuid
+from datetime import datetime, timezone
+
+import mongomock
+import pytest
+from flask import Flask
+
+from app import _create_indexes
+from app.audit import chain
+from app.common.cache import case_cache, user_cache
+from app.config import TestingConfig
+from app.extensions import mongo
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask("app")
+    app.config.from_object(TestingConfig)
+    app.config.update(
+        JWT_SECRET_KEY="test-jwt-secret-key-of-at-least-32-bytes",
+        UPLOAD_FOLDER=str(tmp_path / "uploads"),
+        AUDIT_ARCHIVE_FOLDER=str(tmp_path / "audit_archive"),
+        AUDIT_CHECK_QUERY_PLANS=False,
+    )
+    mongo.db = mongomock.MongoClient().db
+    _create_indexes(mongo.db)
+    chain._forget_tail()
+    user_cache.clear()
+    case_cache.clear()
+
+    from app.evidence.storage import init_storage
+    init_storage(app)
+
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def db(app):
+    return mongo.db
+
+
+@pytest.fixture
+def client(app):
+    """Test client for the evidence API; ``client.login(user_id)`` sets the bearer token."""
+    from flask_jwt_extended import create_access_token
+
+    from app.common.errors import register_error_handlers
+    from app.evidence import evidence_bp
+    from app.extensions import jwt
+
+    jwt.init_app(app)
+    register_error_handlers(app)
+    app.register_blueprint(evidence_bp, url_prefix="/api/evidence")
+    client = app.test_client()
+
+    def login(user_id):
+        client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {create_access_token(identity=user_id)}"
+
+    client.login = login
+    return client
+
+
+@pytest.fixture
+def users(db):
+    """One user per role used by the route tests, keyed by role."""
+    roles = ("admin", "investigator", "forensic_analyst")
+    db.users.insert_many([
+        {"user_id": f"{role}-1", "email": f"{role}@example.com", "full_name": role.title(), "role": role,
+         "is_active": True}
+        for role in roles
+    ])
+    return {role: f"{role}-1" for role in roles}
+
+
+@pytest.fixture
+def new_entry():
+    """Factory for unchained audit entries, as log_action builds them."""
+    def make(action="evidence_viewed", entity_id="ev-1", user_id="user-1", **fields):
+        entry = {
+            "log_id": str(uuid.uuid4()),
+            "action": action,
+            "entity_type": "evidence",
+            "entity_id": entity_id,
+            "user_id": user_id,
+            "user_email": f"{user_id}@example.com",
+            "user_role": "investigator",
+            "details": f"{action} {entity_id}",
+            "metadata": {},
+            "ip_address": "system",
+            "user_agent": "system",
+            "timestamp": datetime.now(timezone.utc),
+        }
+        entry.update(fields)
+        return entry
+    return make
@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.audit import archive
+from app.audit.archive import count_archived, find_archived, find_logs, iter_chain, list_segments, seal_segments
+from app.audit.chain import append_entries
+from app.audit.services import get_audit_logs, verify_chain_integrity
+
+OLD = datetime.now(timezone.utc) - timedelta(days=365)
+
+
+@pytest.fixture
+def sealed(app, db, new_entry):
+    """Three sealed segments of four entries (one evidence item each) plus a hot tail."""
+    app.config["AUDIT_SEGMENT_SIZE"] = 4
+    entries = [
+        new_entry(entity_id=f"ev-{i // 4}", user_id=f"user-{i // 4}", timestamp=OLD + timedelta(minutes=i))
+        for i in range(12)
+    ]
+    append_entries(db, entries)
+    append_entries(db, [new_entry(entity_id="ev-hot")])
+    assert verify_chain_integrity()["intact"]
+    return seal_segments(db)
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """first_sequence of every segment file read."""
+    opened = []
+    read = archive.read_segment
+
+    def spy(segment, *args, **kwargs):
+        opened.append(segment["first_sequence"])
+        return read(segment, *args, **kwargs)
+
+    monkeypatch.setattr(archive, "read_segment", spy)
+    return opened
+
+
+def test_sealing_moves_entries_out_of_hot_tier(db, sealed):
+    assert [s["first_sequence"] for s in sealed] == [1, 5, 9]
+    assert db.audit_logs.count_documents({}) == 1
+    assert [e["chain_sequence"] for e in iter_chain(db)] == list(range(1, 14))
+    assert verify_chain_integrity(full=True)["intact"]
+
+
+def test_filtered_reads_only_open_segments_holding_the_key(db, sealed, opened):
+    logs = list(find_archived(db, {"entity_id": "ev-1"}))
+
+    assert [e["chain_sequence"] for e in logs] == [8, 7, 6, 5]
+    assert opened == [5]
+
+    opened.clear()
+    logs = find_logs(db, {"user_id": {"$in": ["user-0", "user-2"]}})
+    assert [e["entity_id"] for e in logs] == ["ev-0"] * 4 + ["ev-2"] * 4
+    assert opened == [1, 9]
+
+    opened.clear()
+    assert list(find_archived(db, {"entity_id": "ev-unknown"})) == []
+    assert opened == []
+
+
+def test_unindexed_segments_are_still_read_until_indexed(db, sealed, opened):
+    db.audit_segment_keys.delete_many({})
+    db.audit_segments.update_many({}, {"$unset": {"keys_indexed": ""}})
+
+    assert len(list(find_archived(db, {"entity_id": "ev-1"}))) == 4
+    assert sorted(opened) == [1, 5, 9]
+
+    archive.index_segment_keys(db)
+    opened.clear()
+    assert len(list(find_archived(db, {"entity_id": "ev-1"}))) == 4
+    assert opened == [5]
+    assert all(s["keys_indexed"] for s in list_segments(db))
+
+
+def test_listing_pages_across_tiers(db, sealed):
+    first = get_audit_logs(per_page=5, cursor="")
+    second = get_audit_logs(per_page=5, cursor=first["next_cursor"])
+
+    sequences = [log["chain_sequence"] for log in first["logs"] + second["logs"]]
+    assert sequences == [13, 12, 11, 10, 9, 8, 7, 6, 5, 4]
+    assert get_audit_logs(entity_id="ev-2", per_page=10)["total"] == 4
+
+
+def test_cursor_pages_skip_counts_and_emit_utc_timestamps(db, sealed, monkeypatch):
+    counts = []
+    count_documents = db.audit_logs.count_documents
+    monkeypatch.setattr(db.audit_logs, "count_documents", lambda *a, **k: counts.append(a) or count_documents(*a, **k))
+
+    # Filtered to archived entries only, so the hot page comes back empty.
+    page = get_audit_logs(entity_id="ev-1", per_page=2, cursor="", include_total=False)
+    rest = get_audit_logs(entity_id="ev-1", per_page=2, cursor=page["next_cursor"], include_total=False)
+
+    assert counts == []
+    assert "total" not in page
+    assert [log["chain_sequence"] for log in page["logs"] + rest["logs"]] == [8, 7, 6, 5]
+    hot = get_audit_logs(per_page=2, cursor="", include_total=False)["logs"]
+    assert all(log["timestamp"].endswith("+00:00") for log in page["logs"] + hot)
+
+
+def test_deep_pages_skip_segments_without_opening_them(db, sealed, opened):
+    page = get_audit_logs(per_page=2, page=5, include_total=False)
+
+    assert [log["chain_sequence"] for log in page["logs"]] == [5, 4]
+    assert page["has_more"] is True
+    assert opened == [5, 1]
+
+
+def test_archived_counts_come_from_segment_keys(db, sealed, opened):
+    assert count_archived(db, {"entity_id": "ev-1"}) == 4
+    assert count_archived(db) == 12
+    assert opened == []
+    assert count_archived(db, {"entity_type": "evidence", "entity_id": "ev-1"}) == 4
+    assert opened == [5]
+
+
+def test_inclusion_proof_for_archived_entry_opens_one_segment(db, sealed, opened):
+    from app.audit.merkle import get_inclusion_proof
+    from app.common import merkle
+
+    log_id = db.audit_archived_ids.find_one({"chain_sequence": 6})["log_id"]
+
+    proof = get_inclusion_proof(log_id)
+
+    assert proof["chain_sequence"] == 6
+    assert opened == [5]
+    assert merkle.verify_inclusion(
+        bytes.fromhex(proof["leaf_hash"]), proof["leaf_index"], proof["tree_size"],
+        [bytes.fromhex(h) for h in proof["audit_path"]], bytes.fromhex(proof["root_hash"]),
+    )
+
+
+def test_segments_are_written_through_storage(db, sealed):
+    from app.evidence.storage import get_storage
+
+    for segment in sealed:
+        assert segment["storage_key"].startswith("audit-archive/")
+        assert segment["segment_id"] in segment["file_name"]
+        assert get_storage().stat(segment["storage_key"])["size"] == segment["file_size"]
+
+
+def test_sealing_waits_for_the_lease(app, db, new_entry):
+    from app.common.errors import ConflictError
+    from app.common.leases import acquire_lease, new_holder
+
+    assert acquire_lease(db, archive.SEAL_LEASE_NAME, new_holder(), 60)
+    with pytest.raises(ConflictError):
+        seal_segments(db)
+    with pytest.raises(ConflictError):
+        archive.start_sealing(app)
+
+
+def test_start_sealing_runs_in_background(app, db, new_entry):
+    app.config["AUDIT_SEGMENT_SIZE"] = 2
+    append_entries(db, [new_entry(timestamp=OLD + timedelta(minutes=i)) for i in range(5)])
+    verify_chain_integrity()
+
+    archive.start_sealing(app, sealed_by="admin").join(5)
+
+    state = archive.get_seal_state(db)
+    assert state["status"] == "completed"
+    assert state["sealed"] == 2
+    assert [s["first_sequence"] for s in list_segments(db)] == [1, 3]
+
+
+def test_segments_sealed_into_the_archive_folder_are_still_read(app, db, sealed):
+    import os
+    import shutil
+
+    from app.evidence.storage import get_storage
+
+    folder = app.config["AUDIT_ARCHIVE_FOLDER"]
+    os.makedirs(folder)
+    for segment in sealed:
+        shutil.copy(get_storage().local_path(segment["storage_key"]), os.path.join(folder, segment["file_name"]))
+        get_storage().delete(segment["storage_key"])
+    db.audit_segments.update_many({}, {"$unset": {"storage_key": ""}})
+
+    assert verify_chain_integrity(full=True)["intact"]
+    assert len(list(find_archived(db, {"entity_id": "ev-1"}))) == 4
+
+
+def test_missing_segment_object_breaks_full_verification(db, sealed):
+    from app.evidence.storage import get_storage
+
+    get_storage().delete(sealed[1]["storage_key"])
+
+    result = verify_chain_integrity(full=True)
+    assert not result["intact"]
+    assert result["broken_at"] == 5
@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from app.audit import writer
+from app.audit.chain import GENESIS_HASH, append_entries, chain_timestamp, compute_entry_hash
+from app.audit.services import verify_chain_integrity
+from app.audit.writer import AuditWriter
+from app.common.errors import APIError
+
+
+@pytest.fixture
+def audit_writer(db, tmp_path):
+    audit_writer = AuditWriter(db, batch_size=10, spill_folder=str(tmp_path / "spill"))
+    yield audit_writer
+    audit_writer.close(5)
+
+
+def _sequences(db):
+    return [e["chain_sequence"] for e in db.audit_logs.find({}, {"chain_sequence": 1}).sort("chain_sequence", 1)]
+
+
+def _chained(entry, sequence, previous_hash):
+    """``entry`` as another worker would have committed it."""
+    entry.update(
+        chain_sequence=sequence,
+        previous_log_hash=previous_hash,
+        hash_of_entry=compute_entry_hash(
+            entry["action"], entry["entity_id"], entry["user_id"], entry["details"],
+            chain_timestamp(entry["timestamp"]), previous_hash,
+        ),
+    )
+    return entry
+
+
+def test_concurrent_appenders_keep_an_unbroken_chain(db, audit_writer, new_entry):
+    def submit_many(thread):
+        for i in range(25):
+            if i % 5 == 0:
+                append_entries(db, [new_entry(entity_id=f"ev-{thread}")])
+            else:
+                audit_writer.submit(new_entry(entity_id=f"ev-{thread}"), durable=i % 3 == 0)
+
+    threads = [threading.Thread(target=submit_many, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert audit_writer.flush(5)
+
+    assert _sequences(db) == list(range(1, 201))
+    result = verify_chain_integrity(full=True)
+    assert result["intact"]
+    assert result["entries_verified"] == 200
+
+
+def test_partial_bulk_write_rechains_the_rest(db, new_entry, monkeypatch):
+    append_entries(db, [new_entry(), new_entry()])
+    collection = type(db.audit_logs)
+    insert_many = collection.insert_many
+    raced = []
+
+    def racing_insert_many(self, documents, ordered=True):
+        if raced:
+            return insert_many(self, documents, ordered=ordered)
+        # Our first entry lands, then another worker appends behind it before our second one.
+        raced.append(True)
+        self.insert_one(documents[0])
+        self.insert_one(_chained(new_entry(action="other_worker"), documents[0]["chain_sequence"] + 1,
+                                 documents[0]["hash_of_entry"]))
+        raise BulkWriteError({"writeErrors": [{"index": 1, "code": 11000}], "nInserted": 1})
+
+    monkeypatch.setattr(collection, "insert_many", racing_insert_many)
+    batch = [new_entry(action=f"ours_{i}") for i in range(3)]
+    append_entries(db, batch)
+
+    assert [e["chain_sequence"] for e in batch] == [3, 5, 6]
+    assert _sequences(db) == [1, 2, 3, 4, 5, 6]
+    assert db.audit_logs.find_one({"chain_sequence": 4})["action"] == "other_worker"
+    assert verify_chain_integrity(full=True)["intact"]
+
+
+def test_stale_tail_after_duplicate_is_resynced(db, new_entry):
+    append_entries(db, [new_entry()])
+    genesis_entry = db.audit_logs.find_one({"chain_sequence": 1})
+    # Another worker appends while this one still trusts its cached tail.
+    db.audit_logs.insert_one(_chained(new_entry(action="other_worker"), 2, genesis_entry["hash_of_entry"]))
+
+    entry = append_entries(db, [new_entry()])[0]
+
+    assert entry["chain_sequence"] == 3
+    assert verify_chain_integrity(full=True)["intact"]
+    assert genesis_entry["previous_log_hash"] == GENESIS_HASH
+
+
+def test_durable_submit_returns_committed_entry(db, audit_writer, new_entry):
+    entry = audit_writer.submit(new_entry(), durable=True)
+
+    assert entry["chain_sequence"] == 1
+    assert db.audit_logs.find_one({"log_id": entry["log_id"]}) is not None
+
+
+def test_flush_waits_for_non_durable_entries(db, audit_writer, new_entry):
+    entries = [audit_writer.submit(new_entry()) for _ in range(30)]
+
+    assert audit_writer.flush(5)
+    assert db.audit_logs.count_documents({"log_id": {"$in": [e["log_id"] for e in entries]}}) == 30
+
+
+def test_flush_times_out_when_the_writer_is_stuck(db, new_entry, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(writer, "append_entries", lambda db, entries: release.wait(5))
+    stuck = AuditWriter(db, batch_size=1, queue_size=1)
+    stuck.submit(new_entry())  # taken by the writer thread, which blocks
+    stuck.submit(new_entry())  # fills the queue
+
+    assert stuck.flush(timeout=0.2) is False
+    release.set()
+
+
+def test_failed_non_durable_entries_are_spilled_and_replayed(db, audit_writer, new_entry, monkeypatch):
+    monkeypatch.setattr(writer.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(writer, "append_entries", _failing)
+
+    entry = audit_writer.submit(new_entry())
+    with pytest.raises(APIError) as error:
+        audit_writer.submit(new_entry(), durable=True)
+    assert error.value.status_code == 503
+    assert audit_writer.flush(5)
+
+    spill_path = audit_writer._spill_path()
+    with open(spill_path) as f:
+        spilled = f.read().splitlines()
+    assert len(spilled) == 1 and entry["log_id"] in spilled[0]
+    assert db.audit_logs.count_documents({}) == 0
+
+    # Writes recover: the next successful batch appends the spilled entry too.
+    monkeypatch.setattr(writer, "append_entries", append_entries)
+    audit_writer.submit(new_entry(), durable=True)
+    assert audit_writer.flush(5)
+
+    assert db.audit_logs.find_one({"log_id": entry["log_id"]}) is not None
+    assert not os.path.exists(spill_path)
+    assert verify_chain_integrity(full=True)["intact"]
+
+
+def _failing(db, entries):
+    raise RuntimeError("primary unavailable")
+
+
+def test_orphaned_spill_file_is_replayed_by_one_writer_only(db, tmp_path, new_entry, monkeypatch):
+    folder = tmp_path / "spill"
+    first = AuditWriter(db, spill_folder=str(folder))
+    second = AuditWriter(db, spill_folder=str(folder))
+    orphan = new_entry()
+    folder.mkdir()
+    with open(first._spill_path(pid=999999), "w") as f:
+        f.write(json.dumps(writer._spillable(orphan), default=str) + "\n")
+    first_pid, second_pid = os.getpid(), 424242
+    monkeypatch.setattr(writer, "_pid_alive", lambda pid: pid in (first_pid, second_pid))
+
+    def append_while_second_replays(db, entries):
+        # Another process's writer starts its replay while the first is mid-append.
+        with monkeypatch.context() as m:
+            m.setattr(writer.os, "getpid", lambda: second_pid)
+            second._replay_spilled()
+        return append_entries(db, entries)
+
+    monkeypatch.setattr(writer, "append_entries", append_while_second_replays)
+    first._replay_spilled()
+
+    assert db.audit_logs.count_documents({"log_id": orphan["log_id"]}) == 1
+    assert os.listdir(folder) == []
+    assert verify_chain_integrity(full=True)["intact"]
+
+
+def test_claimed_file_of_a_dead_replayer_is_taken_over(db, tmp_path, new_entry, monkeypatch):
+    folder = tmp_path / "spill"
+    folder.mkdir()
+    orphan = new_entry()
+    host = writer.socket.gethostname()
+    with open(folder / f"{writer.SPILL_CLAIMED_PREFIX}{host}-999999-abcd1234.jsonl", "w") as f:
+        f.write(json.dumps(writer._spillable(orphan), default=str) + "\n")
+    monkeypatch.setattr(writer, "_pid_alive", lambda pid: False)
+
+    AuditWriter(db, spill_folder=str(folder))._replay_spilled()
+
+    assert db.audit_logs.count_documents({"log_id": orphan["log_id"]}) == 1
+    assert os.listdir(folder) == []
+
+
+def test_writer_thread_indexes_committed_batches(db, audit_writer, new_entry):
+    for _ in range(3):
+        audit_writer.submit(new_entry())
+    audit_writer.close(5)
+
+    assert db.audit_merkle_state.find_one({})["size"] == 3
+    assert db.audit_rollups.find_one({"entity_id": "ev-1"})["last_sequence"] == 3
@@ -0,0 +1,99 @@
+import hashlib
+import os
+
+import pytest
+
+from app.evidence.blobs import blob_key, release_blob, staging_path, store_blob
+from app.evidence.storage import get_storage
+
+DATA = b"the same evidence bytes"
+SHA = hashlib.sha256(DATA).hexdigest()
+
+
+def _staged():
+    path = staging_path()
+    with open(path, "wb") as f:
+        f.write(DATA)
+    return path
+
+
+def _ref_count(db):
+    blob = db.evidence_blobs.find_one({"sha256": SHA})
+    return blob["ref_count"] if blob else None
+
+
+def test_identical_uploads_share_one_blob(db):
+    first, second = _staged(), _staged()
+
+    assert store_blob(first, SHA, len(DATA)) == store_blob(second, SHA, len(DATA)) == blob_key(SHA)
+
+    assert _ref_count(db) == 2
+    assert not os.path.exists(first) and not os.path.exists(second)
+    assert b"".join(get_storage().open(blob_key(SHA))) == DATA
+
+
+def test_file_is_deleted_with_the_last_reference(db):
+    store_blob(_staged(), SHA, len(DATA))
+    store_blob(_staged(), SHA, len(DATA))
+
+    assert release_blob(SHA) is False
+    assert get_storage().stat(blob_key(SHA)) is not None
+
+    assert release_blob(SHA) is True
+    assert _ref_count(db) is None
+    assert get_storage().stat(blob_key(SHA)) is None
+    assert os.listdir(os.path.dirname(get_storage().local_path(blob_key(SHA)))) == []
+
+
+def test_release_of_unknown_blob_is_a_no_op(db):
+    assert release_blob(SHA) is False
+
+
+@pytest.fixture
+def store_during_release(monkeypatch):
+    """Run a store_blob of the same bytes when the releaser moves the file aside, before or after the move."""
+    storage = get_storage()
+    move = type(storage).move
+
+    def interleave(when):
+        def racing_move(self, key, new_key):
+            monkeypatch.setattr(type(storage), "move", move)
+            if when == "before":
+                store_blob(_staged(), SHA, len(DATA))
+            move(self, key, new_key)
+            if when == "after":
+                store_blob(_staged(), SHA, len(DATA))
+        monkeypatch.setattr(type(storage), "move", racing_move)
+    return interleave
+
+
+@pytest.mark.parametrize("when, freed", [
+    ("before", False),  # the upload found the old file, so it is put back
+    ("after", True),    # the upload stored a fresh copy; only the old one is deleted
+])
+def test_upload_racing_the_last_release_keeps_the_file(db, store_during_release, when, freed):
+    store_blob(_staged(), SHA, len(DATA))
+    store_during_release(when)
+
+    assert release_blob(SHA) is freed
+
+    assert _ref_count(db) == 1
+    assert b"".join(get_storage().open(blob_key(SHA))) == DATA
+    folder = os.path.dirname(get_storage().local_path(blob_key(SHA)))
+    assert os.listdir(folder) == [SHA]  # nothing left behind under a .deleting name
+
+    assert release_blob(SHA) is True
+    assert get_storage().stat(blob_key(SHA)) is None
+
+
+@pytest.mark.parametrize("stored", [DATA[:-3], DATA.upper()], ids=["truncated", "tampered"])
+def test_corrupt_existing_blob_is_replaced(db, stored):
+    path = get_storage().local_path(blob_key(SHA))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(stored)
+
+    assert store_blob(_staged(), SHA, len(DATA)) == blob_key(SHA)
+
+    assert b"".join(get_storage().open(blob_key(SHA))) == DATA
+    assert _ref_count(db) == 1
@@ -0,0 +1,77 @@
+import pytest
+
+from app.common import cache
+from app.common.cache import MISSING, TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable stand-in for time.monotonic."""
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    users = TTLCache("users", maxsize=10, ttl=60)
+    users.set("u1", {"full_name": "Ada"})
+
+    clock[0] += 59
+    assert users.get("u1") == {"full_name": "Ada"}
+
+    clock[0] += 1
+    assert users.get("u1") is MISSING
+    assert users.stats()["expirations"] == 1
+    assert users.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    users = TTLCache("users", maxsize=2, ttl=60)
+    users.set("u1", 1)
+    users.set("u2", 2)
+    assert users.get("u1") == 1
+
+    users.set("u3", 3)
+
+    assert users.get("u2") is MISSING
+    assert users.get_many(["u1", "u2", "u3"]) == ({"u1": 1, "u3": 3}, ["u2"])
+    stats = users.stats()
+    assert stats["evictions"] == 1
+    assert stats["size"] == 2
+    assert (stats["hits"], stats["misses"]) == (3, 2)
+
+
+def test_setting_again_refreshes_expiry(clock):
+    users = TTLCache("users", maxsize=10, ttl=60)
+    users.set("u1", 1)
+    clock[0] += 30
+    users.set("u1", 2)
+    clock[0] += 45
+
+    assert users.get("u1") == 2
+
+
+@pytest.mark.parametrize("maxsize,ttl", [(0, 60), (10, 0)])
+def test_zero_size_or_ttl_disables_cache(clock, maxsize, ttl):
+    users = TTLCache("users")
+    users.set("u1", 1)
+
+    users.configure(maxsize, ttl)
+    users.set("u2", 2)
+
+    assert users.get("u1") is MISSING
+    assert users.get("u2") is MISSING
+
+
+def test_invalidation_drops_one_key_or_everything(clock):
+    users = TTLCache("users", maxsize=10, ttl=60)
+    users.set("u1", 1)
+    users.set("u2", 2)
+
+    users.handle_invalidation("u1")
+    assert users.get("u1") is MISSING
+    assert users.get("u2") == 2
+
+    users.handle_invalidation(None)
+    assert users.get("u2") is MISSING
+    assert users.stats()["invalidations"] == 1
@@ -0,0 +1,66 @@
+import pytest
+
+from app.audit.chain import append_entries
+from app.audit.checkpoints import check_checkpoint_key, get_latest_checkpoint, save_checkpoint
+from app.audit.services import verify_chain_integrity
+
+
+@pytest.fixture
+def checkpoint(db, new_entry):
+    entries = append_entries(db, [new_entry() for _ in range(3)])
+    return save_checkpoint(db, 3, entries[-1]["hash_of_entry"], 3)
+
+
+def test_valid_checkpoint_is_returned(db, checkpoint):
+    assert get_latest_checkpoint(db)["checkpoint_id"] == checkpoint["checkpoint_id"]
+
+
+@pytest.mark.parametrize("tamper", [
+    {"hash_of_entry": "0" * 64},
+    {"chain_sequence": 2},
+    {"signature": "0" * 64},
+], ids=["hash", "sequence", "signature"])
+def test_tampered_checkpoint_is_ignored(db, checkpoint, tamper):
+    db.audit_checkpoints.update_one({"checkpoint_id": checkpoint["checkpoint_id"]}, {"$set": tamper})
+
+    assert get_latest_checkpoint(db) is None
+    result = verify_chain_integrity()
+    assert result["mode"] == "full"
+    assert result["intact"] and result["entries_verified"] == 3
+
+
+def test_checkpoint_signed_with_another_key_is_ignored(app, db, checkpoint):
+    app.config["AUDIT_CHECKPOINT_KEY"] = "a-rotated-checkpoint-key"
+
+    assert get_latest_checkpoint(db) is None
+
+
+def test_verification_resumes_from_the_checkpoint(db, checkpoint, new_entry):
+    append_entries(db, [new_entry(), new_entry()])
+
+    result = verify_chain_integrity()
+
+    assert result["intact"]
+    assert result["mode"] == "incremental"
+    assert result["checkpoint"]["chain_sequence"] == 3
+    assert result["entries_verified"] == 2
+    assert get_latest_checkpoint(db)["chain_sequence"] == 5
+
+
+def test_checkpoint_over_a_rewritten_entry_breaks_verification(db, checkpoint):
+    db.audit_logs.update_one({"chain_sequence": 3}, {"$set": {"hash_of_entry": "f" * 64}})
+
+    result = verify_chain_integrity()
+
+    assert result["intact"] is False
+    assert result["broken_at"] == 3
+
+
+def test_startup_warns_without_a_dedicated_key(app, capsys):
+    app.config["AUDIT_CHECKPOINT_KEY"] = None
+    assert check_checkpoint_key(app) is False
+    assert "AUDIT_CHECKPOINT_KEY is not set" in capsys.readouterr().out
+
+    app.config["AUDIT_CHECKPOINT_KEY"] = "dedicated"
+    assert check_checkpoint_key(app) is True
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,139 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from app.common import merkle
+from app.common.errors import ValidationError
+from app.evidence import merkle as chunk_merkle
+from app.evidence.merkle import (
+    MAX_PROOF_CHUNKS,
+    ChunkTreeHasher,
+    delete_chunk_tree,
+    get_chunk_tree,
+    range_proof,
+    save_chunk_tree,
+    tree_root,
+    verify_chunks,
+)
+from app.evidence.storage import get_storage
+
+CHUNK = 1024
+DATA = os.urandom(5 * CHUNK + 300)  # five full chunks and a partial one
+SHA = hashlib.sha256(DATA).hexdigest()
+KEY = "blobs/test/chunked"
+
+
+def _reference_root(leaves):
+    """RFC 6962 Merkle tree hash, straight from the definition."""
+    if len(leaves) == 1:
+        return leaves[0]
+    split = 1
+    while split * 2 < len(leaves):
+        split *= 2
+    return merkle.node_hash(_reference_root(leaves[:split]), _reference_root(leaves[split:]))
+
+
+def _leaves(data):
+    hasher = ChunkTreeHasher(chunk_size=CHUNK)
+    for start in range(0, len(data), 700):  # pieces that straddle chunk boundaries
+        hasher.update(data[start:start + 700])
+    return hasher.finish()
+
+
+@pytest.fixture
+def tree(db):
+    save_chunk_tree(SHA, len(DATA), _leaves(DATA), chunk_size=CHUNK)
+    return get_chunk_tree(SHA)
+
+
+def _store(data):
+    get_storage().put(KEY, io.BytesIO(data))
+
+
+def test_leaves_and_root_match_the_reference_tree():
+    leaves = _leaves(DATA)
+
+    expected = [merkle.leaf_hash(DATA[i:i + CHUNK]) for i in range(0, len(DATA), CHUNK)]
+    assert leaves == expected
+    assert len(leaves) == 6
+    assert tree_root(leaves) == _reference_root(expected).hex()
+
+
+def test_intact_file_verifies(tree):
+    _store(DATA)
+
+    result = verify_chunks(get_storage(), KEY, tree)
+
+    assert result == {
+        "matches": True, "chunks_checked": 6, "mismatched_ranges": [], "merkle_root": tree["root"],
+    }
+
+
+@pytest.mark.parametrize("stored, ranges", [
+    (DATA[:1500] + bytes([DATA[1500] ^ 1]) + DATA[1501:], [[1024, 2048]]),
+    (DATA[:2000], [[1024, len(DATA)]]),
+    (DATA + b"appended", [[len(DATA), len(DATA) + 8]]),
+], ids=["flipped-byte", "truncated", "appended"])
+def test_mismatched_ranges(tree, stored, ranges):
+    _store(stored)
+
+    result = verify_chunks(get_storage(), KEY, tree)
+
+    assert result["matches"] is False
+    assert result["mismatched_ranges"] == ranges
+
+
+def test_partial_range_hashes_only_its_chunks(tree):
+    _store(DATA[:1500] + bytes([DATA[1500] ^ 1]) + DATA[1501:])
+
+    assert verify_chunks(get_storage(), KEY, tree, 3000, 4000)["matches"] is True
+    assert verify_chunks(get_storage(), KEY, tree, 1000, 1100)["mismatched_ranges"] == [[1024, 2048]]
+
+
+def test_range_proof_paths_verify_against_the_root(tree):
+    proof = range_proof(tree, 1000, 4100)
+
+    assert [c["index"] for c in proof["chunks"]] == [0, 1, 2, 3, 4]
+    assert proof["byte_range"] == [0, 5 * CHUNK]
+    root = bytes.fromhex(proof["root_hash"])
+    for chunk in proof["chunks"]:
+        start = chunk["index"] * CHUNK
+        leaf = merkle.leaf_hash(DATA[start:start + CHUNK])
+        assert leaf.hex() == chunk["leaf_hash"]
+        path = [bytes.fromhex(h) for h in chunk["audit_path"]]
+        assert merkle.verify_inclusion(leaf, chunk["index"], proof["tree_size"], path, root)
+
+
+@pytest.mark.parametrize("start, end", [(-1, 10), (10, 10), (20, 10), (0, len(DATA) + 1)])
+def test_invalid_ranges_are_rejected(tree, start, end):
+    with pytest.raises(ValidationError):
+        range_proof(tree, start, end)
+    with pytest.raises(ValidationError):
+        verify_chunks(get_storage(), KEY, tree, start, end)
+
+
+def test_range_proofs_are_capped():
+    leaves = [merkle.leaf_hash(bytes([i % 256])) for i in range(MAX_PROOF_CHUNKS + 1)]
+    tree = {"chunk_size": 1, "size": len(leaves), "leaves": leaves, "root": tree_root(leaves)}
+
+    assert len(range_proof(tree, 0, MAX_PROOF_CHUNKS)["chunks"]) == MAX_PROOF_CHUNKS
+    with pytest.raises(ValidationError):
+        range_proof(tree, 0, MAX_PROOF_CHUNKS + 1)
+
+
+def test_large_trees_keep_their_leaves_in_storage(db, monkeypatch):
+    monkeypatch.setattr(chunk_merkle, "MAX_INLINE_LEAVES", 4)
+    leaves = _leaves(DATA)
+
+    save_chunk_tree(SHA, len(DATA), leaves, chunk_size=CHUNK)
+
+    stored = db.evidence_chunk_trees.find_one({"sha256": SHA})
+    assert "leaves" not in stored
+    assert get_storage().stat(stored["leaves_key"])["size"] == 32 * len(leaves)
+    assert get_chunk_tree(SHA)["leaves"] == leaves
+
+    delete_chunk_tree(SHA)
+    assert get_storage().stat(stored["leaves_key"]) is None
+    assert get_chunk_tree(SHA) is None
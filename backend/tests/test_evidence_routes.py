@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+
+
+def _job(db, created_by):
+    now = datetime.now(timezone.utc)
+    db.verification_jobs.insert_one({
+        "job_id": "job-1", "status": "completed", "tier": "full", "total": 1,
+        "completed": 1, "intact": 1, "tampered": 0, "errors": 0,
+        "results": [], "evidence_ids": ["ev-1"], "created_by": created_by,
+        "created_at": now, "updated_at": now, "started_at": now, "finished_at": now,
+    })
+
+
+def test_job_creator_can_read_verification_job(client, db, users):
+    _job(db, users["investigator"])
+    client.login(users["investigator"])
+
+    response = client.get("/api/evidence/bulk/verify/job-1")
+
+    assert response.status_code == 200
+    assert response.get_json()["job"]["job_id"] == "job-1"
+
+
+def test_other_verifiers_cannot_read_verification_job(client, db, users):
+    _job(db, users["investigator"])
+    client.login(users["forensic_analyst"])
+
+    assert client.get("/api/evidence/bulk/verify/job-1").status_code == 403
+
+
+def test_admin_can_read_any_verification_job(client, db, users):
+    _job(db, users["investigator"])
+    client.login(users["admin"])
+
+    assert client.get("/api/evidence/bulk/verify/job-1").status_code == 200
+    assert client.get("/api/evidence/bulk/verify/job-2").status_code == 404
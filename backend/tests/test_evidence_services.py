@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from app.common.constants import MAX_PER_PAGE
+from app.evidence.services import get_case_evidence, get_evidence, get_evidence_list
+
+
+def test_get_evidence_serializes_verification_timestamps(db):
+    now = datetime(2026, 1, 2, 3, 4, 5)
+    db.evidence.insert_one({
+        "evidence_id": "ev-1", "file_name": "a.bin", "file_path": "/secret/a.bin",
+        "current_custodian_id": "u-1", "uploaded_by": "u-1", "case_id": None,
+        "created_at": now, "updated_at": now, "last_verified_at": now,
+        "last_full_verified_at": now, "reverify_attempted_at": now,
+    })
+
+    ev = get_evidence("ev-1")
+
+    for field in ("created_at", "updated_at", "last_verified_at", "last_full_verified_at", "reverify_attempted_at"):
+        assert ev[field] == "2026-01-02T03:04:05"
+    assert "file_path" not in ev
+
+
+def test_list_page_sizes_are_capped(db):
+    db.evidence.insert_many([
+        {"evidence_id": f"ev-{i}", "case_id": "case-1", "created_at": datetime(2026, 1, 1)}
+        for i in range(MAX_PER_PAGE + 5)
+    ])
+
+    case_page = get_case_evidence("case-1", page=1, per_page=10_000)
+    list_page = get_evidence_list(page=0, per_page=10_000)
+
+    assert case_page["per_page"] == MAX_PER_PAGE
+    assert len(case_page["evidence"]) == MAX_PER_PAGE
+    assert case_page["total_pages"] == 2
+    assert (list_page["page"], list_page["per_page"]) == (1, MAX_PER_PAGE)
+    assert len(list_page["evidence"]) == MAX_PER_PAGE
+
+
+def test_sparse_fields_without_enriched_fields_skip_enrichment(db, monkeypatch):
+    db.evidence.insert_one({"evidence_id": "ev-1", "file_name": "a.bin", "case_id": "case-1", "uploaded_by": "u-1"})
+    lookups = []
+    monkeypatch.setattr("app.evidence.read_model.read_model_fields", lambda evidence: lookups.append(evidence))
+
+    page = get_evidence_list(fields=["evidence_id", "file_name"])
+
+    assert page["evidence"] == [{"evidence_id": "ev-1", "file_name": "a.bin"}]
+    assert lookups == []
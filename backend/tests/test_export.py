@@ -0,0 +1,80 @@
+import csv
+import io
+from datetime import datetime, timedelta, timezone
+
+from app.audit import archive
+from app.audit.archive import seal_segments
+from app.audit.chain import append_entries
+from app.audit.services import verify_chain_integrity
+from app.evidence import export
+
+OLD = datetime.now(timezone.utc) - timedelta(days=365)
+
+HEADER = [
+    "Log ID", "Action", "Entity Type", "Entity ID",
+    "User Email", "User Role", "Details",
+    "Hash", "Previous Hash", "Sequence",
+    "Timestamp",
+]
+
+
+def _chain(app, db, new_entry):
+    """Eight sealed entries in two segments plus three in the hot collection."""
+    app.config["AUDIT_SEGMENT_SIZE"] = 4
+    append_entries(db, [new_entry(timestamp=OLD + timedelta(minutes=i)) for i in range(8)])
+    append_entries(db, [
+        new_entry(details='moved to "locker 3", shelf B'),
+        new_entry(details="line one\nline two"),
+        new_entry(),
+    ])
+    assert verify_chain_integrity()["intact"]
+    assert [s["first_sequence"] for s in seal_segments(db)] == [1, 5]
+    assert db.audit_logs.count_documents({}) == 3
+
+
+def test_audit_export_streams_rows_across_tiers(app, client, db, users, new_entry, monkeypatch):
+    _chain(app, db, new_entry)
+    monkeypatch.setattr(export, "AUDIT_EXPORT_BATCH_SIZE", 2)
+    pulled = []
+    iter_chain = archive.iter_chain
+
+    def spy(*args, **kwargs):
+        for log in iter_chain(*args, **kwargs):
+            pulled.append(log["chain_sequence"])
+            yield log
+
+    monkeypatch.setattr(archive, "iter_chain", spy)
+    client.login(users["admin"])
+
+    response = client.get("/api/evidence/export/audit")
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    chunks = iter(response.response)
+    first = next(chunks).decode()
+    # Only the first batch has been read from the chain so far.
+    assert pulled == [1, 2]
+    assert len(list(csv.reader(io.StringIO(first)))) == 1 + 2
+    body = first + b"".join(chunks).decode()
+
+    rows = list(csv.reader(io.StringIO(body)))
+    assert rows[0] == HEADER
+    assert len(rows) == 1 + 11
+    assert [int(row[9]) for row in rows[1:]] == list(range(1, 12))
+    assert rows[9][6] == 'moved to "locker 3", shelf B'
+    assert rows[10][6] == "line one\nline two"
+    hot = db.audit_logs.find_one({"chain_sequence": 9})
+    assert rows[9][7] == hot["hash_of_entry"]
+    assert rows[9][8] == hot["previous_log_hash"] == rows[8][7]
+    assert pulled == list(range(1, 12))
+
+
+def test_audit_export_bounds_sequence_range(app, client, db, users, new_entry):
+    _chain(app, db, new_entry)
+    client.login(users["admin"])
+
+    response = client.get("/api/evidence/export/audit?from_sequence=3&to_sequence=10")
+
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == HEADER
+    assert [int(row[9]) for row in rows[1:]] == list(range(3, 11))
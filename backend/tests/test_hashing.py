@@ -0,0 +1,58 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from app.evidence.hashing import HASH_CHUNK_SIZE, MIN_BUFFER_SIZE, copy_and_hash, hash_file
+
+SIZES = [0, 1, HASH_CHUNK_SIZE - 1, HASH_CHUNK_SIZE, 3 * HASH_CHUNK_SIZE, 3 * HASH_CHUNK_SIZE + 17]
+
+
+class ReadOnly:
+    """A stream without readinto, like some WSGI input wrappers."""
+
+    def __init__(self, data):
+        self._stream = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("wrap", [io.BytesIO, ReadOnly], ids=["readinto", "read"])
+def test_copy_and_hash_matches_hashlib(size, wrap):
+    data = os.urandom(size)
+    destination = io.BytesIO()
+
+    copied, digests = copy_and_hash(wrap(data), destination, algorithms=("sha256", "sha1", "md5"))
+
+    assert copied == size
+    assert destination.getvalue() == data
+    assert digests == {
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "sha1": hashlib.sha1(data).hexdigest(),
+        "md5": hashlib.md5(data).hexdigest(),
+    }
+
+
+@pytest.mark.parametrize("size", [0, 1, MIN_BUFFER_SIZE, 4 * MIN_BUFFER_SIZE, 4 * MIN_BUFFER_SIZE + 1])
+@pytest.mark.parametrize("buffer_size", [MIN_BUFFER_SIZE, None], ids=["fixed", "adaptive"])
+@pytest.mark.parametrize("use_mmap", [False, True], ids=["readinto", "mmap"])
+@pytest.mark.parametrize("throttled", [False, True], ids=["unthrottled", "throttled"])
+def test_hash_file_matches_hashlib(tmp_path, size, buffer_size, use_mmap, throttled):
+    data = os.urandom(size)
+    path = tmp_path / "evidence.bin"
+    path.write_bytes(data)
+    blocks = []
+
+    digests = hash_file(
+        str(path), buffer_size=buffer_size, use_mmap=use_mmap,
+        throttle=blocks.append if throttled else None,
+    )
+
+    assert digests == {"sha256": hashlib.sha256(data).hexdigest()}
+    if throttled:
+        assert sum(blocks) == size
+        if buffer_size:
+            assert len(blocks) == -(-size // buffer_size)
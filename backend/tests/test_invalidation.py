@@ -0,0 +1,125 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pymongo.errors import OperationFailure
+
+from app.auth.services import create_user, update_user
+from app.cases.services import create_case, update_case
+from app.common import invalidation
+from app.common.cache import MISSING, TTLCache, case_cache, user_cache
+from app.common.invalidation import COLLECTION, InvalidationBus, subscribe
+from app.common.lookups import cached_users, cases_by_id
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """A clean handler registry and no bus, restored after the test."""
+    monkeypatch.setattr(invalidation, "_handlers", {})
+    monkeypatch.setattr(invalidation, "_bus", None)
+
+
+def _since():
+    return datetime.now(timezone.utc) - timedelta(seconds=1)
+
+
+def test_publish_in_one_process_evicts_entry_in_another(db, handlers):
+    # Two API processes sharing the database; each has its own cache and bus.
+    here, there = TTLCache("users"), TTLCache("users")
+    bus_here = InvalidationBus(db, mode="poll")
+    bus_there = InvalidationBus(db, mode="poll")
+    here.set("u1", "stale")
+    there.set("u1", "stale")
+    since = _since()
+
+    bus_here.publish("users", "u1")
+    assert there.get("u1") == "stale"
+
+    subscribe("users", there.handle_invalidation)
+    bus_there._poll(since)
+    assert there.get("u1") is MISSING
+    # Publishers do not re-read their own messages.
+    subscribe("users", here.handle_invalidation)
+    here.set("u1", "fresh")
+    bus_here._poll(since)
+    assert here.get("u1") == "fresh"
+
+
+def test_each_message_is_dispatched_once(db, handlers):
+    received = []
+    subscribe("cases", received.append)
+    bus_here = InvalidationBus(db, mode="poll")
+    bus_there = InvalidationBus(db, mode="poll")
+    since = _since()
+
+    bus_here.publish("cases", "c1")
+    since = bus_there._poll(since)
+    # The next poll re-reads the overlap window but skips what it has seen.
+    bus_here.publish("cases", None)
+    bus_there._poll(since)
+
+    assert received == ["c1", None]
+
+
+def test_listener_thread_applies_remote_invalidations(db, handlers):
+    there = TTLCache("cases")
+    there.set("c1", "stale")
+    subscribe("cases", there.handle_invalidation)
+    bus_there = InvalidationBus(db, mode="poll", poll_seconds=0.01)
+    bus_there.start()
+    try:
+        InvalidationBus(db, mode="poll").publish("cases", "c1")
+        deadline = time.monotonic() + 5
+        while there.get("c1") is not MISSING and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        bus_there.stop(2)
+
+    assert there.get("c1") is MISSING
+
+
+def test_falls_back_to_polling_without_capped_collections(db, monkeypatch):
+    def refuse(*args, **kwargs):
+        raise OperationFailure("capped collections are not allowed")
+
+    monkeypatch.setattr(db, "create_collection", refuse)
+
+    bus = InvalidationBus(db)
+
+    assert bus.tailable is False
+    indexes = db[COLLECTION].index_information().values()
+    assert any(index.get("expireAfterSeconds") == invalidation.MESSAGE_TTL_SECONDS for index in indexes)
+
+
+class RecordingBus:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, key):
+        self.published.append((channel, key))
+
+
+def test_user_and_case_writers_publish(db, handlers, monkeypatch):
+    bus = RecordingBus()
+    monkeypatch.setattr(invalidation, "_bus", bus)
+    for cache in (user_cache, case_cache):
+        subscribe(cache.name, cache.handle_invalidation)
+
+    user = create_user("ada@example.com", "secret-password", "Ada", "investigator")
+    user_id = user["user_id"]
+    assert cached_users([user_id])[user_id]["role"] == "investigator"
+    update_user(user_id, {"role": "admin"})
+    assert cached_users([user_id])[user_id]["role"] == "admin"
+    update_user(user_id, {"is_active": False})
+    assert cached_users([user_id])[user_id]["is_active"] is False
+
+    case = create_case("Burglary", "", user_id, "Ada")
+    case_id = case["case_id"]
+    assert cases_by_id([case_id])[case_id]["status"] == "open"
+    update_case(case_id, {"status": "closed"})
+    assert cases_by_id([case_id])[case_id]["status"] == "closed"
+
+    assert bus.published == [
+        ("users", user_id), ("users", user_id), ("users", user_id),
+        ("cases", case_id), ("cases", case_id),
+    ]
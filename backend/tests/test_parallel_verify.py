@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.audit import parallel_verify
+from app.audit.archive import seal_segments
+from app.audit.chain import append_entries, chain_timestamp, compute_entry_hash
+from app.audit.parallel_verify import verify_chain_parallel
+from app.audit.services import verify_chain_integrity
+
+OLD = datetime.now(timezone.utc) - timedelta(days=365)
+
+
+class InProcessClient:
+    """Stands in for a worker's MongoClient: the test's mongomock database."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def get_default_database(self):
+        return self.db
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def in_process(db, monkeypatch):
+    """Run the workers on one thread against the test database, three hot entries per segment."""
+    monkeypatch.setattr(parallel_verify, "_make_pool", lambda workers: ThreadPoolExecutor(1))
+    monkeypatch.setattr(parallel_verify, "_connect", lambda mongo_uri: InProcessClient(db))
+    monkeypatch.setattr(parallel_verify, "MIN_SEGMENT_SIZE", 3)
+
+
+@pytest.fixture
+def chain(app, db, new_entry):
+    """Eight entries in two sealed segments, then ten hot ones (sequences 1-18)."""
+    app.config["AUDIT_SEGMENT_SIZE"] = 4
+    append_entries(db, [new_entry(timestamp=OLD + timedelta(minutes=i)) for i in range(8)])
+    append_entries(db, [new_entry(entity_id=f"ev-{i}") for i in range(10)])
+    assert verify_chain_integrity()["intact"]
+    assert len(seal_segments(db)) == 2
+
+
+def test_intact_chain_verifies_in_parallel(db, chain, in_process):
+    result = verify_chain_parallel(workers=2)
+
+    assert result["intact"]
+    assert result["entries_verified"] == result["total_entries"] == 18
+    assert result["throughput"]["segments"] == 2 + 4
+    assert result["new_checkpoint"]["chain_sequence"] == 18
+
+
+@pytest.mark.parametrize("sequence", [9, 10, 11, 12, 17])
+@pytest.mark.parametrize("tamper", ["details", "rehashed"])
+def test_parallel_reports_the_same_first_break_as_serial(db, chain, in_process, sequence, tamper):
+    # Sequence 9 opens the hot range; hot segments start at 9, 12, 15 and 18.
+    # "rehashed" hides the edit from the entry's own hash, so the break shows at the next link.
+    entry = db.audit_logs.find_one({"chain_sequence": sequence})
+    changes = {"details": "rewritten"}
+    if tamper == "rehashed":
+        changes["hash_of_entry"] = compute_entry_hash(
+            entry["action"], entry["entity_id"], entry["user_id"], "rewritten",
+            chain_timestamp(entry["timestamp"]), entry["previous_log_hash"],
+        )
+    db.audit_logs.update_one({"chain_sequence": sequence}, {"$set": changes})
+
+    serial = verify_chain_integrity(full=True)
+    parallel = verify_chain_parallel(workers=2)
+
+    assert not serial["intact"]
+    assert not parallel["intact"]
+    assert (parallel["broken_at"], parallel["error"]) == (serial["broken_at"], serial["error"])
+    assert serial["broken_at"] == sequence + (tamper == "rehashed")
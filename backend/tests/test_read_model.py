@@ -0,0 +1,78 @@
+import threading
+
+from app.common.leases import acquire_lease, new_holder
+from app.evidence import read_model
+from app.evidence.read_model import (
+    BACKFILL_LEASE_NAME,
+    READ_MODEL_VERSION,
+    backfill_read_model,
+    on_case_retitled,
+    start_read_model_backfill,
+)
+
+
+def _seed(db, count=3):
+    db.users.insert_one({"user_id": "user-1", "full_name": "Ada Investigator"})
+    db.cases.insert_one({"case_id": "case-1", "case_number": "C-1", "title": "Old title", "status": "open"})
+    db.evidence.insert_many([
+        {"evidence_id": f"ev-{i}", "case_id": "case-1", "case_ids": ["case-1"],
+         "current_custodian_id": "user-1", "uploaded_by": "user-1"}
+        for i in range(count)
+    ])
+
+
+def test_retitle_only_targets_documents_with_linked_cases(db, monkeypatch):
+    # mongomock has no array_filters, so check the update's filter instead of applying it.
+    _seed(db)
+    read_model.refresh_read_model(["ev-0"])
+    calls = []
+    monkeypatch.setattr(type(db.evidence), "update_many", lambda self, *args, **kwargs: calls.append(args))
+
+    on_case_retitled("case-1", "New title")
+
+    (query, update), = calls
+    assert [ev["evidence_id"] for ev in db.evidence.find(query)] == ["ev-0"]
+    assert update == {"$set": {"linked_cases.$[linked].title": "New title"}}
+
+
+def test_backfill_embeds_fields(db):
+    _seed(db)
+
+    assert backfill_read_model(batch_size=2) == 3
+
+    for ev in db.evidence.find():
+        assert ev["read_model_version"] == READ_MODEL_VERSION
+        assert ev["custodian_name"] == "Ada Investigator"
+        assert ev["case_numbers"] == ["C-1"]
+
+
+def test_backfill_waits_for_lease_held_elsewhere(app, db, monkeypatch):
+    _seed(db)
+    other = new_holder()
+    assert acquire_lease(db, BACKFILL_LEASE_NAME, other, 60)
+    slept = threading.Event()
+
+    def fake_sleep(seconds):
+        # The other process finishes while this one waits.
+        other_process = threading.Thread(target=backfill_read_model)
+        other_process.start()
+        other_process.join()
+        slept.set()
+
+    monkeypatch.setattr(read_model.time, "sleep", fake_sleep)
+    monkeypatch.setattr(read_model, "refresh_read_model", _fail_if_called(read_model.refresh_read_model))
+    app.config["READ_MODEL_BACKFILL"] = True
+
+    thread = start_read_model_backfill(app)
+    thread.join(5)
+
+    assert slept.is_set()
+    assert db.scheduler_leases.find_one({"name": BACKFILL_LEASE_NAME})["holder"] == other
+
+
+def _fail_if_called(refresh):
+    def guarded(ids):
+        if threading.current_thread().name == "evidence-read-model-backfill":
+            raise AssertionError("backfill ran without the lease")
+        return refresh(ids)
+    return guarded
@@ -0,0 +1,148 @@
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.common.leases import acquire_lease, release_lease
+from app.evidence import reverify
+from app.evidence.fingerprint import compute_fingerprint
+from app.evidence.reverify import LEASE_NAME, ReverifyScheduler, TokenBucket
+from app.evidence.storage import get_storage
+from app.evidence.verification import check_evidence
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(reverify.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(reverify.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_bucket_spends_its_burst_then_waits_for_refill(clock):
+    bucket = TokenBucket(rate=100, burst=200)
+
+    bucket.consume(150)
+    assert clock.slept == []
+    bucket.consume(100)  # 50 short: half a second at 100/s
+    assert clock.slept == [pytest.approx(0.5)]
+
+
+def test_bucket_refill_is_capped_at_the_burst(clock):
+    bucket = TokenBucket(rate=100, burst=200)
+    bucket.consume(200)
+    clock.now += 60  # idle for long enough to refill many times over
+
+    bucket.consume(200)
+    assert clock.slept == []
+    bucket.consume(100)
+    assert clock.slept == [pytest.approx(1.0)]
+
+
+def test_oversized_chunk_goes_into_debt_instead_of_blocking_forever(clock):
+    bucket = TokenBucket(rate=100)
+
+    bucket.consume(300)
+    assert clock.slept == [pytest.approx(2.0)]
+
+
+def test_lease_is_exclusive_until_released_or_expired(db):
+    assert acquire_lease(db, LEASE_NAME, "a", 60)
+    assert not acquire_lease(db, LEASE_NAME, "b", 60)
+    assert acquire_lease(db, LEASE_NAME, "a", 60)  # renewal
+
+    release_lease(db, LEASE_NAME, "a")
+    assert acquire_lease(db, LEASE_NAME, "b", 60)
+
+    db.scheduler_leases.update_one(
+        {"name": LEASE_NAME}, {"$set": {"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)}}
+    )
+    assert acquire_lease(db, LEASE_NAME, "a", 60)  # takeover from a holder that died
+
+
+def _evidence(db, evidence_id, **fields):
+    doc = {
+        "evidence_id": evidence_id, "status": "active", "file_path": f"blobs/{evidence_id}",
+        "original_hash": "0" * 64, "current_custodian_id": "u-1", "last_verified_at": None,
+    }
+    doc.update(fields)
+    db.evidence.insert_one(doc)
+
+
+def test_run_once_sweeps_the_stalest_evidence_at_the_fast_tier(db, monkeypatch):
+    now = datetime.now(timezone.utc)
+    _evidence(db, "never")
+    _evidence(db, "stale", last_verified_at=now - timedelta(days=30))
+    _evidence(db, "staler", last_verified_at=now - timedelta(days=60))
+    _evidence(db, "fresh", last_verified_at=now - timedelta(days=1))
+    _evidence(db, "disposed", status="disposed")
+    _evidence(db, "attempted", reverify_attempted_at=now - timedelta(hours=1))
+    checked, recorded = [], []
+    monkeypatch.setattr(reverify, "retry_custody_hashes", lambda *a, **k: 0)
+    monkeypatch.setattr(
+        reverify, "check_evidence",
+        lambda storage, ev, tier, throttle, cadence: checked.append((ev["evidence_id"], tier)) or {"tier": "fast"},
+    )
+    monkeypatch.setattr(reverify, "record_outcomes", lambda outcomes, user, source: recorded.extend(outcomes))
+    scheduler = ReverifyScheduler(get_storage(), bandwidth_mbps=0, batch_size=2, concurrency=1)
+
+    assert scheduler.run_once() == 2
+    assert checked == [("never", "fast"), ("staler", "fast")]
+    assert [o["evidence_id"] for o in recorded] == ["never", "staler"]
+    assert scheduler.run_once() == 1
+    assert checked[-1] == ("stale", "fast")
+
+
+def test_run_once_does_nothing_while_another_process_holds_the_lease(db, monkeypatch):
+    _evidence(db, "never")
+    acquire_lease(db, LEASE_NAME, "other-process", 60)
+    monkeypatch.setattr(reverify, "check_evidence", lambda *a: pytest.fail("checked without the lease"))
+
+    assert ReverifyScheduler(get_storage(), bandwidth_mbps=0).run_once() == 0
+
+
+@pytest.fixture
+def stored(db):
+    storage = get_storage()
+    storage.put("blobs/fast", io.BytesIO(b"evidence bytes" * 1000))
+    return storage, {
+        "evidence_id": "ev-1", "file_path": "blobs/fast", "original_hash": "0" * 64, "integrity_status": "intact",
+        "fingerprint": compute_fingerprint(storage, "blobs/fast"),
+        "last_full_verified_at": datetime.now(timezone.utc) - timedelta(days=1),
+    }
+
+
+def test_fast_tier_vouches_for_an_unchanged_file(stored):
+    storage, ev = stored
+    assert check_evidence(storage, ev, "fast")["tier"] == "fast"
+
+
+def test_fast_tier_escalates_when_a_full_hash_is_due(stored):
+    storage, ev = stored
+    ev["last_full_verified_at"] = datetime.now(timezone.utc) - timedelta(days=90)
+
+    result = check_evidence(storage, ev, "fast", full_cadence_days=30)
+
+    assert (result["tier"], result["escalation"]) == ("full", "full_hash_due")
+
+
+def test_fast_tier_escalates_when_the_fingerprint_changed(stored):
+    storage, ev = stored
+    storage.put("blobs/fast", io.BytesIO(b"altered bytes!" * 1001))
+
+    result = check_evidence(storage, ev, "fast")
+
+    assert (result["tier"], result["escalation"]) == ("full", "fingerprint_changed")
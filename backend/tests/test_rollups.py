@@ -0,0 +1,95 @@
+from pymongo.errors import BulkWriteError
+
+from app.audit.chain import append_entries, index_committed
+from app.audit.rollups import applied_through, catch_up_rollups, get_rollup, rebuild_rollups
+from app.audit.writer import AuditWriter
+
+
+def test_rollup_predating_history_is_rebuilt_on_read(db, new_entry):
+    append_entries(db, [new_entry(), new_entry(action="evidence_downloaded", user_id="user-2")])
+    catch_up_rollups(db)
+    # History written before rollups existed: only the next append is folded in.
+    db.audit_rollups.delete_many({})
+    append_entries(db, [new_entry()])
+    catch_up_rollups(db)
+    assert db.audit_rollups.find_one({"entity_id": "ev-1"})["total_actions"] == 1
+
+    rollup = get_rollup(db, "evidence", "ev-1")
+
+    assert rollup["complete"] is True
+    assert rollup["total_actions"] == 3
+    assert rollup["view_count"] == 2
+    assert rollup["action_counts"] == {"evidence_viewed": 2, "evidence_downloaded": 1}
+    assert sorted(rollup["user_ids"]) == ["user-1", "user-2"]
+
+
+def test_complete_rollup_keeps_incremental_updates(db, new_entry):
+    append_entries(db, [new_entry()])
+    rebuild_rollups(db)
+    append_entries(db, [new_entry(), new_entry()])
+
+    rollup = get_rollup(db, "evidence", "ev-1")
+
+    assert rollup["complete"] is True
+    assert rollup["total_actions"] == 3
+    assert rollup["last_sequence"] == 3
+
+
+def test_unknown_entity_gets_empty_rollup(db):
+    rollup = get_rollup(db, "evidence", "missing")
+    assert rollup["total_actions"] == 0
+    assert rollup.get("first_timestamp") is None
+
+
+def test_appends_leave_anchoring_and_rollups_to_the_indexer(db, new_entry):
+    append_entries(db, [new_entry(), new_entry()])
+
+    assert db.audit_rollups.count_documents({}) == 0
+    assert db.audit_merkle_state.count_documents({}) == 0
+
+    index_committed(db)
+
+    assert db.audit_rollups.find_one({"entity_id": "ev-1"})["total_actions"] == 2
+    assert db.audit_merkle_state.find_one({})["size"] == 2
+
+
+def test_catch_up_is_idempotent(db, new_entry):
+    append_entries(db, [new_entry(), new_entry()])
+    rebuild_rollups(db)  # already counts both entries
+    assert catch_up_rollups(db) == 2
+    append_entries(db, [new_entry()])
+    db.audit_rollup_state.delete_many({})  # e.g. a crash before the mark was saved
+
+    catch_up_rollups(db)
+    catch_up_rollups(db)
+
+    assert get_rollup(db, "evidence", "ev-1")["total_actions"] == 3
+    assert applied_through(db) == 3
+
+
+def test_entries_committed_by_a_failed_batch_are_rolled_up(db, new_entry, monkeypatch):
+    append_entries(db, [new_entry()])
+    rebuild_rollups(db)
+    insert_many = db.audit_logs.insert_many
+
+    def commit_two_then_fail(documents, ordered=True):
+        insert_many(documents[:2], ordered=ordered)
+        raise BulkWriteError({"writeErrors": [{"code": 6, "errmsg": "connection reset"}], "nInserted": 2})
+
+    def fail_once(documents, ordered=True):
+        monkeypatch.setattr(db.audit_logs, "insert_many", insert_many)
+        commit_two_then_fail(documents, ordered)
+
+    monkeypatch.setattr(db.audit_logs, "insert_many", fail_once)
+    monkeypatch.setattr("app.audit.writer.time.sleep", lambda seconds: None)
+    audit_writer = AuditWriter(db)
+    # The first attempt commits part of the batch before failing; the retry appends the rest.
+    audit_writer.submit(new_entry())
+    audit_writer.submit(new_entry())
+    audit_writer.submit(new_entry(), durable=True)
+    audit_writer.close(5)
+
+    assert db.audit_logs.count_documents({}) == 4
+    rollup = get_rollup(db, "evidence", "ev-1")
+    assert rollup["complete"] is True
+    assert rollup["total_actions"] == 4
@@ -0,0 +1,94 @@
+import hashlib
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.evidence.storage import get_storage
+from app.transfers import services
+from app.transfers.services import complete_transfer, retry_custody_hashes
+
+CONTENT = b"evidence bytes"
+SHA = hashlib.sha256(CONTENT).hexdigest()
+
+
+class _LostThread:
+    """Stands in for the background hashing thread of a process that died."""
+
+    def __init__(self, *args, **kwargs):
+        self.daemon = False
+
+    def start(self):
+        pass
+
+
+@pytest.fixture
+def transfer(db):
+    now = datetime.now(timezone.utc)
+    get_storage().put("files/ev-1", io.BytesIO(CONTENT))
+    db.users.insert_many([
+        {"user_id": "sender", "email": "sender@example.com", "full_name": "Sender"},
+        {"user_id": "receiver", "email": "receiver@example.com", "full_name": "Receiver"},
+    ])
+    db.evidence.insert_one({
+        "evidence_id": "ev-1", "file_path": "files/ev-1", "original_hash": SHA, "current_hash": SHA,
+        "integrity_status": "intact", "current_custodian_id": "sender",
+        # A fingerprint check just now, but the last whole-file hash is old.
+        "last_verified_at": now, "last_full_verified_at": now - timedelta(days=10),
+    })
+    db.custody_transfers.insert_one({
+        "transfer_id": "tr-1", "evidence_id": "ev-1", "from_user_id": "sender", "to_user_id": "receiver",
+        "status": "approved", "requested_at": now,
+    })
+    return "tr-1"
+
+
+def test_recent_fast_check_is_not_reused(db, transfer, monkeypatch):
+    monkeypatch.setattr(services.threading, "Thread", _LostThread)
+
+    result = complete_transfer(transfer, "sender")
+
+    assert result["custody_hash_status"] == "pending"
+    assert db.hash_records.count_documents({}) == 0
+
+
+def test_recent_full_verification_is_reused_with_provenance(db, transfer):
+    full_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+    db.evidence.update_one({"evidence_id": "ev-1"}, {"$set": {"last_full_verified_at": full_at}})
+
+    result = complete_transfer(transfer, "sender")
+
+    assert result["custody_hash_status"] == "recorded"
+    assert result["custody_hash_reused"] is True
+    record = db.hash_records.find_one({"evidence_id": "ev-1"})
+    assert record["tier"] == "reused"
+    assert record["event_type"] == "transfer"
+
+
+def test_lost_custody_hash_is_retried(db, transfer, monkeypatch):
+    monkeypatch.setattr(services.threading, "Thread", _LostThread)
+    complete_transfer(transfer, "sender")
+
+    # Not stale yet.
+    assert retry_custody_hashes(get_storage(), retry_minutes=30) == 0
+
+    db.custody_transfers.update_one(
+        {"transfer_id": transfer},
+        {"$set": {"custody_hash_attempted_at": datetime.now(timezone.utc) - timedelta(hours=1)}},
+    )
+    assert retry_custody_hashes(get_storage(), retry_minutes=30) == 1
+
+    stored = db.custody_transfers.find_one({"transfer_id": transfer})
+    assert stored["custody_hash_status"] == "recorded"
+    assert stored["custody_hash"] == SHA
+    assert stored["custody_hash_attempts"] == 2
+    assert db.hash_records.find_one({"evidence_id": "ev-1"})["tier"] == "full"
+
+
+def test_retries_stop_after_max_attempts(db, transfer):
+    db.custody_transfers.update_one({"transfer_id": transfer}, {"$set": {
+        "status": "completed", "custody_hash_status": "failed",
+        "custody_hash_attempts": services.CUSTODY_HASH_MAX_ATTEMPTS,
+    }})
+
+    assert retry_custody_hashes(get_storage(), retry_minutes=0) == 0
@@ -0,0 +1,127 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from app.common.errors import ConflictError
+from app.evidence import uploads
+from app.evidence.uploads import (
+    _merge,
+    _missing_ranges,
+    finalize_upload,
+    get_upload_status,
+    init_upload,
+    mark_finalized,
+    write_chunk,
+)
+
+DATA = os.urandom(3 * 1024 * 1024 + 123)
+SHA = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture(autouse=True)
+def clear_hash_states():
+    uploads._hash_states.clear()
+    yield
+    uploads._hash_states.clear()
+
+
+def _put(upload_id, start, end):
+    return write_chunk(upload_id, "user-1", start, io.BytesIO(DATA[start:end]), end - start)
+
+
+def _open(expected_sha256=SHA):
+    return init_upload("user-1", "case-1", "disk.img", len(DATA), expected_sha256=expected_sha256)["upload_id"]
+
+
+def test_merge_coalesces_overlapping_and_touching_ranges():
+    assert _merge([[10, 20], [0, 5], [5, 8], [15, 30], [40, 50]]) == [[0, 8], [10, 30], [40, 50]]
+    assert _merge([]) == []
+
+
+def test_missing_ranges_report_gaps_and_tail():
+    assert _missing_ranges([[10, 20], [30, 40]], 50) == [[0, 10], [20, 30], [40, 50]]
+    assert _missing_ranges([[0, 50]], 50) == []
+    assert _missing_ranges([], 7) == [[0, 7]]
+
+
+def test_status_reports_what_is_still_missing(app):
+    upload_id = _open()
+    _put(upload_id, 1000, 2000)
+    status = _put(upload_id, 0, 500)
+
+    assert status["received_bytes"] == 1500
+    assert status["contiguous_bytes"] == 500
+    assert status["missing_ranges"] == [[500, 1000], [2000, len(DATA)]]
+    with pytest.raises(ConflictError):
+        finalize_upload(upload_id, "user-1")
+
+
+def test_out_of_order_and_repeated_chunks_hash_in_file_order(app):
+    upload_id = _open()
+    size = len(DATA)
+    third = size // 3
+    _put(upload_id, 2 * third, size)
+    _put(upload_id, third, 2 * third)
+    _put(upload_id, third, 2 * third)  # a retried chunk
+    _put(upload_id, 0, third + 10)     # overlaps what is already there
+
+    assert get_upload_status(upload_id, "user-1")["missing_ranges"] == []
+    session, storage_key, digests = finalize_upload(upload_id, "user-1")
+
+    assert digests["sha256"] == SHA
+    assert storage_key.endswith(SHA)
+
+
+def test_evicted_hash_state_is_rebuilt_from_staging_file(app):
+    upload_id = _open()
+    half = len(DATA) // 2
+    _put(upload_id, 0, half)
+    uploads._hash_states.clear()  # idle expiry, or the next chunk landing on another worker
+    _put(upload_id, half, len(DATA))
+
+    assert finalize_upload(upload_id, "user-1")[2]["sha256"] == SHA
+
+
+def test_hash_states_are_bounded(app, monkeypatch):
+    monkeypatch.setattr(uploads._hash_states, "maxsize", 2)
+    ids = [_open() for _ in range(3)]
+    for upload_id in ids:
+        _put(upload_id, 0, 10)
+
+    assert uploads._hash_states.stats()["size"] == 2
+
+
+def test_concurrent_finalize_is_claimed_once(app, db, monkeypatch):
+    upload_id = _open()
+    _put(upload_id, 0, len(DATA))
+    stale = db.upload_sessions.find_one({"upload_id": upload_id}, {"_id": 0})
+
+    session, _, _ = finalize_upload(upload_id, "user-1")
+    # A second request that read the session before the first one claimed it.
+    monkeypatch.setattr(uploads, "_get_open_session", lambda *args: dict(stale))
+    with pytest.raises(ConflictError):
+        finalize_upload(upload_id, "user-1")
+
+    mark_finalized(upload_id, "ev-1")
+    assert db.evidence_blobs.find_one({"sha256": SHA})["ref_count"] == 1
+    assert db.upload_sessions.find_one({"upload_id": upload_id})["status"] == "finalized"
+
+
+def test_requests_on_another_host_get_a_conflict(app, db):
+    upload_id = _open()
+    _put(upload_id, 0, len(DATA) - 1000)
+    # Another host has no copy of this host's staging file.
+    os.remove(db.upload_sessions.find_one({"upload_id": upload_id})["staging_path"])
+    uploads._hash_states.clear()
+
+    with pytest.raises(ConflictError) as chunk_error:
+        _put(upload_id, len(DATA) - 1000, len(DATA))
+    db.upload_sessions.update_one({"upload_id": upload_id}, {"$push": {"received": [len(DATA) - 1000, len(DATA)]}})
+    with pytest.raises(ConflictError) as finalize_error:
+        finalize_upload(upload_id, "user-1")
+
+    assert "pinned to" in chunk_error.value.message
+    assert "pinned to" in finalize_error.value.message
+    assert db.upload_sessions.find_one({"upload_id": upload_id})["status"] == "open"
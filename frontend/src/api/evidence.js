@@ -69,6 +69,9 @@ export const disposeEvidence = (evidenceId, reason) =>
 export const bulkVerify = (evidenceIds) =>
   client.post('/evidence/bulk/verify', { evidence_ids: evidenceIds })
 
+export const getBulkVerifyJob = (jobId) =>
+  client.get(`/evidence/bulk/verify/${jobId}`)
+
 export const exportEvidenceCSV = (caseId) =>
   client.get('/evidence/export/evidence', { params: caseId ? { case_id: caseId } : {}, responseType: 'blob' })
 
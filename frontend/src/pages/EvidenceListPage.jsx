@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react'
 import { Link, useLocation } from 'react-router-dom'
 import { Upload, Search, Filter, FileText, Image, Video, Music, Globe, Database, HardDrive, Mail, Briefcase, ChevronRight, ArrowLeft, Shield, CheckSquare, Download } from 'lucide-react'
-import { getEvidenceList, bulkVerify, exportEvidenceCSV } from '../api/evidence'
+import { getEvidenceList, bulkVerify, getBulkVerifyJob, exportEvidenceCSV } from '../api/evidence'
 import { getCases } from '../api/cases'
 import useAuth from '../hooks/useAuth'
 import { hasPermission } from '../utils/roles'
@@ -64,7 +64,14 @@ export default function EvidenceListPage() {
     setBulkResult(null)
     try {
       const res = await bulkVerify([...selected])
-      setBulkResult(res.data.summary)
+      let job = res.data.job
+      while (job.status === 'queued' || job.status === 'running') {
+        setBulkResult(job.summary)
+        await new Promise(resolve => setTimeout(resolve, 1500))
+        job = (await getBulkVerifyJob(job.job_id)).data.job
+      }
+      if (job.status === 'failed') throw new Error(job.error)
+      setBulkResult(job.summary)
       setSelected(new Set())
       // Reload evidence list to show updated statuses
       const params = { page, per_page: 10, case_id: selectedCase.case_id }